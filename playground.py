@@ -1,4 +1,10 @@
 from manim import *
+import os
+import sys
+
+# the helper modules live next to the scenes
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenes"))
+from lod import lod_cone, lod_parametric_function, lod_sphere
 
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
 
@@ -25,21 +31,21 @@ class Rotation(ThreeDScene):
         z_label = axes.get_z_axis_label(Tex(r"z"), rotation=-PI/2).shift(OUT*.25)
 
         sphere_radius = 2.5
-        sphere = Sphere(radius=sphere_radius, fill_opacity=.5, resolution=(64, 64)).set_color(BLUE)
+        sphere = lod_sphere(radius=sphere_radius, zoom=.75, fill_opacity=.5, maximum=(64, 64)).set_color(BLUE)
 
         start = 0
         end = start+np.arccos(1/3)
         eps = 0.05
         sphere_radius_expanded = sphere_radius + 0.25
-        arrow_curve = ParametricFunction(
+        arrow_curve = lod_parametric_function(
                     lambda t: np.array([
                         sphere_radius_expanded*np.cos(t),
                         0,
                         sphere_radius_expanded*np.sin(t)
-                    ]), color=PINK, t_range=[start, end],
+                    ]), color=PINK, t_range=[start, end], zoom=.75,
                 ).set_shade_in_3d(True)
         arrow_curve.stroke_width = 5
-        arrow_cone = Cone(show_base=True, base_radius=0.15, height=0.5, direction=[-np.sin(end+eps), 0, np.cos(end+eps)]).shift([sphere_radius_expanded*np.cos(end+eps), 0, sphere_radius_expanded*np.sin(end+eps)]).set_color(PINK)
+        arrow_cone = lod_cone(show_base=True, base_radius=0.15, height=0.5, direction=[-np.sin(end+eps), 0, np.cos(end+eps)], zoom=.75).shift([sphere_radius_expanded*np.cos(end+eps), 0, sphere_radius_expanded*np.sin(end+eps)]).set_color(PINK)
 
 
         self.add(title, sphere, axes, x_label, y_label, z_label, arrow_curve, arrow_cone)
@@ -1,4 +1,10 @@
 from manim import *
+import os
+import sys
+
+# the helper modules live next to the scenes
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenes"))
+from slot_tex import GlyphNumber
 
 class CreateCircle(Scene):
     def construct(self):
@@ -17,7 +23,7 @@ class DifferentRotations(Scene):
         self.wait()
 
 class FloatNumberAnimation(Animation):
-    def __init__(self, number: DecimalNumber, start: float, end: float, **kwargs) -> None:
+    def __init__(self, number: GlyphNumber, start: float, end: float, **kwargs) -> None:
         super().__init__(number, **kwargs)
         self.start = start
         self.end = end
@@ -28,7 +34,7 @@ class FloatNumberAnimation(Animation):
 
 class NumberGoingUp(Scene):
     def construct(self):
-        num = DecimalNumber(-100).set_color(GREEN).scale(5)
+        num = GlyphNumber(-100).set_color(GREEN).scale(5)
         num.add_updater(lambda number: number.move_to(ORIGIN))
         
         self.add(num)
@@ -1,9 +1,11 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 from math import sqrt, pi, e, log
 from numpy import arctan2
 
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 def modified_arctan2(x, y):
     a = arctan2(x, y)
     if a < 0:
@@ -12,10 +14,11 @@ def modified_arctan2(x, y):
         return a
 
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 
 class Intro(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         s = "Welcome to this video about the Banach-Tarski paradox. My name is Teun van Wezel, and this video was made as part of my bachelor's thesis in mathematics at Utrecht University."
         
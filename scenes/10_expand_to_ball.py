@@ -2,12 +2,19 @@
 
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 
 import random
 from math import sqrt
 
+from deterministic import DeterministicSceneMixin
+from lod import lod_sphere
+from point_cloud import PointCloud, PointCloudThreeDScene, RotateCloud
+from radial_lines import RadialLineSet
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 
 
 def get_random_point_on_sphere(radius):
@@ -19,7 +26,7 @@ def get_random_point_on_sphere(radius):
 
 class ExpandToBall(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
         
         title = Title("From $S^2$ to (almost) $B^3$")
 
@@ -56,9 +63,9 @@ class ExpandToBall(VoiceoverScene):
 
 
 
-class ExpandToBallThreeD(VoiceoverScene, ThreeDScene):
+class ExpandToBallThreeD(DeterministicSceneMixin, VoiceoverScene, PointCloudThreeDScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
         
         title = Title("From $S^2$ to (almost) $B^3$")
         self.add_fixed_in_frame_mobjects(title)
@@ -76,20 +83,16 @@ class ExpandToBallThreeD(VoiceoverScene, ThreeDScene):
         z_label = axes.get_z_axis_label(Tex(r"z"), rotation=-PI/2).shift(OUT*.25)
 
         sphere_radius = 2.5
-        sphere = Sphere(radius=sphere_radius, fill_opacity=.5).set_color(BLUE)
+        sphere = lod_sphere(radius=sphere_radius, zoom=.75, fill_opacity=.5).set_color(BLUE)
 
         self.add(title, sphere, axes, x_label, y_label, z_label)
 
-        dots_lines_pairs = VGroup()
-        lines = VGroup()
-        dots = VGroup()
-        for color in (PINK, YELLOW, GREEN, ORANGE):
-            dot = Dot3D(get_random_point_on_sphere(radius=sphere_radius), color=color)
-            dots.add(dot)
-            line = Line3D(start=ORIGIN, end=dot, color=color)
-            lines.add(line)
-            pair = VGroup(dot, line)
-            dots_lines_pairs.add(pair)
+        colors = (PINK, YELLOW, GREEN, ORANGE)
+        dots = PointCloud(
+            [get_random_point_on_sphere(radius=sphere_radius) for color in colors],
+            rgbas=[color_to_rgba(color) for color in colors], radius=DEFAULT_DOT_RADIUS
+        )
+        lines = RadialLineSet(dots.points, colors=colors).follow(dots)
             
         s = "Here are a few points on the unit sphere"
         with self.voiceover(s):
@@ -106,10 +109,10 @@ class ExpandToBallThreeD(VoiceoverScene, ThreeDScene):
         s = "When we rotate all these objects, you should see that rotating just the points is very similar to rotating the lines to them. It is as if the points on the line represent the same point but for all balls with radius smaller than 1. Well actually, it's exactly like that. "
         with self.voiceover(s):
             for ax in (UP, LEFT, OUT, DOWN, IN):
-                for line, dot in dots_lines_pairs:
+                for i in range(len(colors)):
+                    # the lines follow the dots
                     self.play(
-                            line.animate.rotate(angle=sqrt(2), axis=ax, about_point=ORIGIN),
-                            dot.animate.rotate(angle=sqrt(2), axis=ax, about_point=ORIGIN),
+                            RotateCloud(dots, angle=sqrt(2), axis=ax, about_point=ORIGIN, indices=[i]),
                         run_time=1
                     )
 
@@ -122,7 +125,7 @@ class ExpandToBallThreeD(VoiceoverScene, ThreeDScene):
 
 class ExpandToBallConclusion(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         title = Title("From $S^2$ to (almost) $B^3$")
 
@@ -2,18 +2,23 @@
 
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 
 from math import sqrt
 
+from orbit_accumulation import AccumulateOrbit, OrbitCloud, OrbitCounter
+from point_cloud import PointCloudScene
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 GOLDEN_RATIO = (1/2 + sqrt(5)/2)
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 
 
 
-class ExpandToBall(VoiceoverScene):
+class ExpandToBall(VoiceoverScene, PointCloudScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
         
         title = Title("Adding $0$ into the paradoxical decomposition")
         self.add(title)
@@ -41,42 +46,33 @@ class ExpandToBall(VoiceoverScene):
 
         s = "Now, again we look at the rotations. "
         initial_number_of_d_rotations = 8
-        zero_dupes_groups = VGroup()
+        total_number_of_d_rotations = 20
+        zero_dupes_groups = OrbitCloud(
+            [origin_dot.get_center()], angle=GOLDEN_RATIO, count=total_number_of_d_rotations,
+            about_point=[circle_radius/3, 0, 0], dot_radius=0.04
+        )
+        theta_counter = OrbitCounter(r"\theta", "0")
+        theta_counter.shift(rotation_counter.get_left() - theta_counter.get_left())
         with self.voiceover(s):
             self.play(origin_dot.animate.set_color(RED),
                       FadeOut(rotation_point_label))
             self.play(Create(rotation_counter))
-            for i in range(1, initial_number_of_d_rotations + 1):
-                rotation_counter_new = MathTex(r"\theta^{" + f"{i}" + r"}({{ 0 }})").set_color_by_tex("0", RED).shift(rotation_counter.get_center())
-                zero_copy = origin_dot.copy().set_color(WHITE)
-                self.play(
-                    Rotate(zero_copy, angle=GOLDEN_RATIO*i, axis=OUT, about_point=[circle_radius/3, 0, 0]),
-                    Transform(rotation_counter, rotation_counter_new),
-                    run_time = 0.75
-                )
-                self.wait(.2)
-                self.remove(rotation_counter)
-                rotation_counter = rotation_counter_new
-                zero_dupes_groups.add(zero_copy)
+            self.remove(rotation_counter)
+            rotation_counter = theta_counter
+            self.play(
+                AccumulateOrbit(zero_dupes_groups, 0, initial_number_of_d_rotations, counter=rotation_counter),
+                run_time = 0.95 * initial_number_of_d_rotations
+            )
         
         e_definition = MathTex(r"K = \bigcup_{n=0}^\infty \theta^n(0)").to_edge(RIGHT)
-        total_number_of_d_rotations = 20
         s = "Again, we will define a set K similarly. K is the union of 0 with all the repeated rotations theta n of 0."
         with self.voiceover(s):
             self.play(FadeOut(phi_no_overlap))
             self.play(Write(e_definition))
-            for i in range(initial_number_of_d_rotations, total_number_of_d_rotations + 1):
-                rotation_counter_new = MathTex(r"\theta^{" + f"{i}" + r"}({{ D }})").set_color_by_tex("D", RED).shift(rotation_counter.get_center())
-                zero_copy = origin_dot.copy().set_color(WHITE)
-                self.play(
-                    Rotate(zero_copy, angle=GOLDEN_RATIO*i, axis=OUT, about_point=[circle_radius/3, 0, 0]),
-                    Transform(rotation_counter, rotation_counter_new),
-                    run_time = 0.75
-                )
-                self.wait(.2)
-                self.remove(rotation_counter)
-                rotation_counter = rotation_counter_new
-                zero_dupes_groups.add(zero_copy)
+            self.play(
+                AccumulateOrbit(zero_dupes_groups, initial_number_of_d_rotations, total_number_of_d_rotations, counter=rotation_counter),
+                run_time = 0.95 * (total_number_of_d_rotations - initial_number_of_d_rotations)
+            )
         
         e_rotated = MathTex(r"\theta^{-1}(E \setminus D) = \theta^{-1}(\bigcup_{n=1}^\infty \theta^n(D)) = \bigcup_{n=0}^\infty \theta^n(D) = E").to_edge(DOWN).shift(DOWN * 0.25)
         D_dupes_groups_blue = zero_dupes_groups.copy().set_color(YELLOW)
@@ -95,7 +91,7 @@ class ExpandToBallConclusion(VoiceoverScene):
     def construct(self):
         
 
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         title = Title(r"Finally: a paradoxical decomposition of $B^3$")
         self.add(title)
@@ -1,9 +1,14 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 from math import sqrt, pi, e, log
 from numpy import arctan2
 
+from parametric_shapes import ParametricBrace
+from profiling import UpdaterProfilerMixin
+from slot_tex import GlyphNumber
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 def modified_arctan2(x, y):
     a = arctan2(x, y)
     if a < 0:
@@ -12,10 +17,11 @@ def modified_arctan2(x, y):
         return a
 
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 
-class MeasurableScene(VoiceoverScene):
+class MeasurableScene(UpdaterProfilerMixin, VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
         top_text = Tex(r"\textbf{(Non-)measurable sets}", font_size=70)
 
         self.play(Write(top_text), run_time = 2)
@@ -34,8 +40,8 @@ class MeasurableScene(VoiceoverScene):
 
         line = Line([-1, 0, 0], [1, 0, 0])
         line.set_stroke(color = RED, width = 5)
-        line_brace = BraceBetweenPoints(line.get_start(), line.get_end())
-        line_width_label = DecimalNumber(2).next_to(line_brace, DOWN)
+        line_brace = ParametricBrace(line.get_start(), line.get_end())
+        line_width_label = GlyphNumber(2).next_to(line_brace, DOWN)
         line_width_indicator = Group(line_brace, line_width_label)
 
 
@@ -48,7 +54,7 @@ class MeasurableScene(VoiceoverScene):
         # self.play(UnWrite(top_text, ))
 
             
-        line_brace.add_updater(lambda x: x.become(BraceBetweenPoints(line.get_start(), line.get_end())))
+        line_brace.add_updater(lambda x: x.set_ends(line.get_start(), line.get_end()))
         line_width_label.add_updater(lambda x: x.set_value(line.get_length()))
         
         s = "When we talk about size, we have an intuitive idea of what it means:"
@@ -72,18 +78,18 @@ class MeasurableScene(VoiceoverScene):
         self.play(line.animate.shift(DOWN), line_width_indicator.animate.shift(DOWN))
 
         # New brace for height
-        square_height_brace = BraceBetweenPoints(square.points[3], square.points[0])
-        square_height_brace.add_updater(lambda x: x.become(BraceBetweenPoints(square_as_line.points[3], square_as_line.points[0])).next_to(square_as_line, RIGHT))
+        square_height_brace = ParametricBrace(square.points[3], square.points[0])
+        square_height_brace.add_updater(lambda x: x.set_ends(square_as_line.points[3], square_as_line.points[0]).next_to(square_as_line, RIGHT))
         # Label for the height
-        square_height_label = DecimalNumber(2).next_to(square_height_brace, RIGHT)
+        square_height_label = GlyphNumber(2).next_to(square_height_brace, RIGHT)
         square_height_label.add_updater(lambda x: x.set_value(abs(square_as_line.points[3][1] - square_as_line.points[0][1])).next_to(square_height_brace, RIGHT))
         # Reuse brace used for the line, change updater
-        line_brace.add_updater(lambda x: x.become(BraceBetweenPoints(square_as_line.points[7], square_as_line.points[3])).next_to(square_as_line, DOWN))
+        line_brace.add_updater(lambda x: x.set_ends(square_as_line.points[7], square_as_line.points[3]).next_to(square_as_line, DOWN))
         # Label (reused) for width
         line_width_label.add_updater(lambda x: x.set_value(abs(square_as_line.points[7][0] - square_as_line.points[3][0])).next_to(line_brace, DOWN))
         
         # add in area label
-        square_area_label = DecimalNumber(2)
+        square_area_label = GlyphNumber(2)
         square_area_label.add_updater(lambda x: x.set_value(line_width_label.get_value() * square_height_label.get_value()))
         
         self.add(square_height_brace, square_height_label)
@@ -1,11 +1,17 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 from math import sqrt, pi, e, log
 from numpy import arctan2
 from random import shuffle
 
+from deterministic import DeterministicSceneMixin
+from parametric_shapes import ParametricSector
+from profiling import UpdaterProfilerMixin
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 
 def modified_arctan2(x, y):
     a = arctan2(x, y)
@@ -14,9 +20,9 @@ def modified_arctan2(x, y):
     else:
         return a
 
-class NonMeasurableScene(VoiceoverScene):
+class NonMeasurableScene(DeterministicSceneMixin, UpdaterProfilerMixin, VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
         number_plane = NumberPlane(
             background_line_style={
                 "stroke_color": '#E0DBD1',
@@ -34,7 +40,7 @@ class NonMeasurableScene(VoiceoverScene):
 
         circle_radius = 2.5
         circle = Circle(circle_radius, color=WHITE)
-        circle_inside_color = AnnularSector(outer_radius = circle_radius, inner_radius = 0, angle = 0).set_fill(WHITE, opacity = 0.3)
+        circle_inside_color = ParametricSector(radius = circle_radius, angle = 0).set_fill(WHITE, opacity = 0.3)
         point = Dot([circle_radius, 0.0, 0.0]).set_color(RED)
         original_point_label = Tex(r"p", color = RED).next_to(point).shift(0.3 * UP)
         original_point_coordinates = MathTex(r"= (1, 0)", color=RED).next_to(original_point_label, buff = 0.2 * DEFAULT_MOBJECT_TO_MOBJECT_BUFFER)
@@ -59,9 +65,7 @@ class NonMeasurableScene(VoiceoverScene):
         s = "Let's look at how such an equivalence class is created by looking at the point 1, 0."
         with self.voiceover(s):
             pass
-        circle_inside_color.add_updater(lambda x: x.become(
-            AnnularSector(outer_radius = circle_radius, inner_radius = 0, angle = modified_arctan2(point.get_y(), point.get_x())).set_fill(WHITE, opacity = 0.3)
-        ))
+        circle_inside_color.add_updater(lambda x: x.set_angle(modified_arctan2(point.get_y(), point.get_x())))
 
         # add a label for the current angle
         def angle_label_with_angle(angle):
@@ -130,9 +134,9 @@ class NonMeasurableScene(VoiceoverScene):
             coordinates = np.array(circle_radius) * coordinates
             rotating_point = Dot(coordinates, color=color)
             
-            circle_inside_color.add_updater(lambda x: x.become(
-            AnnularSector(outer_radius = circle_radius, inner_radius = 0, angle = modified_arctan2(rotating_point.get_y(), rotating_point.get_x())).set_fill(WHITE, opacity = 0.3)
-            ))
+            # replace the updater for the previous point rather than piling up another one
+            circle_inside_color.clear_updaters()
+            circle_inside_color.add_updater(lambda x: x.set_angle(modified_arctan2(rotating_point.get_y(), rotating_point.get_x())))
             
             point_class_first_point = rotating_point.copy()
             self.add(point_class_first_point)
@@ -1,14 +1,19 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 
 from math import sqrt, pi, e, log
 
+from cayley_tree import CayleyTree, CayleyTreeMobject, level_layout
+from free_group import SIGMA, SIGMA_I, TAU, reduce_word, word_tex
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 
 class FreeGroupTreeScene(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         title_card_tex = Tex(r"The free group $F_2$", font_size = 60)
         
@@ -37,39 +42,9 @@ class FreeGroupTreeScene(VoiceoverScene):
             )
 
 
-        root = MathTex(r"e")
-        leaves_1 = []
-        branches_1 = []
-        for i, label in enumerate((r"\sigma", r"\tau", r"\sigma^{-1}", r"\tau^{-1}")):
-            leaf = MathTex(label).shift(1.5*DOWN + i * RIGHT*2 - 3 * RIGHT)
-            leaf_branch = Arrow(start = root, end = leaf)
-            # leaf_branch_label = MathTex(label).next_to(leaf_branch, LEFT)#.shift(LEFT * .5)
-            leaves_1.append(leaf)
-            branches_1.append(leaf_branch)
-
-        tree = VGroup(root, *leaves_1, *branches_1).to_edge(UP)
-
-        leaves_2 = []
-        branches_2 = []
-        for i, label in enumerate((r"\sigma^2", r"\sigma\tau", r"\sigma\tau^{-1}")):
-            leaf = MathTex(label).shift(i * RIGHT*2 - 3 * RIGHT)
-            leaf_branch = Arrow(start = leaves_1[0], end = leaf)
-            # leaf_branch_label = MathTex(label).next_to(leaf_branch, LEFT)#.shift(LEFT * .5)
-            leaves_2.append(leaf)
-            branches_2.append(leaf_branch)
-        tree.add(*leaves_2, *branches_2)
-        
-        leaves_3 = []
-        branches_3 = []
-        for i, label in enumerate(
-                (r"\sigma\tau\sigma", r"\sigma\tau^2", r"\sigma\tau\sigma^{-1}")
-            ):
-            leaf = MathTex(label).shift(2 * DOWN + i * RIGHT*2 - 3 * RIGHT)
-            leaf_branch = Arrow(start = leaves_2[1], end = leaf)
-            # leaf_branch_label = MathTex(label).next_to(leaf_branch, LEFT)#.shift(LEFT * .5)
-            leaves_3.append(leaf)
-            branches_3.append(leaf_branch)
-        tree.add(*leaves_3, *branches_3)
+        # all of F_2 up to length 1, W(sigma) up to length 2 and W(sigma tau) up to length 3
+        tree_words = CayleyTree(3, branches=[(SIGMA, TAU)])
+        cayley_tree = CayleyTreeMobject(tree_words, level_layout(tree_words, width=7, level_height=1.5)).to_edge(UP)
         
         
         tree_text = Tex(r"$F_2$ as a tree").to_corner(UP + LEFT)
@@ -78,7 +53,7 @@ class FreeGroupTreeScene(VoiceoverScene):
         with self.voiceover(s):
             self.play(
                     FadeOut(title_card_tex, f2_definition_tex, example_elements_tex),
-                    Create(tree),
+                    Create(cayley_tree),
                     FadeIn(tree_text),
                     run_time = 2.5           
                 )
@@ -88,8 +63,8 @@ class FreeGroupTreeScene(VoiceoverScene):
         with self.voiceover(s):
             self.wait(0.5)
 
-        f2_decomp_tex = MathTex(r"F_2 = {{ \{e\} }} \cup {{W(\sigma)}} \cup {{W(\sigma^{-1})}} \cup {{W(\tau)}} \cup {{W(\tau^{-1})}}", font_size = 35).next_to(tree, DOWN, buff = 0.5)
-        tree = VGroup(tree, f2_decomp_tex)
+        f2_decomp_tex = MathTex(r"F_2 = {{ \{e\} }} \cup {{W(\sigma)}} \cup {{W(\sigma^{-1})}} \cup {{W(\tau)}} \cup {{W(\tau^{-1})}}", font_size = 35).next_to(cayley_tree, DOWN, buff = 0.5)
+        tree = VGroup(cayley_tree, f2_decomp_tex)
 
         s = "We can represent the same thing symbolically as follows. F2 can be written as"
         with self.voiceover(s):
@@ -99,9 +74,10 @@ class FreeGroupTreeScene(VoiceoverScene):
         with self.voiceover(s):
             self.play(ShowIncreasingSubsets(f2_decomp_tex), run_time = 5)
 
-        sigma_tree = VGroup(leaves_1[0], *leaves_2, *leaves_3, *branches_2, *branches_3) 
+        sigma_words = cayley_tree.branch_words(SIGMA)
+        sigma_tree = cayley_tree.branch(SIGMA)
         sigma_tree_copy = sigma_tree.copy().move_to(sigma_tree.get_center())
-        sigma_tree_leaves = VGroup(leaves_1[0], *leaves_2, *leaves_3)
+        sigma_tree_leaves = VGroup(*[cayley_tree.label(word) for word in sigma_words])
         sigma_tree_copy_leaves = [m for m in sigma_tree_copy if type(m) == MathTex]
 
         f2_decomp_tex_sigma = MathTex(r"W(\sigma)").next_to(sigma_tree_copy, DOWN, buff = 0.5)
@@ -128,11 +104,7 @@ class FreeGroupTreeScene(VoiceoverScene):
 
         self.wait(2)
 
-        new_leaves = [
-            r"e",
-            r"\sigma", r"\tau", r"\tau^{-1}",
-            r"\tau\sigma", r"\tau^{2}", r"\tau\sigma^{-1}"
-        ]
+        new_leaves = [word_tex(reduce_word([SIGMA_I, *word])) for word in sigma_words]
         sigma_inv_tex = MathTex(r"\sigma^{-1}", color=BLUE).next_to(f2_decomp_tex_sigma, LEFT, buff = 0.07)
         s = "Notice that when, for all these elements, we multiply on the left by sigma inverse, we get the whole tree again!"
         with self.voiceover(s):
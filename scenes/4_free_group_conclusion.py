@@ -1,13 +1,16 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 from math import sqrt, pi, e, log
 
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 
 class FreeGroupConclusionScene(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
         title = Title(r"The paradoxical decomposition of $F_2$", font_size = 1.5 * DEFAULT_FONT_SIZE).to_edge(UP)
         self.add(title)
 
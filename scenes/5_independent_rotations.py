@@ -2,20 +2,18 @@
 
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 from manim.utils.color import Colors
 import random
 from math import sqrt, acos
 
+from lod import lod_cone, lod_parametric_function, lod_sphere
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 random.seed(14)
 
-SIGMA = 0
-TAU = 1
-SIGMA_I = 2
-TAU_I = 3
-
-
 def get_random_point_on_sphere(radius):
     rand_x = random.uniform(-1, 1)
     rand_y = random.uniform(-sqrt(1 - rand_x**2), sqrt(1 - rand_x**2))
@@ -26,33 +24,9 @@ def get_point_string(point):
     x, y, z = point.get_center()
     return f"({x:.2f}, {y:.2f}, {z:.2f})"
 
-def axis_angle_from_rotation_component(component):
-    axis_of_rotation = RIGHT
-    rotation_angle = 0
-    if component == SIGMA:
-        axis_of_rotation = RIGHT
-        rotation_angle = acos(1/3)
-    elif component == SIGMA_I:
-        axis_of_rotation = RIGHT
-        rotation_angle = -acos(1/3)
-    elif component == TAU:
-        axis_of_rotation = UP
-        rotation_angle = acos(1/3)
-    elif component == TAU_I:
-        axis_of_rotation = UP
-        rotation_angle = -acos(1/3)
-    return axis_of_rotation, rotation_angle
-
-rotation_translation_dict = {
-    SIGMA: r"\sigma",
-    SIGMA_I: r"\sigma^{-1}",
-    TAU: r"\tau",
-    TAU_I: r"\tau^{-1}", 
-}
-
 class HowToTransferScene(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
         
         title = Title("Why do we care about $F_2$ at all?")
         self.add(title)
@@ -97,7 +71,7 @@ class HowToTransferScene(VoiceoverScene):
 
 class IndependentRotations(VoiceoverScene, ThreeDScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         title = Title(r"Independent rotations in $\mathbb{E}_3$")
         
@@ -128,7 +102,7 @@ class IndependentRotations(VoiceoverScene, ThreeDScene):
 
 class TauRotation(VoiceoverScene, ThreeDScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         self.set_camera_orientation(phi=65 * DEGREES, theta=225 * DEGREES, zoom=.75, run_time=1.5)
         self.begin_ambient_camera_rotation(rate=0.4)
@@ -142,21 +116,21 @@ class TauRotation(VoiceoverScene, ThreeDScene):
         z_label = axes.get_z_axis_label(Tex(r"z"), rotation=-PI/2).shift(OUT*.25)
 
         sphere_radius = 2.5
-        sphere = Sphere(radius=sphere_radius, fill_opacity=.5).set_color(BLUE)
+        sphere = lod_sphere(radius=sphere_radius, zoom=.75, fill_opacity=.5).set_color(BLUE)
 
         start = 0
         end = start+np.arccos(1/3)
         eps = 0.05
         sphere_radius_expanded = sphere_radius + 0.25
-        arrow_curve = ParametricFunction(
+        arrow_curve = lod_parametric_function(
                     lambda t: np.array([
                         -sphere_radius_expanded*np.cos(t),
                         0,
                         sphere_radius_expanded*np.sin(t)
-                    ]), color=PINK, t_range=[start, end],
+                    ]), color=PINK, t_range=[start, end], zoom=.75,
                 ).set_shade_in_3d(True)
         arrow_curve.stroke_width = 5
-        arrow_cone = Cone(show_base=True, base_radius=0.15, height=0.5, direction=[np.sin(end+eps), 0, np.cos(end+eps)]).shift([-sphere_radius_expanded*np.cos(end+eps), 0, sphere_radius_expanded*np.sin(end+eps)]).set_color(PINK)
+        arrow_cone = lod_cone(show_base=True, base_radius=0.15, height=0.5, direction=[np.sin(end+eps), 0, np.cos(end+eps)], zoom=.75).shift([-sphere_radius_expanded*np.cos(end+eps), 0, sphere_radius_expanded*np.sin(end+eps)]).set_color(PINK)
 
         self.add(title, sphere, axes, x_label, y_label, z_label, arrow_curve, arrow_cone)
         
@@ -170,7 +144,7 @@ class TauRotation(VoiceoverScene, ThreeDScene):
 
 class SigmaRotation(VoiceoverScene, ThreeDScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         self.set_camera_orientation(phi=65 * DEGREES, theta=135 * DEGREES, zoom=.75, run_time=1.5)
         self.begin_ambient_camera_rotation(rate=0.4)
@@ -184,21 +158,21 @@ class SigmaRotation(VoiceoverScene, ThreeDScene):
         z_label = axes.get_z_axis_label(Tex(r"z"), rotation=-PI/2).shift(OUT*.25)
 
         sphere_radius = 2.5
-        sphere = Sphere(radius=sphere_radius, fill_opacity=.5).set_color(BLUE)
+        sphere = lod_sphere(radius=sphere_radius, zoom=.75, fill_opacity=.5).set_color(BLUE)
 
         start = 0
         end = start+np.arccos(1/3)
         eps = 0.05
         sphere_radius_expanded = sphere_radius + 0.25
-        arrow_curve = ParametricFunction(
+        arrow_curve = lod_parametric_function(
                     lambda t: np.array([
                         0,
                         sphere_radius_expanded*np.cos(t),
                         sphere_radius_expanded*np.sin(t)
-                    ]), color=PINK, t_range=[start, end],
+                    ]), color=PINK, t_range=[start, end], zoom=.75,
                 ).set_shade_in_3d(True)
         arrow_curve.stroke_width = 5
-        arrow_cone = Cone(show_base=True, base_radius=0.15, height=0.5, direction=[0, -np.sin(end+eps), np.cos(end+eps)]).shift([0, sphere_radius_expanded*np.cos(end+eps), sphere_radius_expanded*np.sin(end+eps)]).set_color(PINK)
+        arrow_cone = lod_cone(show_base=True, base_radius=0.15, height=0.5, direction=[0, -np.sin(end+eps), np.cos(end+eps)], zoom=.75).shift([0, sphere_radius_expanded*np.cos(end+eps), sphere_radius_expanded*np.sin(end+eps)]).set_color(PINK)
 
         self.add(title, sphere, axes, x_label, y_label, z_label, arrow_curve, arrow_cone)
         
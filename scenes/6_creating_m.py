@@ -1,18 +1,19 @@
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 from manim.utils.color import Colors
 import random
 from math import sqrt, acos
+from deterministic import DeterministicSceneMixin
+from free_group import generate_random_rotations_with_labels
+from lod import lod_sphere
+from point_cloud import PointCloud, PointCloudThreeDScene
+from radial_lines import RadialSegment
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+from word_rotation import ApplyWord
 
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
-random.seed(14)
-
-SIGMA = 0
-TAU = 1
-SIGMA_I = 2
-TAU_I = 3
-
+enable_tex_geometry_cache()
 
 def get_random_point_on_sphere(radius):
     rand_x = random.uniform(-1, 1)
@@ -24,65 +25,15 @@ def get_point_string(point):
     x, y, z = point.get_center()
     return f"({x:.2f}, {y:.2f}, {z:.2f})"
 
-def axis_angle_from_rotation_component(component):
-    axis_of_rotation = RIGHT
-    rotation_angle = 0
-    if component == SIGMA:
-        axis_of_rotation = RIGHT
-        rotation_angle = acos(1/3)
-    elif component == SIGMA_I:
-        axis_of_rotation = RIGHT
-        rotation_angle = -acos(1/3)
-    elif component == TAU:
-        axis_of_rotation = UP
-        rotation_angle = acos(1/3)
-    elif component == TAU_I:
-        axis_of_rotation = UP
-        rotation_angle = -acos(1/3)
-    return axis_of_rotation, rotation_angle
-
-rotation_translation_dict = {
-    SIGMA: r"\sigma",
-    SIGMA_I: r"\sigma^{-1}",
-    TAU: r"\tau",
-    TAU_I: r"\tau^{-1}", 
-}
-
-
-def generate_random_rotations_with_labels(n):
-    rotations = []
-    for i in range (n):
-        rotation_components = []
-        rotation_label = ""
-        number_of_components = random.randint(2, 7)
-        for i in range(number_of_components): # generate components
-            rotation = random.randint(0,3)
-            if i >= 1:
-                last_rotation = rotation_components[-1]
-                # keep generating a new rotation component until it doesn't reduce the rotation
-                while (
-                    (rotation == SIGMA and last_rotation == SIGMA_I)
-                    or (rotation == SIGMA_I and last_rotation == SIGMA)
-                    or (rotation == TAU and last_rotation == TAU_I)
-                    or (rotation == TAU_I and last_rotation == TAU)
-                ):
-                    rotation = random.randint(0,3)
-            rotation_components.append(rotation)
-            rotation_label += rotation_translation_dict[rotation]
-        rotations.append((rotation_components, rotation_label))
-    return rotations
-
 # sigma along x-axis
 # tau along y-axis
 
 def dot_radial_line(dot, color):
-    result = Line3D(ORIGIN, dot.get_center(), color=color)
-    result.add_updater(lambda x: x.set_start_and_end_attrs(ORIGIN, dot))
-    return result
+    return RadialSegment(dot.get_center(), color=color).follow(dot)
 
 class CreatingMIntro(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
         
         title = Title(r"Creating a paradoxical decomposition of $S^2 \setminus D$")
         self.play(Write(title))
@@ -110,9 +61,9 @@ class CreatingMIntro(VoiceoverScene):
             self.play(FadeIn(m_explanation_tex, box))
 
 
-class CreatingM(VoiceoverScene, ThreeDScene):
+class CreatingM(DeterministicSceneMixin, VoiceoverScene, PointCloudThreeDScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         self.move_camera(phi=75 * DEGREES, theta=30 * DEGREES, zoom=.75, run_time=1.5)
         title = Title(r"Creating $M$ using $ G(\sigma, \tau)$")
@@ -131,7 +82,7 @@ class CreatingM(VoiceoverScene, ThreeDScene):
         self.wait(.5)
 
         sphere_radius = 3
-        sphere = Sphere(radius=sphere_radius, fill_opacity=.35).set_color(BLUE)
+        sphere = lod_sphere(radius=sphere_radius, zoom=.75, fill_opacity=.35).set_color(BLUE)
 
         s = "Similarly to the construction of the non-measurable set, we will look at equivalence classes over rotations. The only differences are that we are now looking at three-dimensional rotations instead of two, and that we are not looking at rational rotations, but at rotations from the group generated by sigma and tau."
         with self.voiceover(s):
@@ -145,7 +96,7 @@ class CreatingM(VoiceoverScene, ThreeDScene):
             # show creating equivalence classes for four different points
             for i, color in enumerate((RED, BLUE, GREEN, YELLOW)):
                 random_sphere_coordinates = get_random_point_on_sphere(sphere_radius)
-                origin_dot = Dot3D(random_sphere_coordinates, color=color, radius=.1)
+                origin_dot = PointCloud([random_sphere_coordinates], color=color, radius=.1)
                 origin_line = dot_radial_line(origin_dot, color)
                 point_string = get_point_string(origin_dot)
                 point_tex = Tex(r"Equivalence class of {{$" + point_string + r"$}}").to_edge(UP).set_color_by_tex(point_string, color)
@@ -164,18 +115,12 @@ class CreatingM(VoiceoverScene, ThreeDScene):
                     # set up animation
                     self.play(TransformMatchingTex(rotation_tex_old, rotation_tex_new), run_time = .5)
                     self.wait(.15)
-                    # animate all the components of the rotation:
-                    for component in rotation:
-                        axis_of_rotation, rotation_angle = axis_angle_from_rotation_component(component)
-                        # component_arrow = generate_rotation_arrow(rotation_dot, sphere_radius, component)
-                        # rotation_arrows.add(component_arrow)
-                        dot_line_group = VGroup(rotation_dot, rotation_dot_line)
-                        self.play(
-                            Rotate(dot_line_group, rotation_angle, about_point=ORIGIN, axis=axis_of_rotation),
-                            # Rotate(rotation_dot_line, rotation_angle, about_point=ORIGIN, axis=axis_of_rotation), 
-                            # FadeIn(component_arrow),
-                            run_time=1
-                        )
+                    # animate all the components of the rotation in one go:
+                    dot_line_group = Group(rotation_dot, rotation_dot_line)
+                    self.play(
+                        ApplyWord(dot_line_group, rotation, about_point=ORIGIN),
+                        run_time=len(rotation)
+                    )
                     self.remove(rotation_tex_old)
                     # self.play(FadeOut(rotation_arrows))
                     rotation_tex_old = rotation_tex_new
@@ -196,7 +141,7 @@ class CreatingM(VoiceoverScene, ThreeDScene):
 
 class CreatingMConclusion(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         title = Title("Finishing the construction of $M$")
         self.add(title)
@@ -4,15 +4,16 @@ from manim_voiceover import VoiceoverScene
 from manim.utils.color import Colors
 import random
 from math import sqrt, acos
+from deterministic import DeterministicSceneMixin
+from free_group import generate_random_rotations_with_labels
+from lod import lod_sphere
+from pieces import PieceClassifier, piece_rgbas, sample_sphere
+from point_cloud import GrowPointCloud, PointCloud, PointCloudThreeDScene
+from tex_geometry_cache import enable_tex_geometry_cache
+from word_rotation import ApplyWord
 
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
-random.seed(14)
-
-SIGMA = 0
-TAU = 1
-SIGMA_I = 2
-TAU_I = 3
-
+enable_tex_geometry_cache()
 
 def get_random_point_on_sphere(radius):
     rand_x = random.uniform(-1, 1)
@@ -24,58 +25,10 @@ def get_point_string(point):
     x, y, z = point.get_center()
     return f"({x:.2f}, {y:.2f}, {z:.2f})"
 
-def axis_angle_from_rotation_component(component):
-    axis_of_rotation = RIGHT
-    rotation_angle = 0
-    if component == SIGMA:
-        axis_of_rotation = RIGHT
-        rotation_angle = acos(1/3)
-    elif component == SIGMA_I:
-        axis_of_rotation = RIGHT
-        rotation_angle = -acos(1/3)
-    elif component == TAU:
-        axis_of_rotation = UP
-        rotation_angle = acos(1/3)
-    elif component == TAU_I:
-        axis_of_rotation = UP
-        rotation_angle = -acos(1/3)
-    return axis_of_rotation, rotation_angle
-
-rotation_translation_dict = {
-    SIGMA: r"\sigma",
-    SIGMA_I: r"\sigma^{-1}",
-    TAU: r"\tau",
-    TAU_I: r"\tau^{-1}", 
-}
-
-
-def generate_random_rotations_with_labels(n):
-    rotations = []
-    for i in range (n):
-        rotation_components = []
-        rotation_label = ""
-        number_of_components = random.randint(2, 7)
-        for i in range(number_of_components): # generate components
-            rotation = random.randint(0,3)
-            if i >= 1:
-                last_rotation = rotation_components[-1]
-                # keep generating a new rotation component until it doesn't reduce the rotation
-                while (
-                    (rotation == SIGMA and last_rotation == SIGMA_I)
-                    or (rotation == SIGMA_I and last_rotation == SIGMA)
-                    or (rotation == TAU and last_rotation == TAU_I)
-                    or (rotation == TAU_I and last_rotation == TAU)
-                ):
-                    rotation = random.randint(0,3)
-            rotation_components.append(rotation)
-            rotation_label += rotation_translation_dict[rotation]
-        rotations.append((rotation_components, rotation_label))
-    return rotations
-
 # sigma along x-axis
 # tau along y-axis
 
-class SphereFromM(VoiceoverScene, ThreeDScene):
+class SphereFromM(DeterministicSceneMixin, VoiceoverScene, PointCloudThreeDScene):
     def construct(self):
         self.move_camera(phi=75 * DEGREES, theta=30 * DEGREES, zoom=.75, run_time=1.5)
         title = Tex(r"Creating M for reasons. (Paradoxical decomposition of $S^2 \setminus D$)").to_edge(UP)
@@ -92,29 +45,31 @@ class SphereFromM(VoiceoverScene, ThreeDScene):
         self.wait(.5)
 
         sphere_radius = 3
-        sphere = Sphere(radius=sphere_radius, fill_opacity=.35).set_color(BLUE)
+        sphere = lod_sphere(radius=sphere_radius, zoom=.75, fill_opacity=.35).set_color(BLUE)
         self.begin_ambient_camera_rotation(rate=0.15)
 
         self.play(Write(sphere), FadeOut(title))
 
         s = "We will now define a set M that contains exactly one point from each equivalent class. This will look something like this."
-        dots = VGroup()
         colors = random.sample(list(Colors.__members__.values()), 20) 
-        for color in colors:
-            random_coordinates = get_random_point_on_sphere(sphere_radius)
-            dot = Dot3D(random_coordinates, color=color.value, radius=0.04)
-            dots.add(dot)
-        self.play(ShowIncreasingSubsets(dots), run_time=3)
+        dots = PointCloud(
+            [get_random_point_on_sphere(sphere_radius) for color in colors],
+            rgbas=[color_to_rgba(color.value) for color in colors], radius=0.04
+        )
+        self.play(GrowPointCloud(dots), run_time=3)
         s = "Then of course, we can cover the whole of S2 by taking all rotations in G(tau, sigma) and applying them to M."
         # rotated_point_groups = []
         for rotation, label in generate_random_rotations_with_labels(3):
             rotation_tex = Tex(f"Rotating tex by ${label}$").to_edge(DOWN)
             new_point_group = dots.copy()
             self.add_fixed_in_frame_mobjects(rotation_tex)
-            for component in rotation:
-                axis_of_rotation, rotation_angle = axis_angle_from_rotation_component(component)
-                self.play(Rotate(new_point_group, rotation_angle, about_point=ORIGIN, axis=axis_of_rotation), run_time=1)
+            self.play(ApplyWord(new_point_group, rotation, about_point=ORIGIN), run_time=len(rotation))
             self.remove(rotation_tex)
         s = "Of course, we can't possibly show all these rotations of M, but hopefully it is clear how S2 can be covered by taking the union of all these rotations of M."
+        # colour the sphere by the piece the nearest point of the orbit of M lies in
+        classifier = PieceClassifier(dots.points, max_length=6)
+        samples = np.concatenate(list(sample_sphere(20000, seed=14)))
+        pieces = PointCloud(samples * sphere_radius, rgbas=piece_rgbas(classifier.classify(samples)), radius=0.02)
+        self.play(FadeOut(sphere), FadeIn(pieces), run_time=2)
         s = "This is because, for every element of S2, there is some equivalent point in M. So if we rotate by all possible rotations in G tau sigma, then we will be sure to cover it eventually"
         self.wait(2)
\ No newline at end of file
@@ -3,24 +3,24 @@
 
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 from manim.utils.color import Colors
 
 import random
 from math import sqrt, acos
 import numpy as np
 
+from lod import lod_cone, lod_dot3d, lod_parametric_function, lod_sphere
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 random.seed(14)
 
-SIGMA = 0
-TAU = 1
-SIGMA_I = 2
-TAU_I = 3
 
 class ShowFixedPointProblem(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         title = Title("Paradoxical decomposition: why D?")
         self.add(title)
@@ -57,7 +57,7 @@ class ShowFixedPointProblem(VoiceoverScene):
 
 class ShowFixedPointProblemThreeD(VoiceoverScene, ThreeDScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         self.move_camera(phi=75 * DEGREES, theta=30 * DEGREES, zoom=.75, run_time=1.5)
         self.begin_ambient_camera_rotation(rate=0.4)
@@ -76,22 +76,22 @@ class ShowFixedPointProblemThreeD(VoiceoverScene, ThreeDScene):
             self.play(FadeIn(axes), FadeIn(x_label, y_label, z_label))
 
         sphere_radius = 3
-        sphere = Sphere(radius=sphere_radius, fill_opacity=.35).set_color(BLUE)
-        point = Dot3D([sphere_radius*1.02, 0 , 0], color=RED, radius=0.2)
+        sphere = lod_sphere(radius=sphere_radius, zoom=.75, fill_opacity=.35).set_color(BLUE)
+        point = lod_dot3d([sphere_radius*1.02, 0 , 0], color=RED, radius=0.2, zoom=.75)
 
         start = 0
         end = start+np.arccos(1/3)
         eps = 0.05
         sphere_radius_expanded = sphere_radius + 0.25
-        arrow_curve = ParametricFunction(
+        arrow_curve = lod_parametric_function(
                     lambda t: np.array([
                         0,
                         sphere_radius_expanded*np.cos(t),
                         sphere_radius_expanded*np.sin(t)
-                    ]), color=PINK, t_range=[start, end],
+                    ]), color=PINK, t_range=[start, end], zoom=.75,
                 ).set_shade_in_3d(True)
         arrow_curve.stroke_width = 5
-        arrow_cone = Cone(show_base=True, base_radius=0.15, height=0.5, direction=[0, -np.sin(end+eps), np.cos(end+eps)]).shift([0, sphere_radius_expanded*np.cos(end+eps), sphere_radius_expanded*np.sin(end+eps)]).set_color(PINK)
+        arrow_cone = lod_cone(show_base=True, base_radius=0.15, height=0.5, direction=[0, -np.sin(end+eps), np.cos(end+eps)], zoom=.75).shift([0, sphere_radius_expanded*np.cos(end+eps), sphere_radius_expanded*np.sin(end+eps)]).set_color(PINK)
 
         
         self.play(
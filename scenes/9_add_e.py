@@ -2,13 +2,20 @@
 
 from manim import *
 from manim_voiceover import VoiceoverScene
-from manim_voiceover.services.recorder import RecorderService
 
 from math import sqrt
 
+from fixed_points import FixedPointIndex
+from lod import lod_sphere
+from orbit_accumulation import AccumulateOrbit, OrbitCloud, OrbitCounter
+from point_cloud import PointCloud, PointCloudScene, PointCloudThreeDScene
+from tex_geometry_cache import enable_tex_geometry_cache
+from voiceover_cache import IndexedRecorderService
+
 GOLDEN_RATIO = (1/2 + sqrt(5)/2)
 
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
+enable_tex_geometry_cache()
 
 def get_random_point_on_sphere(radius):
     rand_x = random.uniform(-1, 1)
@@ -16,22 +23,20 @@ def get_random_point_on_sphere(radius):
     rand_z = sqrt(1 - (rand_x**2 + rand_y**2)) * random.choice([-1, 1])
     return [radius * rand_x, radius * rand_y, radius * rand_z]
 
-points_of_D_coordinates = [
-    [1.705653589119117, -0.8576977742843473, 2.3141089779681403],
-    [0.9283384411680031, -2.097001251668247, -1.9341079311019767],
-    [-1.1434703478071881, 0.47170339618990065, 2.733124854394439],
-    [-1.370287035516874, 0.3107835017307966, 2.6506088084337005],
-    [2.005681072368484, 0.1257956769516082, 2.2274242711264267],
-    [0.4857349665773061, 0.9075533386404354, -2.8178730418112776],
-    [2.7715304818209487, -0.0906080364568918, -1.1447309605609381],
-    [1.1061345705914623, -0.592104294838423, -2.725046571304119],
-    [2.569263400349941, -0.3128280601590953, -1.516912714825529],
-    [1.1340220797792513, -0.8198574530133578, -2.653644226212623]
-]
-
-class AddE(VoiceoverScene, ThreeDScene):
+_POINTS_OF_D = {}
+
+def get_points_of_D(max_length=10, count=10):
+    # a finite sample of D: points fixed by some rotation of length at most
+    # max_length. Indexing them takes a second or two, so it is only done by
+    # the scenes that show them, once per process.
+    key = (max_length, count)
+    if key not in _POINTS_OF_D:
+        _POINTS_OF_D[key] = FixedPointIndex(max_length).sample(count, radius=3, seed=14)
+    return _POINTS_OF_D[key]
+
+class AddE(VoiceoverScene, PointCloudThreeDScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
         s = "Luckily we can classify exactly which points are causing this problem. These are precisely those points that are fixed by some rotation, like the one we just saw. This is the set D. A proof for this fact is not shown here; interested viewers are referred to the thesis that this video is based on."
 
         self.move_camera(phi=75 * DEGREES, theta=30 * DEGREES, zoom=.75, run_time=1.5)
@@ -48,16 +53,13 @@ class AddE(VoiceoverScene, ThreeDScene):
         self.wait(.5)
 
         sphere_radius = 3
-        sphere = Sphere(radius=sphere_radius, fill_opacity=.35).set_color(BLUE)
+        sphere = lod_sphere(radius=sphere_radius, zoom=.75, fill_opacity=.35).set_color(BLUE)
 
         s = "We are now ready to dive into the next step of the proof of the Banach-Tarski paradox, which will be to add the set D back to the decomposition."
         with self.voiceover(s):
             self.play(FadeIn(axes), FadeIn(x_label, y_label, z_label), Write(sphere))
 
-        points_of_D = VGroup()
-        for coordinates in points_of_D_coordinates:
-            p = Dot3D(coordinates, color=WHITE)
-            points_of_D.add(p)
+        points_of_D = PointCloud(get_points_of_D(), color=WHITE, radius=DEFAULT_DOT_RADIUS)
             
         s = "Let's see the points of D. D has infinitely many points, so we show a finite subset of D to represent all of D."
         with self.voiceover(s):
@@ -69,9 +71,9 @@ class AddE(VoiceoverScene, ThreeDScene):
         
         
 
-class ConstructingE(VoiceoverScene):
+class ConstructingE(VoiceoverScene, PointCloudScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         ax = Axes()
         self.add(ax)
@@ -81,7 +83,7 @@ class ConstructingE(VoiceoverScene):
         self.add(circle)
 
         points_of_D_twod = VGroup()
-        for coordinates in points_of_D_coordinates:
+        for coordinates in get_points_of_D():
             coordinates_2d = np.array([coordinates[0], coordinates[1], 0]) * circle_radius/3
             p = Dot(coordinates_2d, color=WHITE, radius=0.04)
             points_of_D_twod.add(p)
@@ -102,41 +104,32 @@ class ConstructingE(VoiceoverScene):
         rotation_counter = MathTex(r"{{ D }}").set_color(RED).to_edge(LEFT).shift(RIGHT)
         s = "We will be using this rotation phi to fix the gap of D. You're now seeing these rotations of phi being generated."
         initial_number_of_d_rotations = 16
-        D_dupes_groups = VGroup()
+        total_number_of_d_rotations = 100
+        D_dupes_groups = OrbitCloud(
+            [dot.get_center() for dot in points_of_D_twod], angle=GOLDEN_RATIO,
+            count=total_number_of_d_rotations, about_point=ORIGIN, dot_radius=0.04
+        )
+        phi_counter = OrbitCounter(r"\varphi", "D")
+        phi_counter.shift(rotation_counter.get_left() - phi_counter.get_left())
         with self.voiceover(s):
             self.play(points_of_D_twod.animate.set_color(RED))
             self.play(Create(rotation_counter))
-            for i in range(1, initial_number_of_d_rotations + 1):
-                rotation_counter_new = MathTex(r"\varphi^{" + f"{i}" + r"}({{ D }})").set_color_by_tex("D", RED).shift(rotation_counter.get_center())
-                dupe_group = points_of_D_twod.copy().set_color(WHITE)
-                self.play(
-                    *[Rotate(p, angle=GOLDEN_RATIO*i, axis=OUT, about_point=ORIGIN)for p in dupe_group],
-                    Transform(rotation_counter, rotation_counter_new),
-                    run_time = 0.75
-                )
-                self.wait(.2)
-                self.remove(rotation_counter)
-                rotation_counter = rotation_counter_new
-                D_dupes_groups.add(dupe_group)
+            self.remove(rotation_counter)
+            rotation_counter = phi_counter
+            self.play(
+                AccumulateOrbit(D_dupes_groups, 0, initial_number_of_d_rotations, counter=rotation_counter),
+                run_time = 0.95 * initial_number_of_d_rotations
+            )
         
         e_definition = MathTex(r"E = \bigcup_{n=0}^\infty \varphi^n(D)").to_corner(UP+RIGHT)
-        total_number_of_d_rotations = 100
         s = "We will define the set E as the union of D with all these repeated rotations phi n of D. Again, we can't show the infinite number of rotations of D, so we will just show a lot of them - also because it is quite mesmerizing to look at."
         with self.voiceover(s):
             self.play(FadeOut(phi_no_overlap))
             self.play(Write(e_definition))
-            for i in range(initial_number_of_d_rotations, total_number_of_d_rotations + 1):
-                rotation_counter_new = MathTex(r"\varphi^{" + f"{i}" + r"}({{ D }})").set_color_by_tex("D", RED).shift(rotation_counter.get_center())
-                dupe_group = points_of_D_twod.copy().set_color(WHITE)
-                self.play(
-                    *[Rotate(p, angle=GOLDEN_RATIO*i, axis=OUT, about_point=ORIGIN)for p in dupe_group],
-                    Transform(rotation_counter, rotation_counter_new),
-                    run_time = 0.1
-                )
-                self.wait(.2)
-                self.remove(rotation_counter)
-                rotation_counter = rotation_counter_new
-                D_dupes_groups.add(dupe_group)
+            self.play(
+                AccumulateOrbit(D_dupes_groups, initial_number_of_d_rotations, total_number_of_d_rotations, counter=rotation_counter),
+                run_time = 0.3 * (total_number_of_d_rotations - initial_number_of_d_rotations)
+            )
         
         e_rotated = MathTex(r"\varphi^{-1}(E \setminus D) = \varphi^{-1}(\bigcup_{n=1}^\infty \varphi^n(D)) = \bigcup_{n=0}^\infty \varphi^n(D) = E").to_edge(DOWN).shift(DOWN * 0.25)
         D_dupes_groups_blue = D_dupes_groups.copy().set_color(YELLOW)
@@ -192,7 +185,7 @@ class ConstructingE(VoiceoverScene):
 
 class EConclusionScene(VoiceoverScene):
     def construct(self):
-        self.set_speech_service(RecorderService(silence_threshold=-40.0))
+        self.set_speech_service(IndexedRecorderService(silence_threshold=-40.0))
 
         title = Title(r"Coming to a paradoxical decomposition of $S^2$")
         self.add(title)
@@ -0,0 +1,226 @@
+# The Cayley tree of F_2: the reduced words as nodes, with an edge from every
+# word to the words one component longer.
+#
+# CayleyTree holds the words level by level, together with the index of the
+# parent of every word in the previous level. The layouts turn that into one
+# array of positions per level, and CayleyTreeMobject draws it: the edges of
+# each branch are the subpaths of a single VMobject (and likewise the arrow
+# tips), and the labels are copies of cached MathTex, so deep trees don't turn
+# into thousands of separate mobjects.
+
+from manim import *
+
+from free_group import (
+    COMPONENTS,
+    SIGMA,
+    SIGMA_I,
+    TAU,
+    TAU_I,
+    WORD_DTYPE,
+    extend_words,
+    word_tex,
+)
+from tex_cache import cached_math_tex
+
+# the directions of the edges of each component in the fractal layout
+FRACTAL_DIRECTIONS = {SIGMA: RIGHT, TAU: UP, SIGMA_I: LEFT, TAU_I: DOWN}
+
+ROOT_BRANCH = -1
+
+class CayleyTree:
+    # The reduced words up to `depth`. If `branches` is given, only the words
+    # that are a prefix of (or equal to) one of the branch words get children,
+    # e.g. branches=[(SIGMA, TAU)] expands e, sigma and sigma tau.
+
+    def __init__(self, depth, branches=None):
+        self.depth = depth
+        self.levels = [np.zeros((1, 0), dtype=WORD_DTYPE)]
+        self.parents = [np.array([-1])]
+        branches = None if branches is None else [tuple(b) for b in branches]
+        while len(self.levels) <= depth:
+            words = self.levels[-1]
+            expanded = self._expanded(words, branches)
+            parents = np.flatnonzero(expanded)
+            if len(parents) == 0:
+                break
+            children_per_parent = 4 if words.shape[1] == 0 else 3
+            self.levels.append(extend_words(words[parents]))
+            self.parents.append(np.repeat(parents, children_per_parent))
+
+    @staticmethod
+    def _expanded(words, branches):
+        if branches is None:
+            return np.ones(len(words), dtype=bool)
+        length = words.shape[1]
+        expanded = np.zeros(len(words), dtype=bool)
+        for branch in branches:
+            if len(branch) >= length:
+                prefix = np.array(branch[:length], dtype=WORD_DTYPE)
+                expanded |= np.all(words == prefix, axis=1)
+        return expanded
+
+    def __len__(self):
+        return sum(len(words) for words in self.levels)
+
+    def words(self):
+        # every word, level by level
+        return [word for words in self.levels for word in words]
+
+    def leaf_counts(self):
+        # the number of leaves below every node (1 for a leaf), per level
+        counts = [np.ones(len(words), dtype=np.int64) for words in self.levels]
+        for level in range(len(self.levels) - 1, 0, -1):
+            below = np.bincount(
+                self.parents[level],
+                weights=counts[level],
+                minlength=len(self.levels[level - 1]),
+            ).astype(np.int64)
+            has_children = below > 0
+            counts[level - 1][has_children] = below[has_children]
+        return counts
+
+
+def level_layout(tree, width=7, level_height=1.5):
+    # Every level on its own row, and every node centred above its leaves, so
+    # a full tree has evenly spaced levels and partial trees stay compact.
+    counts = tree.leaf_counts()
+    total = counts[0][0]
+    starts = [np.zeros(1, dtype=np.int64)]
+    for level in range(1, len(tree.levels)):
+        parents = tree.parents[level]
+        ends = np.cumsum(counts[level])
+        # the leaves before a node within its siblings
+        first_sibling = np.searchsorted(parents, parents, side="left")
+        offset = ends - counts[level] - (ends - counts[level])[first_sibling]
+        starts.append(starts[-1][parents] + offset)
+    positions = []
+    for level, (start, count) in enumerate(zip(starts, counts)):
+        x = ((start + count / 2) / total - 0.5) * width
+        points = np.zeros((len(x), 3))
+        points[:, 0] = x
+        points[:, 1] = -level * level_height
+        positions.append(points)
+    return positions
+
+
+def fractal_layout(tree, edge_length=2, ratio=0.5):
+    # The classic picture: sigma goes right, tau up, and their inverses left and
+    # down, with every level ratio times shorter than the one above it.
+    directions = np.array([FRACTAL_DIRECTIONS[c] for c in COMPONENTS])
+    positions = [np.zeros((1, 3))]
+    for level in range(1, len(tree.levels)):
+        steps = directions[tree.levels[level][:, -1]]
+        length = edge_length * ratio ** (level - 1)
+        positions.append(positions[-1][tree.parents[level]] + length * steps)
+    return positions
+
+
+def _segments_to_points(starts, ends):
+    # straight lines as cubic bezier curves, 4 points per segment
+    t = np.array([0, 1 / 3, 2 / 3, 1])[None, :, None]
+    points = starts[:, None, :] + t * (ends - starts)[:, None, :]
+    return points.reshape(-1, 3)
+
+
+def _tip_points(ends, directions, tip_length):
+    # closed triangles pointing along `directions`, as 3 segments each
+    normals = np.zeros_like(directions)
+    normals[:, 0] = -directions[:, 1]
+    normals[:, 1] = directions[:, 0]
+    backs = ends - tip_length * directions
+    corner_1 = backs + tip_length / 2 * normals
+    corner_2 = backs - tip_length / 2 * normals
+    starts = np.stack([ends, corner_1, corner_2], axis=1).reshape(-1, 3)
+    stops = np.stack([corner_1, corner_2, ends], axis=1).reshape(-1, 3)
+    return _segments_to_points(starts, stops)
+
+
+class CayleyTreeMobject(VGroup):
+    # Labels for the nodes up to label_depth (all of them if None) and edges
+    # between them, shortened by buff at both ends. The edges and tips of every
+    # branch W(c) are one VMobject each; those leaving the root form their own
+    # branch, ROOT_BRANCH.
+
+    def __init__(
+        self,
+        tree,
+        positions,
+        label_depth=3,
+        font_size=DEFAULT_FONT_SIZE,
+        buff=0.3,
+        tip_length=0.2,
+        stroke_width=4,
+        color=WHITE,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.tree = tree
+        self.labels = {}
+        self.edges = {}
+        self.tips = {}
+
+        if label_depth is None:
+            label_depth = len(tree.levels) - 1
+        for level in range(min(label_depth, len(tree.levels) - 1) + 1):
+            for word, position in zip(tree.levels[level], positions[level]):
+                label = cached_math_tex(word_tex(word), font_size=font_size)
+                self.labels[tuple(int(c) for c in word)] = label.move_to(position)
+
+        starts, ends, branches, levels = [], [], [], []
+        for level in range(1, len(tree.levels)):
+            parents = tree.parents[level]
+            starts.append(positions[level - 1][parents])
+            ends.append(positions[level])
+            levels.append(np.full(len(parents), level))
+            if level == 1:
+                branches.append(np.full(len(parents), ROOT_BRANCH))
+            else:
+                branches.append(tree.levels[level][:, 0].astype(np.int64))
+        if starts:
+            starts, ends = np.concatenate(starts), np.concatenate(ends)
+            branches, levels = np.concatenate(branches), np.concatenate(levels)
+            directions = ends - starts
+            lengths = np.linalg.norm(directions, axis=1, keepdims=True)
+            directions = directions / np.where(lengths > 0, lengths, 1)
+            # only make room for the labels that are there, and never more
+            # than a third of the edge
+            start_buff = np.where(levels - 1 <= label_depth, buff, 0)[:, None]
+            end_buff = np.where(levels <= label_depth, buff, 0)[:, None]
+            starts = starts + np.minimum(start_buff, lengths / 3) * directions
+            ends = ends - np.minimum(end_buff, lengths / 3) * directions
+            for branch in (ROOT_BRANCH, *COMPONENTS):
+                mask = branches == branch
+                if not np.any(mask):
+                    continue
+                edges = VMobject(stroke_width=stroke_width, color=color)
+                edges.set_points(_segments_to_points(starts[mask], ends[mask]))
+                self.edges[branch] = edges
+                if tip_length:
+                    tips = VMobject(stroke_width=0, fill_color=color, fill_opacity=1)
+                    tip_lengths = np.minimum(tip_length, lengths[mask] / 3)
+                    tips.set_points(
+                        _tip_points(ends[mask], directions[mask], tip_lengths)
+                    )
+                    self.tips[branch] = tips
+
+        self.add(*self.labels.values())
+        for branch in self.edges:
+            self.add(self.edges[branch])
+            if branch in self.tips:
+                self.add(self.tips[branch])
+
+    def label(self, word):
+        return self.labels[tuple(int(c) for c in word)]
+
+    def branch_words(self, component):
+        # the labelled words of W(component), level by level
+        return [word for word in self.labels if word and word[0] == component]
+
+    def branch(self, component):
+        # the labels, edges and tips of W(component), without the edge into it
+        parts = [self.labels[word] for word in self.branch_words(component)]
+        if component in self.edges:
+            parts.append(self.edges[component])
+        if component in self.tips:
+            parts.append(self.tips[component])
+        return VGroup(*parts)
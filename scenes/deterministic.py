@@ -0,0 +1,95 @@
+# Scenes that hash the same on every render, so unchanged plays are read from
+# manim's partial movie cache instead of rendered again.
+#
+# A play is looked up in the cache by a hash of the camera, the animations and
+# the mobjects in the scene, so a play only hits the cache when all of these
+# come out the same as in an earlier render:
+#
+# - Random numbers: scenes that mix in DeterministicSceneMixin seed random and
+#   numpy.random through Scene's own random_seed when they are made, so they
+#   no longer depend on a random.seed() call at import time and on what ran
+#   between it and construct().
+# - Run settings: an updater or rate function that reads the global config
+#   hashes all of it, output file, -n range and media directory included, and
+#   a voiceover tracker hashes the path of the voiceover cache. These keys are
+#   left out of the hash, like manim leaves out the pixels of the camera.
+# - Sets: manim hashes a set as the word "set", so a mobject fixed in the frame
+#   of a ThreeDScene didn't change the hash of the camera. Sets are hashed as
+#   the sorted hashes of their members instead, each hashed on its own, so the
+#   order of the set doesn't matter either.
+
+from manim import *
+from manim.utils import hashing
+
+# the seed the scenes used at import time before
+DEFAULT_SEED = 14
+
+# config keys that differ between renders of the same frames
+RUN_KEYS = {
+    "_parser",
+    "cache_dir",
+    "disable_caching",
+    "dry_run",
+    "flush_cache",
+    "from_animation_number",
+    "images_dir",
+    "input_file",
+    "log_dir",
+    "max_files_cached",
+    "media_dir",
+    "output_file",
+    "partial_movie_dir",
+    "preview",
+    "progress_bar",
+    "save_last_frame",
+    "scene_names",
+    "sections_dir",
+    "tex_dir",
+    "text_dir",
+    "upto_animation_number",
+    "verbosity",
+    "video_dir",
+    "write_all",
+    "write_to_movie",
+}
+
+_encode = hashing._CustomEncoder.default
+
+
+def _hash_set(members):
+    # every member is hashed with the memo of what was already hashed as it
+    # was before the set, so which member came first makes no difference
+    memo = hashing._Memoizer._already_processed
+    before, after = set(memo), set(memo)
+    hashes = []
+    for member in members:
+        memo.clear()
+        memo.update(before)
+        hashes.append(hashing.get_json(member))
+        after |= memo
+    memo.clear()
+    memo.update(after)
+    return sorted(hashes)
+
+
+def _default(self, obj):
+    if isinstance(obj, (set, frozenset)):
+        return _hash_set(obj)
+    return _encode(self, obj)
+
+
+def enable_stable_hashing():
+    hashing.KEYS_TO_FILTER_OUT.update(RUN_KEYS)
+    hashing._CustomEncoder.default = _default
+
+
+class DeterministicSceneMixin:
+    # Put before the Scene class in the bases: class S(DeterministicSceneMixin,
+    # VoiceoverScene). Set random_seed on the scene to use another seed.
+
+    random_seed = DEFAULT_SEED
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("random_seed", type(self).random_seed)
+        enable_stable_hashing()
+        super().__init__(*args, **kwargs)
@@ -0,0 +1,206 @@
+# Exact arithmetic for sigma, tau and their products.
+#
+# Three times the matrix of sigma or tau has entries in Z[sqrt(2)], so a word
+# of length k is the matrix (A + B sqrt(2)) / 3^k for integer matrices A and B.
+# Everything here works on such (A, B) pairs, batched over a leading axis, so
+# comparing rotations or checking fixed points never goes through floats.
+#
+# Words are int8 arrays as in free_group. A batch of words of different
+# lengths can be padded with -1, which stands for the identity (3I / 3); the
+# denominator of every matrix in a batch is then 3^(number of columns).
+
+import numpy as np
+
+from free_group import (
+    CHILD_COMPONENTS,
+    COMPONENTS,
+    SIGMA,
+    SIGMA_I,
+    TAU,
+    TAU_I,
+    WORD_DTYPE,
+)
+
+SQRT_2 = np.sqrt(2)
+
+# |entries of A| and |entries of B| stay below 3^k, and the products below add
+# a few of those together, so int64 is safe up to this many components
+MAX_INT64_LENGTH = 36
+
+PADDING = -1
+
+INT64_MAX = np.iinfo(np.int64).max
+
+# index i holds 3 * (matrix of component i) split into its rational part and
+# its sqrt(2) part; index 4 is the identity used for padding
+LETTER_A = np.zeros((5, 3, 3), dtype=np.int64)
+LETTER_B = np.zeros((5, 3, 3), dtype=np.int64)
+LETTER_A[SIGMA] = LETTER_A[SIGMA_I] = np.diag([3, 1, 1])
+LETTER_A[TAU] = LETTER_A[TAU_I] = np.diag([1, 3, 1])
+LETTER_A[4] = 3 * np.identity(3, dtype=np.int64)
+LETTER_B[SIGMA] = [[0, 0, 0], [0, 0, -2], [0, 2, 0]]
+LETTER_B[TAU] = [[0, 0, 2], [0, 0, 0], [-2, 0, 0]]
+LETTER_B[SIGMA_I] = LETTER_B[SIGMA].T
+LETTER_B[TAU_I] = LETTER_B[TAU].T
+
+
+def exact_dtype(length):
+    # Python ints once 3^length no longer fits comfortably in an int64
+    return np.int64 if length <= MAX_INT64_LENGTH else object
+
+
+def exact_product(a_1, b_1, a_2, b_2):
+    # (A1 + B1 sqrt2)(A2 + B2 sqrt2) = (A1 A2 + 2 B1 B2) + (A1 B2 + B1 A2) sqrt2
+    return a_1 @ a_2 + 2 * (b_1 @ b_2), a_1 @ b_2 + b_1 @ a_2
+
+
+def _letters(components, dtype):
+    index = np.where(components == PADDING, 4, components)
+    return LETTER_A[index].astype(dtype), LETTER_B[index].astype(dtype)
+
+
+def exact_word_matrices(words):
+    # (A, B) for every row of `words`; the denominator is 3^words.shape[1]
+    words = np.atleast_2d(np.asarray(words, dtype=WORD_DTYPE))
+    number_of_words, length = words.shape
+    dtype = exact_dtype(length)
+    a = np.broadcast_to(LETTER_A[4] // 3, (number_of_words, 3, 3)).astype(dtype)
+    b = np.zeros((number_of_words, 3, 3), dtype=dtype)
+    for column in range(length):
+        a, b = exact_product(a, b, *_letters(words[:, column], dtype))
+    return a, b
+
+
+def iter_exact_levels(max_length):
+    # Yields (words, A, B) for the reduced words of every length from 1 up to
+    # max_length. Each level is one batched product with the previous one.
+    words = np.array(COMPONENTS, dtype=WORD_DTYPE)[:, None]
+    a, b = LETTER_A[:4].copy(), LETTER_B[:4].copy()
+    yield words, a, b
+    for length in range(2, max_length + 1):
+        dtype = exact_dtype(length)
+        children = CHILD_COMPONENTS[words[:, -1]].reshape(-1)
+        words = np.concatenate([np.repeat(words, 3, axis=0), children[:, None]], axis=1)
+        a, b = exact_product(
+            np.repeat(a.astype(dtype), 3, axis=0),
+            np.repeat(b.astype(dtype), 3, axis=0),
+            *_letters(children, dtype),
+        )
+        yield words, a, b
+
+
+def denominator(length):
+    return 3**length if length > MAX_INT64_LENGTH else np.int64(3) ** length
+
+
+def scaled_identity(length):
+    # 3^length I, the numerator of the identity rotation
+    return denominator(length) * np.identity(3, dtype=exact_dtype(length))
+
+
+def is_identity(a, b, length):
+    identity = scaled_identity(length)
+    return np.all(b == 0, axis=(-2, -1)) & np.all(a == identity, axis=(-2, -1))
+
+
+def pad_words(words, length):
+    padded = np.full((len(words), length), PADDING, dtype=WORD_DTYPE)
+    for i, word in enumerate(words):
+        padded[i, : len(word)] = word
+    return padded
+
+
+def same_rotation(word_1, word_2):
+    length = max(len(word_1), len(word_2))
+    a, b = exact_word_matrices(pad_words([word_1, word_2], length))
+    return bool(np.all(a[0] == a[1]) and np.all(b[0] == b[1]))
+
+
+def find_relations(max_length):
+    # Reduced words up to max_length that are the identity rotation. Since sigma
+    # and tau generate a free group, this should always come back empty.
+    relations = []
+    for words, a, b in iter_exact_levels(max_length):
+        relations.extend(words[is_identity(a, b, words.shape[1])])
+    return relations
+
+
+def to_float(a, b, length):
+    return (a.astype(float) + SQRT_2 * b.astype(float)) / 3.0**length
+
+
+def _antisymmetric_part(m):
+    return np.stack(
+        [
+            m[..., 2, 1] - m[..., 1, 2],
+            m[..., 0, 2] - m[..., 2, 0],
+            m[..., 1, 0] - m[..., 0, 1],
+        ],
+        axis=-1,
+    )
+
+
+def exact_axes(a, b, length):
+    # An (unnormalised) axis of every rotation, as vectors (a + b sqrt2). The
+    # antisymmetric part gives the axis unless the rotation is a half turn, in
+    # which case M + I has the axis as its columns.
+    axis_a = _antisymmetric_part(a)
+    axis_b = _antisymmetric_part(b)
+    symmetric = np.all(axis_a == 0, axis=-1) & np.all(axis_b == 0, axis=-1)
+    if np.any(symmetric):
+        plus_identity = a[symmetric] + scaled_identity(length)
+        b_symmetric = b[symmetric]
+        nonzero = np.any(plus_identity != 0, axis=-2) | np.any(
+            b_symmetric != 0, axis=-2
+        )
+        column = np.argmax(nonzero, axis=-1)
+        rows = np.arange(len(column))
+        axis_a[symmetric] = plus_identity[rows, :, column]
+        axis_b[symmetric] = b_symmetric[rows, :, column]
+    return axis_a, axis_b
+
+
+def _largest(*arrays):
+    # the largest absolute entry of the arrays, as a Python int
+    sizes = [int(np.max(np.abs(array))) for array in arrays if np.size(array)]
+    return max(sizes, default=0)
+
+
+def _exact_arrays(bound, *arrays):
+    # the arrays as int64 if no value computed from them exceeds bound, and as
+    # Python ints otherwise
+    dtype = np.int64 if bound <= INT64_MAX else object
+    return [np.asarray(array).astype(dtype) for array in arrays]
+
+
+def exact_cross(u_a, u_b, v_a, v_b):
+    return (
+        np.cross(u_a, v_a) + 2 * np.cross(u_b, v_b),
+        np.cross(u_a, v_b) + np.cross(u_b, v_a),
+    )
+
+
+def same_axis(u_a, u_b, v_a, v_b):
+    # whether two axes (a + b sqrt2) span the same line; every entry of the
+    # cross product adds up to six products of an entry of u and one of v
+    bound = 6 * _largest(u_a, u_b) * _largest(v_a, v_b)
+    u_a, u_b, v_a, v_b = _exact_arrays(bound, u_a, u_b, v_a, v_b)
+    cross_a, cross_b = exact_cross(u_a, u_b, v_a, v_b)
+    return np.all(cross_a == 0, axis=-1) & np.all(cross_b == 0, axis=-1)
+
+
+def fixes_point(a, b, length, point_a, point_b=None):
+    # Whether each rotation fixes the point (point_a + point_b sqrt2). Any common
+    # denominator of the point cancels, so integer vectors are enough. Every
+    # entry of the image adds up nine products of an entry below 3^length and
+    # one of the point, which decides whether int64 is enough.
+    if point_b is None:
+        point_b = np.zeros(3, dtype=np.int64)
+    bound = 9 * 3**length * _largest(point_a, point_b)
+    a, b, point_a, point_b = _exact_arrays(bound, a, b, point_a, point_b)
+    scale = 3**length if a.dtype == object else np.int64(3) ** length
+    image_a = a @ point_a + 2 * (b @ point_b)
+    image_b = a @ point_b + b @ point_a
+    return np.all(image_a == scale * point_a, axis=-1) & np.all(
+        image_b == scale * point_b, axis=-1
+    )
@@ -3,16 +3,12 @@ from manim_voiceover import VoiceoverScene
 from manim.utils.color import Colors
 import random
 from math import sqrt, acos
+from free_group import SIGMA, TAU, SIGMA_I, TAU_I
+from lod import lod_cone, lod_dot3d, lod_parametric_function, lod_sphere
 
 config.background_color = rgb_to_color([28/255, 35/255, 31/255])
 random.seed(14)
 
-SIGMA = 0
-TAU = 1
-SIGMA_I = 2
-TAU_I = 3
-
-
 def get_random_point_on_sphere(radius):
     rand_x = random.uniform(-1, 1)
     rand_y = random.uniform(-sqrt(1 - rand_x**2), sqrt(1 - rand_x**2))
@@ -23,54 +19,6 @@ def get_point_string(point):
     x, y, z = point.get_center()
     return f"({x:.2f}, {y:.2f}, {z:.2f})"
 
-def axis_angle_from_rotation_component(component):
-    axis_of_rotation = RIGHT
-    rotation_angle = 0
-    if component == SIGMA:
-        axis_of_rotation = RIGHT
-        rotation_angle = acos(1/3)
-    elif component == SIGMA_I:
-        axis_of_rotation = RIGHT
-        rotation_angle = -acos(1/3)
-    elif component == TAU:
-        axis_of_rotation = UP
-        rotation_angle = acos(1/3)
-    elif component == TAU_I:
-        axis_of_rotation = UP
-        rotation_angle = -acos(1/3)
-    return axis_of_rotation, rotation_angle
-
-rotation_translation_dict = {
-    SIGMA: r"\sigma",
-    SIGMA_I: r"\sigma^{-1}",
-    TAU: r"\tau",
-    TAU_I: r"\tau^{-1}", 
-}
-
-
-def generate_random_rotations_with_labels(n):
-    rotations = []
-    for i in range (n):
-        rotation_components = []
-        rotation_label = ""
-        number_of_components = random.randint(2, 7)
-        for i in range(number_of_components): # generate components
-            rotation = random.randint(0,3)
-            if i >= 1:
-                last_rotation = rotation_components[-1]
-                # keep generating a new rotation component until it doesn't reduce the rotation
-                while (
-                    (rotation == SIGMA and last_rotation == SIGMA_I)
-                    or (rotation == SIGMA_I and last_rotation == SIGMA)
-                    or (rotation == TAU and last_rotation == TAU_I)
-                    or (rotation == TAU_I and last_rotation == TAU)
-                ):
-                    rotation = random.randint(0,3)
-            rotation_components.append(rotation)
-            rotation_label += rotation_translation_dict[rotation]
-        rotations.append((rotation_components, rotation_label))
-    return rotations
-
 # sigma along x-axis
 # tau along y-axis
 
@@ -90,13 +38,13 @@ def generate_rotation_arrow(start_point, sphere_radius, rotation_comp, color=BLA
 
     # create arrow curve
     if rotation_comp in (SIGMA, SIGMA_I):
-        arrow_curve = ParametricFunction(
+        arrow_curve = lod_parametric_function(
             sigma_lambda, color=color, t_range=[start, end],
         ).set_shade_in_3d(True)
         arrow_curve.stroke_width = 5
         result.add(arrow_curve)
     elif rotation_comp in (TAU, TAU_I):
-        arrow_curve = ParametricFunction(
+        arrow_curve = lod_parametric_function(
             tau_lambda, color=color, t_range=[start, end],
         ).set_shade_in_3d(True)
         arrow_curve.stroke_width = 5
@@ -119,7 +67,7 @@ def generate_rotation_arrow(start_point, sphere_radius, rotation_comp, color=BLA
     elif rotation_comp == TAU_I:
         direction = tau_direction_lambda(-np.cos(1/3))
         end_point = start_point_location + tau_lambda(-np.cos(1/3) + eps)
-    arrow_cone = Cone(show_base=True, base_radius=0.15, height=0.5, direction=direction).shift(end_point).set_color(color)
+    arrow_cone = lod_cone(show_base=True, base_radius=0.15, height=0.5, direction=direction).shift(end_point).set_color(color)
     result.add(arrow_cone)
 
     return result
@@ -155,9 +103,9 @@ class ArrowTest(ThreeDScene):
         self.wait(.5)
 
         sphere_radius = 3
-        sphere = Sphere(radius=sphere_radius, fill_opacity=.35).set_color(BLUE)
+        sphere = lod_sphere(radius=sphere_radius, zoom=.75, fill_opacity=.35).set_color(BLUE)
 
-        dot = Dot3D(np.array([3, 0, 0]))
+        dot = lod_dot3d(np.array([3, 0, 0]), zoom=.75)
         arrow = generate_rotation_arrow(dot, sphere_radius, SIGMA)
         self.play(Write(sphere))
         self.play(FadeIn(arrow))
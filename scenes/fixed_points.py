@@ -0,0 +1,171 @@
+# The set D of points on the sphere that are fixed by some rotation in
+# G(sigma, tau).
+#
+# Every rotation other than the identity fixes exactly two points of the unit
+# sphere, the two unit vectors along its axis. The axes of all reduced words up
+# to some length come from one batched eigendecomposition per level: the
+# eigenvector for the eigenvalue 1. Many words share an axis (w, w^{-1}, w^2,
+# conjugates that happen to agree, ...), so the axes are deduplicated by
+# hashing them into a grid of cubes of side `resolution`. The same grid answers
+# "which words fix this point" by looking at the cube of the point and its
+# neighbours, independent of how many points are stored.
+
+from itertools import product
+
+import numpy as np
+
+from free_group import WORD_DTYPE, iter_word_matrix_levels
+
+DEFAULT_RESOLUTION = 1e-7
+# as a fraction of the resolution
+BOUNDARY_MARGIN = 0.01
+
+# offsets of a cube of a grid and the 26 cubes around it
+NEIGHBOURS = np.array(list(product((-1, 0, 1), repeat=3)), dtype=np.int64)
+
+
+def rotation_axes(matrices):
+    # A unit vector along the axis of each rotation; the sign is arbitrary. For
+    # a real eigenvalue, LAPACK returns a real eigenvector.
+    values, vectors = np.linalg.eig(matrices)
+    index = np.argmin(np.abs(values - 1), axis=-1)
+    axes = np.take_along_axis(vectors, index[:, None, None], axis=-1)[..., 0].real
+    return axes / np.linalg.norm(axes, axis=-1, keepdims=True)
+
+
+def iter_axis_levels(max_length):
+    # Yields (words, axes) for every length from 1 up to max_length
+    for words, matrices in iter_word_matrix_levels(max_length):
+        yield words, rotation_axes(matrices)
+
+
+def _cell_keys(points, resolution):
+    return np.floor(np.asarray(points) / resolution).astype(np.int64)
+
+
+def _find(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+class FixedPointIndex:
+    # The points of D found among the axes of the reduced words up to
+    # max_length, each with the words that fix it.
+
+    def __init__(self, max_length, resolution=DEFAULT_RESOLUTION):
+        self.max_length = max_length
+        self.resolution = resolution
+
+        levels = list(iter_axis_levels(max_length))
+        number_of_words = sum(len(words) for words, _ in levels)
+        self.words = np.full((number_of_words, max_length), -1, dtype=WORD_DTYPE)
+        self.lengths = np.zeros(number_of_words, dtype=np.int64)
+        start = 0
+        for words, _ in levels:
+            self.words[start : start + len(words), : words.shape[1]] = words
+            self.lengths[start : start + len(words)] = words.shape[1]
+            start += len(words)
+        axes = np.concatenate([axes for _, axes in levels] or [np.zeros((0, 3))])
+
+        # both ends of every axis are fixed points
+        entry_points = np.concatenate([axes, -axes])
+        entry_words = np.tile(np.arange(number_of_words), 2)
+
+        keys, entry_cells = np.unique(
+            _cell_keys(entry_points, resolution), axis=0, return_inverse=True
+        )
+        entry_cells = entry_cells.reshape(-1)
+        cell_ids = {tuple(key): i for i, key in enumerate(keys.tolist())}
+
+        # copies of one point that lie on either side of a face of the grid end
+        # up in neighbouring cubes; merge the cubes of points close to a face
+        scaled = entry_points / resolution
+        fraction = scaled - np.floor(scaled)
+        margin = np.minimum(fraction, 1 - fraction).min(axis=-1)
+        parents = list(range(len(keys)))
+        merged = set()
+        for i in np.unique(entry_cells[margin < BOUNDARY_MARGIN]).tolist():
+            for neighbour in (keys[i] + NEIGHBOURS).tolist():
+                j = cell_ids.get(tuple(neighbour))
+                if j is not None and j != i:
+                    parents[_find(parents, i)] = _find(parents, j)
+                    merged.update((i, j))
+        roots = np.arange(len(keys))
+        for i in merged:
+            roots[i] = _find(parents, i)
+        _, cell_points = np.unique(roots, return_inverse=True)
+        cell_points = cell_points.reshape(-1)
+        entry_point_ids = cell_points[entry_cells]
+
+        number_of_points = int(cell_points.max()) + 1 if len(keys) else 0
+        order = np.argsort(entry_point_ids, kind="stable")
+        counts = np.bincount(entry_point_ids, minlength=number_of_points)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._entry_words = entry_words[order]
+
+        # the shortest word fixing a point gives its most accurate position
+        shortest = self._offsets[:-1][counts > 0]
+        self.points = entry_points[order][shortest]
+        self._cells = {key: int(cell_points[i]) for key, i in cell_ids.items()}
+
+    def __len__(self):
+        return len(self.points)
+
+    def _word_indices(self, point_id, max_length):
+        indices = self._entry_words[
+            self._offsets[point_id] : self._offsets[point_id + 1]
+        ]
+        if max_length is not None:
+            indices = indices[self.lengths[indices] <= max_length]
+        return indices
+
+    def fixing_words(self, point_id, max_length=None):
+        return [
+            self.words[i, : self.lengths[i]]
+            for i in self._word_indices(point_id, max_length)
+        ]
+
+    def nearest_points(self, point, tolerance=None):
+        # ids of the stored points within tolerance of the direction of `point`
+        tolerance = 2 * self.resolution if tolerance is None else tolerance
+        point = np.asarray(point, dtype=float)
+        point = point / np.linalg.norm(point)
+        candidates = set()
+        key = _cell_keys(point, self.resolution)
+        reach = max(1, int(np.ceil(tolerance / self.resolution)))
+        offsets = NEIGHBOURS
+        if reach > 1:
+            offsets = product(range(-reach, reach + 1), repeat=3)
+        for offset in offsets:
+            point_id = self._cells.get(tuple((key + offset).tolist()))
+            if point_id is not None:
+                candidates.add(point_id)
+        return [
+            point_id
+            for point_id in sorted(candidates)
+            if np.linalg.norm(self.points[point_id] - point) <= tolerance
+        ]
+
+    def words_fixing(self, point, max_length=None, tolerance=None):
+        # The reduced words up to max_length (or the depth of the index) that
+        # fix `point`, shortest first. `point` doesn't need to be a unit vector.
+        indices = np.concatenate(
+            [
+                self._word_indices(point_id, max_length)
+                for point_id in self.nearest_points(point, tolerance)
+            ]
+            or [np.zeros(0, dtype=np.int64)]
+        )
+        indices = indices[np.argsort(self.lengths[indices], kind="stable")]
+        return [self.words[i, : self.lengths[i]] for i in indices]
+
+    def is_fixed(self, point, tolerance=None):
+        return len(self.nearest_points(point, tolerance)) > 0
+
+    def sample(self, count, radius=1, seed=None):
+        # `count` distinct points of D on the sphere of `radius`
+        rng = np.random.default_rng(seed)
+        chosen = rng.choice(len(self), size=min(count, len(self)), replace=False)
+        return self.points[np.sort(chosen)] * radius
@@ -0,0 +1,242 @@
+# Words in the free group F_2 generated by sigma and tau, and the rotations of
+# R^3 that they stand for.
+#
+# A word is stored as an int8 array of components in reading order, so
+# [SIGMA, TAU_I] is the word sigma tau^{-1}. As a rotation, the rightmost
+# component acts first: sigma tau^{-1} takes p to sigma(tau^{-1}(p)).
+
+import random
+from math import acos, sqrt
+
+import numpy as np
+
+SIGMA = 0
+TAU = 1
+SIGMA_I = 2
+TAU_I = 3
+
+COMPONENTS = (SIGMA, TAU, SIGMA_I, TAU_I)
+WORD_DTYPE = np.int8
+
+# sigma along x-axis
+# tau along y-axis
+ROTATION_ANGLE = acos(1 / 3)
+
+rotation_translation_dict = {
+    SIGMA: r"\sigma",
+    SIGMA_I: r"\sigma^{-1}",
+    TAU: r"\tau",
+    TAU_I: r"\tau^{-1}",
+}
+
+_COS = 1 / 3
+_SIN = 2 * sqrt(2) / 3
+
+# index i holds the matrix of component i
+COMPONENT_MATRICES = np.array(
+    [
+        [[1, 0, 0], [0, _COS, -_SIN], [0, _SIN, _COS]],
+        [[_COS, 0, _SIN], [0, 1, 0], [-_SIN, 0, _COS]],
+        [[1, 0, 0], [0, _COS, _SIN], [0, -_SIN, _COS]],
+        [[_COS, 0, -_SIN], [0, 1, 0], [_SIN, 0, _COS]],
+    ]
+)
+COMPONENT_MATRICES.flags.writeable = False
+
+# the components that can follow component i without the word reducing
+CHILD_COMPONENTS = np.array(
+    [[c for c in COMPONENTS if c != (parent + 2) % 4] for parent in COMPONENTS],
+    dtype=WORD_DTYPE,
+)
+
+
+def inverse_component(component):
+    return (component + 2) % 4
+
+
+def axis_angle_from_rotation_component(component):
+    axis_of_rotation = np.array([1.0, 0.0, 0.0])
+    rotation_angle = 0
+    if component in (SIGMA, SIGMA_I):
+        axis_of_rotation = np.array([1.0, 0.0, 0.0])
+    elif component in (TAU, TAU_I):
+        axis_of_rotation = np.array([0.0, 1.0, 0.0])
+    if component in (SIGMA, TAU):
+        rotation_angle = ROTATION_ANGLE
+    elif component in (SIGMA_I, TAU_I):
+        rotation_angle = -ROTATION_ANGLE
+    return axis_of_rotation, rotation_angle
+
+
+def axis_angle_path(word):
+    # the (axis, angle) rotations that make up `word`, in the order they act
+    return [axis_angle_from_rotation_component(c) for c in reversed(word)]
+
+
+def reduce_word(components):
+    reduced = []
+    for component in components:
+        if reduced and reduced[-1] == inverse_component(component):
+            reduced.pop()
+        else:
+            reduced.append(int(component))
+    return np.array(reduced, dtype=WORD_DTYPE)
+
+
+def inverse_word(word):
+    return np.array([inverse_component(c) for c in reversed(word)], dtype=WORD_DTYPE)
+
+
+def word_label(word):
+    return "".join(rotation_translation_dict[int(c)] for c in word)
+
+
+def word_tex(word):
+    # LaTeX for `word` with repeated components written as powers, e.g.
+    # sigma tau^2 sigma^{-1}; "e" for the empty word
+    if len(word) == 0:
+        return "e"
+    runs = []
+    for component in word:
+        component = int(component)
+        if runs and runs[-1][0] == component:
+            runs[-1][1] += 1
+        else:
+            runs.append([component, 1])
+    tex = ""
+    for component, power in runs:
+        base = r"\sigma" if component in (SIGMA, SIGMA_I) else r"\tau"
+        if component in (SIGMA_I, TAU_I):
+            power = -power
+        tex += base if power == 1 else f"{base}^{{{power}}}"
+    return tex
+
+
+def extend_words(words):
+    # All reduced words one component longer than the rows of `words`, as an
+    # array with three children per row (four for the empty word).
+    words = np.asarray(words, dtype=WORD_DTYPE)
+    if words.shape[1] == 0:
+        return np.array(COMPONENTS, dtype=WORD_DTYPE)[:, None]
+    children = CHILD_COMPONENTS[words[:, -1]]
+    parents = np.repeat(words, 3, axis=0)
+    return np.concatenate([parents, children.reshape(-1, 1)], axis=1)
+
+
+def iter_reduced_words(max_length, prefix=()):
+    # Yields the reduced words that start with `prefix`, one array per length
+    # from len(prefix) (or 1 for the empty prefix) up to max_length. The words
+    # of each length are built from those of the previous length.
+    words = reduce_word(prefix)[None, :]
+    if len(prefix) and len(words[0]) != len(prefix):
+        raise ValueError(f"prefix {list(prefix)} is not a reduced word")
+    if len(prefix):
+        yield words
+    while words.shape[1] < max_length:
+        words = extend_words(words)
+        yield words
+
+
+def reduced_words(length, prefix=()):
+    words = reduce_word(prefix)[None, :]
+    for words in iter_reduced_words(length, prefix):
+        pass
+    return words
+
+
+def iter_word_matrix_levels(max_length, prefix=()):
+    # Like iter_reduced_words, but also yields the matrices of the words. Each
+    # level of matrices is one batched product with the previous level.
+    words = reduce_word(prefix)[None, :]
+    if len(prefix) and len(words[0]) != len(prefix):
+        raise ValueError(f"prefix {list(prefix)} is not a reduced word")
+    matrices = word_matrix(words[0])[None]
+    if len(prefix):
+        yield words, matrices
+    while words.shape[1] < max_length:
+        if words.shape[1] == 0:
+            children = np.array(COMPONENTS, dtype=WORD_DTYPE)
+            matrices = COMPONENT_MATRICES.copy()
+        else:
+            children = CHILD_COMPONENTS[words[:, -1]].reshape(-1)
+            matrices = np.repeat(matrices, 3, axis=0) @ COMPONENT_MATRICES[children]
+        words = extend_words(words)
+        yield words, matrices
+
+
+def number_of_reduced_words(length):
+    return 1 if length == 0 else 4 * 3 ** (length - 1)
+
+
+class _TrieNode:
+    __slots__ = ("matrix", "children")
+
+    def __init__(self, matrix):
+        matrix.flags.writeable = False
+        self.matrix = matrix
+        self.children = [None, None, None, None]
+
+
+class WordMatrixTrie:
+    # Prefix trie of composed rotation matrices. Every node holds the matrix of
+    # the word spelled out by the path to it, so a lookup reuses the products of
+    # all cached prefixes and costs one 3x3 product per component that isn't
+    # cached yet.
+
+    def __init__(self):
+        self.root = _TrieNode(np.identity(3))
+        self.size = 1
+
+    def matrix(self, word):
+        node = self.root
+        for component in word:
+            child = node.children[component]
+            if child is None:
+                child = _TrieNode(node.matrix @ COMPONENT_MATRICES[component])
+                node.children[component] = child
+                self.size += 1
+            node = child
+        return node.matrix
+
+    def matrices(self, words):
+        if len(words) == 0:
+            return np.zeros((0, 3, 3))
+        return np.stack([self.matrix(word) for word in words])
+
+    def clear(self):
+        self.root = _TrieNode(np.identity(3))
+        self.size = 1
+
+
+WORD_MATRICES = WordMatrixTrie()
+
+
+def word_matrix(word):
+    return WORD_MATRICES.matrix(word)
+
+
+def apply_word(word, points):
+    # rotate an (n, 3) array of points by `word` with a single matrix product
+    points = np.asarray(points)
+    matrix = word_matrix(word)
+    if np.issubdtype(points.dtype, np.floating):
+        matrix = matrix.astype(points.dtype, copy=False)
+    return points @ matrix.T
+
+
+def generate_random_rotations_with_labels(n):
+    rotations = []
+    for i in range(n):
+        rotation_components = []
+        number_of_components = random.randint(2, 7)
+        for i in range(number_of_components):  # generate components
+            rotation = random.randint(0, 3)
+            if i >= 1:
+                last_rotation = rotation_components[-1]
+                # keep generating a new rotation component until it doesn't reduce the rotation
+                while rotation == inverse_component(last_rotation):
+                    rotation = random.randint(0, 3)
+            rotation_components.append(rotation)
+        word = np.array(rotation_components, dtype=WORD_DTYPE)
+        rotations.append((word, word_label(word)))
+    return rotations
@@ -0,0 +1,189 @@
+# Level of detail for the curved 3D shapes: tessellations that are as fine as
+# the output resolution and the size of the object on screen need, and no finer.
+#
+# The number of segments around a curved outline is chosen so the polygon stays
+# within MAX_OUTLINE_ERROR pixels of the true outline, up to the resolution
+# the shape had before. Renders of FINAL_PIXEL_WIDTH and up keep that
+# resolution (and the step of their curves), so final renders are unchanged,
+# while drafts get far fewer faces. Each shape is tessellated once per
+# resolution at unit size, and later requests copy it.
+
+from manim import *
+
+# how far a tessellated outline may be from the true one, in pixels
+MAX_OUTLINE_ERROR = 2.5
+# never fewer segments than this for a full turn
+MIN_SEGMENTS = 6
+
+# the default (and finest) resolutions
+SPHERE_RESOLUTION = (24, 12)
+DOT3D_RESOLUTION = (8, 8)
+CONE_RESOLUTION = 32
+
+# output width from which shapes and curves keep their original resolution
+FINAL_PIXEL_WIDTH = 1920
+# length in pixels of the pieces of a smoothed parametric curve
+CURVE_SEGMENT_PIXELS = 24
+MIN_CURVE_SEGMENTS = 4
+DEFAULT_CURVE_STEP = 0.01
+# samples used to measure the length of a parametric curve
+CURVE_SAMPLES = 65
+
+# the default focal distance of ThreeDCamera
+FOCAL_DISTANCE = 20.0
+
+_PROTOTYPES = {}
+
+
+def pixels_per_unit(zoom=1):
+    return zoom * config.pixel_width / config.frame_width
+
+
+def perspective(distance):
+    # how much the 3D camera enlarges something `distance` from the origin
+    # when it is as close to the camera as it can be
+    return FOCAL_DISTANCE / max(FOCAL_DISTANCE - distance, 1.0)
+
+
+def projected_radius(radius, zoom=1, distance=0):
+    # the largest radius in pixels a ball of `radius` centred `distance` from
+    # the origin can have on screen
+    return radius * pixels_per_unit(zoom) * perspective(distance + radius)
+
+
+def outline_segments(radius_pixels, turn=TAU, maximum=None):
+    # segments for an arc of angle `turn` on a circle of radius_pixels; a chord
+    # spanning an angle a is about radius_pixels * a**2 / 8 from the arc
+    minimum = int(np.ceil(MIN_SEGMENTS * turn / TAU))
+    if radius_pixels <= 0:
+        segments = minimum
+    else:
+        angle = np.sqrt(8 * MAX_OUTLINE_ERROR / radius_pixels)
+        segments = max(int(np.ceil(turn / angle)), minimum)
+    return segments if maximum is None else min(segments, maximum)
+
+
+def sphere_resolution(radius, zoom=1, distance=0, maximum=SPHERE_RESOLUTION):
+    # final renders keep the resolution the sphere had, drafts may go lower
+    if config.pixel_width >= FINAL_PIXEL_WIDTH:
+        return tuple(maximum)
+    radius_pixels = projected_radius(radius, zoom, distance)
+    return (
+        outline_segments(radius_pixels, TAU, maximum[0]),
+        outline_segments(radius_pixels, PI, maximum[1]),
+    )
+
+
+def cone_resolution(base_radius, height, zoom=1, distance=0):
+    # The sides of a cone are straight, so one face from apex to base is exact;
+    # only the way around needs segments.
+    radius_pixels = projected_radius(base_radius, zoom, distance + height)
+    return (1, outline_segments(radius_pixels, TAU, CONE_RESOLUTION))
+
+
+def curve_step(function, t_range, zoom=1):
+    # The t_step for a ParametricFunction over t_range, from its length on
+    # screen. The samples are smoothed into bezier curves, so a few pixels
+    # per piece are plenty. Final renders keep the step of t_range (or the
+    # default); drafts may be coarser, never finer.
+    t_min, t_max = t_range[:2]
+    default_step = t_range[2] if len(t_range) > 2 else DEFAULT_CURVE_STEP
+    if config.pixel_width >= FINAL_PIXEL_WIDTH:
+        return default_step
+    samples = np.array(
+        [function(t) for t in np.linspace(t_min, t_max, CURVE_SAMPLES)], dtype=float
+    )
+    length = np.linalg.norm(np.diff(samples, axis=0), axis=1).sum()
+    distance = np.linalg.norm(samples, axis=1).max()
+    pixels = length * pixels_per_unit(zoom) * perspective(distance)
+    segments = max(int(np.ceil(pixels / CURVE_SEGMENT_PIXELS)), MIN_CURVE_SEGMENTS)
+    return max((t_max - t_min) / segments, default_step)
+
+
+def _prototype(shape, resolution, *args, **kwargs):
+    # a copy of the unit-sized shape at this resolution
+    key = (shape, resolution, args, tuple(sorted(kwargs.items())))
+    if key not in _PROTOTYPES:
+        _PROTOTYPES[key] = shape(*args, resolution=resolution, **kwargs)
+    return _PROTOTYPES[key].copy()
+
+
+def _style_surface(
+    surface,
+    fill_color=None,
+    fill_opacity=None,
+    checkerboard_colors=None,
+    stroke_color=None,
+    stroke_width=None,
+):
+    # the style Surface.__init__ would have given the faces
+    if fill_opacity is not None:
+        surface.fill_opacity = fill_opacity
+    if checkerboard_colors is not None:
+        surface.checkerboard_colors = checkerboard_colors
+    if fill_color is not None:
+        surface.fill_color = ManimColor(fill_color)
+        surface.set_fill(surface.fill_color, opacity=surface.fill_opacity)
+    if surface.checkerboard_colors:
+        surface.set_fill_by_checkerboard(
+            *surface.checkerboard_colors, opacity=surface.fill_opacity
+        )
+    else:
+        surface.set_fill(opacity=surface.fill_opacity)
+    if stroke_color is not None or stroke_width is not None:
+        surface.set_stroke(color=stroke_color, width=stroke_width)
+    return surface
+
+
+def lod_sphere(
+    center=ORIGIN,
+    radius=1,
+    zoom=1,
+    resolution=None,
+    maximum=SPHERE_RESOLUTION,
+    **kwargs,
+):
+    # Sphere(center, radius, **kwargs) with a resolution for its size on screen,
+    # at most `maximum` (the resolution the sphere had before)
+    if resolution is None:
+        resolution = sphere_resolution(
+            radius, zoom, np.linalg.norm(center), maximum=maximum
+        )
+    sphere = _prototype(Sphere, tuple(resolution))
+    sphere.scale(radius, about_point=ORIGIN)
+    sphere.radius = radius
+    return _style_surface(sphere, **kwargs).shift(center)
+
+
+def lod_dot3d(point=ORIGIN, radius=DEFAULT_DOT_RADIUS, color=WHITE, zoom=1, **kwargs):
+    resolution = sphere_resolution(
+        radius, zoom, np.linalg.norm(point), maximum=DOT3D_RESOLUTION
+    )
+    dot = _prototype(Dot3D, resolution, radius=1)
+    dot.scale(radius, about_point=ORIGIN)
+    dot.radius = radius
+    return _style_surface(dot, **kwargs).set_color(color).shift(point)
+
+
+def lod_cone(
+    base_radius=1, height=1, direction=Z_AXIS, show_base=False, zoom=1, **kwargs
+):
+    # Cone(base_radius, height, direction, show_base, **kwargs), stretched from
+    # a unit cone pointing out of the screen
+    resolution = cone_resolution(base_radius, height, zoom)
+    cone = _prototype(Cone, resolution, show_base=show_base)
+    cone.stretch(base_radius, 0, about_point=ORIGIN)
+    cone.stretch(base_radius, 1, about_point=ORIGIN)
+    cone.stretch(height, 2, about_point=ORIGIN)
+    cone.theta = PI - np.arctan(base_radius / height)
+    cone.u_range = [0, np.sqrt(base_radius**2 + height**2)]
+    cone.direction = direction
+    cone._rotate_to_direction()
+    return _style_surface(cone, **kwargs)
+
+
+def lod_parametric_function(function, t_range=(0, 1), zoom=1, **kwargs):
+    # ParametricFunction with a t_step for its length on screen
+    t_min, t_max = t_range[:2]
+    step = curve_step(function, t_range, zoom)
+    return ParametricFunction(function, t_range=[t_min, t_max, step], **kwargs)
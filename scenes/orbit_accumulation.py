@@ -0,0 +1,136 @@
+# Showing the images rho(P), rho^2(P), ..., rho^N(P) of a set of points P under
+# a rotation rho, as for phi^n(D) and theta^n(0).
+#
+# All N images are computed up front as one (N, len(P), 3) array. OrbitCloud is
+# a single PointCloud that shows the first k of them, plus the next one part of
+# the way along its sweep from P, and AccumulateOrbit moves k from one value to
+# another within a single play. The counter next to it is a SlotMathTex, which
+# only swaps the glyphs of its exponent.
+
+from manim import *
+
+from point_cloud import PointCloud
+from slot_tex import SLOT, SlotMathTex
+
+
+def rotate_points(points, angles, axis=OUT, about_point=ORIGIN):
+    # points rotated by every angle, as an (len(angles), len(points), 3) array
+    # (Rodrigues' rotation formula)
+    points = np.asarray(points, dtype=float) - about_point
+    axis = np.asarray(axis, dtype=float)
+    axis = axis / np.linalg.norm(axis)
+    angles = np.asarray(angles, dtype=float)[:, None, None]
+    cross = np.cross(axis, points)
+    along = np.outer(points @ axis, axis)
+    rotated = (
+        np.cos(angles) * points + np.sin(angles) * cross + (1 - np.cos(angles)) * along
+    )
+    return rotated + about_point
+
+
+def rotation_orbit(points, angle, count, axis=OUT, about_point=ORIGIN):
+    # rho^1(points) .. rho^count(points) for the rotation rho by `angle`
+    return rotate_points(points, angle * np.arange(1, count + 1), axis, about_point)
+
+
+class OrbitCloud(PointCloud):
+    def __init__(
+        self,
+        points,
+        angle,
+        count,
+        axis=OUT,
+        about_point=ORIGIN,
+        color=WHITE,
+        dot_radius=0.04,
+        **kwargs,
+    ):
+        super().__init__(color=color, radius=dot_radius, **kwargs)
+        self.base_points = np.array(points, dtype=float).reshape(-1, 3)
+        self.angle = angle
+        self.axis = axis
+        self.about_point = np.array(about_point, dtype=float)
+        self.orbit_color = color
+        self.orbit = rotation_orbit(
+            self.base_points, angle, count, axis, self.about_point
+        )
+        self.steps = 0
+        self.set_steps(0)
+
+    def set_steps(self, steps, sweep=0.0):
+        # Shows the first `steps` images, and the next one `sweep` of the way
+        # from the base points to where it ends up
+        steps = min(int(steps), len(self.orbit))
+        points = self.orbit[:steps].reshape(-1, 3)
+        if sweep > 0 and steps < len(self.orbit):
+            angle = self.angle * (steps + 1) * sweep
+            moving = rotate_points(
+                self.base_points, [angle], self.axis, self.about_point
+            )
+            points = np.concatenate([points, moving[0]])
+        self.steps = steps
+        self.reset_points()
+        if len(points):
+            self.add_points(points, color=self.orbit_color)
+        return self
+
+
+class OrbitCounter(SlotMathTex):
+    # rho^{n}(P), with n in a slot, so changing it doesn't run LaTeX. The
+    # counter stays anchored at its left edge.
+
+    def __init__(
+        self,
+        rotation_tex,
+        argument_tex,
+        value=1,
+        font_size=DEFAULT_FONT_SIZE,
+        argument_color=RED,
+        **kwargs,
+    ):
+        super().__init__(
+            rotation_tex + "^{",
+            SLOT,
+            "}(",
+            argument_tex,
+            ")",
+            values=[value],
+            font_size=font_size,
+            **kwargs,
+        )
+        self.parts[3].set_color(argument_color)
+
+
+class GrowOrbit(Animation):
+    def __init__(self, orbit, start=0, end=None, rate_func=linear, **kwargs):
+        self.start = start
+        self.end = len(orbit.orbit) if end is None else end
+        super().__init__(orbit, rate_func=rate_func, **kwargs)
+
+    def interpolate_mobject(self, alpha):
+        position = self.start + self.rate_func(alpha) * (self.end - self.start)
+        steps = int(np.floor(position))
+        self.mobject.set_steps(steps, position - steps)
+
+
+class AccumulateOrbit(AnimationGroup):
+    # Grows an OrbitCloud from `start` to `end` images, every image sweeping in
+    # from the base points over an equal share of the run time, while the
+    # counter (if any) shows the exponent of the image that is sweeping in.
+
+    def __init__(
+        self, orbit, start=0, end=None, counter=None, rate_func=linear, **kwargs
+    ):
+        grow = GrowOrbit(orbit, start, end, rate_func=rate_func)
+        animations = [grow]
+        if counter is not None:
+            first, last = grow.start, grow.end
+
+            def update_counter(counter, alpha):
+                steps = int(np.floor(first + alpha * (last - first)))
+                counter.set_value(max(min(steps + 1, last), 1))
+
+            animations.append(
+                UpdateFromAlphaFunc(counter, update_counter, rate_func=rate_func)
+            )
+        super().__init__(*animations, **kwargs)
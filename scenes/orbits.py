@@ -0,0 +1,139 @@
+# Orbits of points on the sphere under G(sigma, tau).
+#
+# The orbit of a set of seed points is enumerated one word length at a time:
+# the matrices of the reduced words of length n are one batched product away
+# from those of length n - 1, and the orbit points of a level are one batched
+# product of those matrices with the seeds. The words are split into shards by
+# their first components, so each process works on part of W(sigma),
+# W(sigma^{-1}), W(tau) or W(tau^{-1}) and the results come back grouped that
+# way.
+#
+# There are 4 * 3^(n-1) words of length n, so deep orbits of many seeds don't
+# fit in memory; words_per_level caps how many (evenly spaced) words of each
+# level are applied to the seeds. The matrices of every word are still
+# composed, which is cheap.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from free_group import (
+    COMPONENTS,
+    WORD_DTYPE,
+    iter_word_matrix_levels,
+    number_of_reduced_words,
+    reduced_words,
+)
+
+
+def _spread_indices(n, cap):
+    if cap is None or cap >= n:
+        return None
+    if cap <= 0:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.linspace(0, n - 1, max(cap, 1)).round().astype(np.int64))
+
+
+def iter_orbit_levels(points, max_length, prefix=(), words_per_level=None):
+    # Yields (words, orbit) for each length from len(prefix) (or 1) up to
+    # max_length, where orbit[i, j] is words[i] applied to points[j].
+    points = np.asarray(points, dtype=np.float32)
+    for words, matrices in iter_word_matrix_levels(max_length, prefix):
+        yield _orbit_level(words, matrices, points, words_per_level)
+
+
+def _orbit_level(words, matrices, points, words_per_level):
+    chosen = _spread_indices(len(words), words_per_level)
+    if chosen is not None:
+        words, matrices = words[chosen], matrices[chosen]
+    # (points, 3) @ (words, 3, 3) -> (words, points, 3)
+    orbit = points @ matrices.astype(np.float32).transpose(0, 2, 1)
+    return words, orbit
+
+
+def _orbit_shard(points, max_length, prefix, words_per_level):
+    levels = list(iter_orbit_levels(points, max_length, prefix, words_per_level))
+    # the levels shorter than the prefix belong to other shards
+    return prefix, levels
+
+
+def shard_prefix_length(workers):
+    # the shortest prefix length that gives every worker at least one shard
+    length = 1
+    while number_of_reduced_words(length) < workers:
+        length += 1
+    return length
+
+
+def shard_caps(words_per_level, shards):
+    # words_per_level split over shards whose levels are the same size, the
+    # remainder spread evenly, so that the merged levels hold words_per_level
+    if words_per_level is None:
+        return [None] * shards
+    return [
+        (i + 1) * words_per_level // shards - i * words_per_level // shards
+        for i in range(shards)
+    ]
+
+
+def compute_orbits(points, max_length, words_per_level=None, workers=None):
+    # Returns {first component: [(words, orbit) for each length 1..max_length]}.
+    # The empty word (the seeds themselves) is left out.
+    orbits = {c: [] for c in COMPONENTS}
+    if max_length == 0:
+        return orbits
+    workers = workers or os.cpu_count() or 1
+    prefix_length = min(shard_prefix_length(workers), max_length)
+    prefixes = [tuple(int(c) for c in p) for p in reduced_words(prefix_length)]
+    caps = shard_caps(words_per_level, len(prefixes))
+
+    # the levels above the shards are small, so do them here
+    top_levels = iter_orbit_levels(points, prefix_length - 1, (), words_per_level)
+    for words, orbit in top_levels:
+        for c in COMPONENTS:
+            mask = words[:, 0] == c
+            orbits[c].append((words[mask], orbit[mask]))
+
+    if workers == 1:
+        results = [
+            _orbit_shard(points, max_length, prefix, cap)
+            for prefix, cap in zip(prefixes, caps)
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_orbit_shard, points, max_length, prefix, cap)
+                for prefix, cap in zip(prefixes, caps)
+            ]
+            results = [future.result() for future in futures]
+
+    merged = {c: {} for c in COMPONENTS}
+    for prefix, levels in results:
+        for words, orbit in levels:
+            merged[prefix[0]].setdefault(words.shape[1], []).append((words, orbit))
+    for c in COMPONENTS:
+        for length in sorted(merged[c]):
+            parts = merged[c][length]
+            orbits[c].append(
+                (
+                    np.concatenate([words for words, _ in parts]),
+                    np.concatenate([orbit for _, orbit in parts]),
+                )
+            )
+    return orbits
+
+
+def orbit_cloud(points, max_length, words_per_level=None, workers=None):
+    # The orbit as one flat (n, 3) float32 array, together with the first
+    # component of the word that produced each point (-1 for the seeds).
+    orbits = compute_orbits(points, max_length, words_per_level, workers)
+    seeds = np.asarray(points, dtype=np.float32)
+    clouds = [seeds]
+    first_components = [np.full(len(seeds), -1, dtype=WORD_DTYPE)]
+    for c in COMPONENTS:
+        for words, orbit in orbits[c]:
+            clouds.append(orbit.reshape(-1, 3))
+            size = orbit.shape[0] * orbit.shape[1]
+            first_components.append(np.full(size, c, dtype=WORD_DTYPE))
+    return np.concatenate(clouds), np.concatenate(first_components)
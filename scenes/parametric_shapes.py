@@ -0,0 +1,149 @@
+# Mobjects whose shape follows a parameter, for updaters that would otherwise
+# call become() with a freshly built mobject on every frame.
+#
+# ParametricSector has a fixed number of curves, so changing its angle only
+# rewrites its point array. ParametricBrace uses the fact that a horizontal
+# Brace is an affine function of its width (only its straight sections grow),
+# which is fitted once from a few Braces and then rotated into place.
+
+from manim import *
+
+# curves along the arc of a ParametricSector
+ARC_SEGMENTS = 16
+
+# default_min_width in Brace.__init__: the width of the path without its
+# straight sections
+BRACE_MIN_WIDTH = 0.90552
+
+_BRACE_TEMPLATES = {}
+
+
+class ParametricSector(VMobject):
+    # AnnularSector(inner_radius=0, outer_radius=radius, angle, start_angle)
+    # made of ARC_SEGMENTS curves along the arc and two straight ones through
+    # the centre.
+
+    def __init__(
+        self,
+        radius=1,
+        angle=TAU / 4,
+        start_angle=0,
+        arc_center=ORIGIN,
+        fill_opacity=1,
+        stroke_width=0,
+        color=WHITE,
+        **kwargs,
+    ):
+        self.radius = radius
+        self.angle = angle
+        self.start_angle = start_angle
+        self.arc_center = np.array(arc_center, dtype=float)
+        self._fractions = np.linspace(0, 1, ARC_SEGMENTS + 1)
+        self._angles = np.empty(ARC_SEGMENTS + 1)
+        self._cos = np.empty(ARC_SEGMENTS + 1)
+        self._sin = np.empty(ARC_SEGMENTS + 1)
+        # where the points of a straight curve from an arc end to the centre are
+        self._to_center = np.array([1, 2 / 3, 1 / 3, 0])[:, None]
+        super().__init__(
+            fill_opacity=fill_opacity,
+            stroke_width=stroke_width,
+            color=color,
+            **kwargs,
+        )
+
+    def generate_points(self):
+        self.set_angle(self.angle)
+
+    def set_angle(self, angle):
+        self.angle = angle
+        shape = ((ARC_SEGMENTS + 2) * 4, 3)
+        if self.points.shape != shape or not self.points.flags.c_contiguous:
+            self.points = np.zeros(shape)
+        curves = self.points.reshape(ARC_SEGMENTS + 2, 4, 3)
+        arc = curves[:ARC_SEGMENTS]
+        cos, sin = self._cos, self._sin
+        np.multiply(self._fractions, angle, out=self._angles)
+        self._angles += self.start_angle
+        np.cos(self._angles, out=cos)
+        np.sin(self._angles, out=sin)
+        # handles along the tangents, as in Arc
+        handle = 4 / 3 * np.tan(angle / (4 * ARC_SEGMENTS))
+        arc[:, 0, 0], arc[:, 0, 1] = cos[:-1], sin[:-1]
+        np.multiply(sin[:-1], -handle, out=arc[:, 1, 0])
+        arc[:, 1, 0] += cos[:-1]
+        np.multiply(cos[:-1], handle, out=arc[:, 1, 1])
+        arc[:, 1, 1] += sin[:-1]
+        np.multiply(sin[1:], handle, out=arc[:, 2, 0])
+        arc[:, 2, 0] += cos[1:]
+        np.multiply(cos[1:], -handle, out=arc[:, 2, 1])
+        arc[:, 2, 1] += sin[1:]
+        arc[:, 3, 0], arc[:, 3, 1] = cos[1:], sin[1:]
+        arc *= self.radius
+        np.multiply(self._to_center, arc[-1, 3], out=curves[-2])
+        np.multiply(self._to_center[::-1], arc[0, 0], out=curves[-1])
+        self.points += self.arc_center
+        return self
+
+
+def _canonical_brace_points(width, buff, sharpness):
+    # a brace under the segment from the origin to (width, 0, 0)
+    return BraceBetweenPoints(
+        ORIGIN, width * RIGHT, buff=buff, sharpness=sharpness
+    ).points
+
+
+def _brace_template(buff, sharpness):
+    # (min_width, offset, slope, minimal): from min_width on, the canonical
+    # brace of a width is offset + width * slope; narrower ones are the minimal
+    # brace squashed horizontally. None if Brace doesn't behave like that.
+    key = (buff, sharpness)
+    if key not in _BRACE_TEMPLATES:
+        min_width = BRACE_MIN_WIDTH / sharpness
+        widths = [min_width, 2 * min_width, 4 * min_width, min_width / 2]
+        samples = [_canonical_brace_points(w, buff, sharpness) for w in widths]
+        template = None
+        if len({len(points) for points in samples}) == 1:
+            slope = (samples[1] - samples[0]) / (widths[1] - widths[0])
+            offset = samples[0] - widths[0] * slope
+            squashed = samples[0] * [widths[3] / min_width, 1, 1]
+            if np.allclose(offset + widths[2] * slope, samples[2]) and np.allclose(
+                squashed, samples[3]
+            ):
+                template = (min_width, offset, slope, samples[0])
+        _BRACE_TEMPLATES[key] = template
+    return _BRACE_TEMPLATES[key]
+
+
+class ParametricBrace(BraceBetweenPoints):
+    # BraceBetweenPoints whose ends can be moved with set_ends, which writes the
+    # points of the brace between the new ends into the existing array.
+
+    def __init__(self, point_1, point_2, buff=0.2, sharpness=2, **kwargs):
+        super().__init__(point_1, point_2, buff=buff, sharpness=sharpness, **kwargs)
+        self.brace_config = dict(buff=buff, sharpness=sharpness, **kwargs)
+        self._template = _brace_template(buff, sharpness)
+        if self._template is not None and len(self._template[1]) != len(self.points):
+            self._template = None
+        self._canonical = np.empty((len(self.points), 3))
+
+    def set_ends(self, point_1, point_2):
+        if self._template is None:
+            brace = BraceBetweenPoints(point_1, point_2, **self.brace_config)
+            return self.become(brace)
+        min_width, offset, slope, minimal = self._template
+        start = np.array(point_1, dtype=float)
+        vector = np.array(point_2, dtype=float) - start
+        width = np.hypot(vector[0], vector[1])
+        canonical = self._canonical
+        if width >= min_width:
+            np.multiply(slope, width, out=canonical)
+            canonical += offset
+        else:
+            canonical[:] = minimal
+            canonical[:, 0] *= width / min_width
+        if self.points.shape != canonical.shape:
+            self.points = np.empty_like(canonical)
+        rotation = rotation_matrix(np.arctan2(vector[1], vector[0]), OUT)
+        np.matmul(canonical, rotation.T, out=self.points)
+        self.points += start
+        return self
@@ -0,0 +1,235 @@
+# Which piece of the paradoxical decomposition a point of the sphere lies in.
+#
+# M can't be written down, so it is stood in for by a finite set of
+# representatives, and G(sigma, tau)M by the orbit of those under the words up
+# to some length. A sample point gets the piece of the nearest orbit point: M
+# for the empty word and W(c)M for a word whose first letter is c. Points close
+# to one of a given set of points of D are labelled D instead.
+#
+# The orbit points are bucketed into a grid of cubes, so a sample is only
+# compared with the orbit points in the 27 cubes around it; the few samples
+# with nothing close by fall back to comparing with the whole orbit, block by
+# block. Samples are classified in chunks sized so the temporaries stay within a
+# memory budget, however many samples are streamed through.
+
+import numpy as np
+
+from fixed_points import NEIGHBOURS
+from free_group import SIGMA, SIGMA_I, TAU, TAU_I, WORD_DTYPE, inverse_component
+from orbits import orbit_cloud
+
+# labels 0..3 are W(c)M for the components c
+PIECE_M = 4
+PIECE_D = 5
+
+PIECE_LABELS = {
+    SIGMA: r"W(\sigma)M",
+    TAU: r"W(\tau)M",
+    SIGMA_I: r"W(\sigma^{-1})M",
+    TAU_I: r"W(\tau^{-1})M",
+    PIECE_M: r"M",
+    PIECE_D: r"D",
+}
+
+# PINK, YELLOW, GREEN and ORANGE as in ExpandToBall, WHITE for M and RED for D
+PIECE_COLORS = {
+    SIGMA: "#D147BD",
+    TAU: "#FFFF00",
+    SIGMA_I: "#83C167",
+    TAU_I: "#FF862F",
+    PIECE_M: "#FFFFFF",
+    PIECE_D: "#FC6255",
+}
+
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+DEFAULT_D_TOLERANCE = 0.01
+
+# bytes of temporaries per (sample, candidate) pair in PointGrid.nearest
+_BYTES_PER_PAIR = 64
+
+
+
+def _normalize(points):
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+
+def _hex_to_rgba(color, opacity=1.0):
+    color = color.lstrip("#")
+    return [int(color[i : i + 2], 16) / 255 for i in (0, 2, 4)] + [opacity]
+
+
+def piece_rgbas(labels, opacity=1.0):
+    table = np.array(
+        [_hex_to_rgba(PIECE_COLORS[label], opacity) for label in range(PIECE_D + 1)]
+    )
+    return table[labels]
+
+
+def sample_sphere(number_of_points, seed=None, chunk_size=2**16):
+    # Yields uniformly distributed unit vectors in float32 chunks
+    rng = np.random.default_rng(seed)
+    for start in range(0, number_of_points, chunk_size):
+        size = min(chunk_size, number_of_points - start)
+        yield _normalize(rng.standard_normal((size, 3), dtype=np.float32))
+
+
+def decomposition_pieces(labels, in_e=None, component=TAU):
+    # The pieces T_1..T_4 (component TAU) or Sigma_1..Sigma_4 (component SIGMA)
+    # as 1..4, and 0 for points in neither. T_1 and T_3 are the parts of
+    # W(tau)M outside and inside E, T_2 and T_4 those of W(tau^{-1})M, so that
+    # S^2 = tau^{-1}T_1 u T_2 u phi^{-1}tau^{-1}T_3 u phi^{-1}T_4.
+    labels = np.asarray(labels)
+    if in_e is None:
+        in_e = np.zeros(len(labels), dtype=bool)
+    pieces = np.zeros(len(labels), dtype=WORD_DTYPE)
+    inverse = inverse_component(component)
+    pieces[(labels == component) & ~in_e] = 1
+    pieces[(labels == inverse) & ~in_e] = 2
+    pieces[(labels == component) & in_e] = 3
+    pieces[(labels == inverse) & in_e] = 4
+    return pieces
+
+
+class PointGrid:
+    # Points bucketed into cubes of side `cell`, for nearest-point queries that
+    # only look at the 27 cubes around each query point. The answer is exact
+    # whenever the nearest point found is within `cell` of the query, since
+    # anything closer would lie in one of those cubes.
+
+    def __init__(self, points, cell):
+        self.points = _normalize(points)
+        self.cell = cell
+        self.side = int(np.ceil(2 / cell)) + 3
+        keys = self._keys(self.points)
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+        # the cubes around a cube come in 9 runs of 3 consecutive keys
+        rows = NEIGHBOURS[NEIGHBOURS[:, 2] == 0]
+        self.row_offsets = (rows[:, 0] * self.side + rows[:, 1]) * self.side
+        # average number of points around a query point, for sizing chunks
+        occupied = max(len(np.unique(self.sorted_keys)), 1)
+        self.expected_candidates = 27 * len(self.points) / occupied
+
+    def _keys(self, points):
+        # a border of empty cubes keeps the neighbours of every cube in range
+        ijk = np.floor((points + 1) / self.cell).astype(np.int64) + 1
+        return (ijk[:, 0] * self.side + ijk[:, 1]) * self.side + ijk[:, 2]
+
+    def nearest(self, points):
+        # Index of and dot product with the nearest grid point among the 27
+        # cubes around each of the unit vectors `points`; -1 and -inf if there
+        # are none
+        row_keys = self._keys(points)[:, None] + self.row_offsets
+        low = np.searchsorted(self.sorted_keys, row_keys - 1, side="left").ravel()
+        high = np.searchsorted(self.sorted_keys, row_keys + 1, side="right").ravel()
+        lengths = high - low
+        counts = lengths.reshape(len(points), -1).sum(axis=1)
+        starts = np.cumsum(lengths) - lengths
+
+        owners = np.repeat(np.arange(len(points)), counts)
+        positions = np.repeat(low - starts, lengths) + np.arange(lengths.sum())
+        candidates = self.order[positions]
+        dots = np.einsum("ij,ij->i", points[owners], self.points[candidates])
+
+        nearest = np.full(len(points), -1, dtype=np.int64)
+        best = np.full(len(points), -np.inf, dtype=np.float32)
+        found = counts > 0
+        if not np.any(found):
+            return nearest, best
+        segment_starts = (np.cumsum(counts) - counts)[found]
+        best[found] = np.maximum.reduceat(dots, segment_starts)
+        hits = np.flatnonzero(dots == best[owners])
+        # the first hit of every owner
+        owners_hit, first = np.unique(owners[hits], return_index=True)
+        nearest[owners_hit] = candidates[hits[first]]
+        return nearest, best
+
+
+class PieceClassifier:
+    def __init__(
+        self,
+        representatives,
+        max_length,
+        words_per_level=None,
+        points_of_d=None,
+        d_tolerance=DEFAULT_D_TOLERANCE,
+        memory_budget=DEFAULT_MEMORY_BUDGET,
+        workers=1,
+    ):
+        cloud, first_components = orbit_cloud(
+            _normalize(representatives), max_length, words_per_level, workers
+        )
+        self.orbit_labels = np.where(
+            first_components == -1, PIECE_M, first_components
+        ).astype(WORD_DTYPE)
+        # cubes about twice the typical spacing of the orbit points, so almost
+        # every sample has its nearest orbit point among the 27 around it
+        spacing = np.sqrt(4 * np.pi / len(cloud))
+        self.orbit = PointGrid(cloud, min(2 * spacing, 2.0))
+        self.d = None
+        if points_of_d is not None and len(points_of_d):
+            self.d = PointGrid(points_of_d, d_tolerance)
+        self.d_tolerance = d_tolerance
+        self.memory_budget = memory_budget
+
+    def chunk_size(self):
+        # samples per chunk that keep the temporaries within the memory budget
+        candidates = self.orbit.expected_candidates
+        if self.d is not None:
+            candidates = max(candidates, self.d.expected_candidates)
+        return max(int(self.memory_budget / (_BYTES_PER_PAIR * candidates)), 1)
+
+    def _nearest_brute_force(self, points):
+        # for the few samples whose nearest orbit point is further than a cube;
+        # blocks of the orbit keep the dot products within the memory budget
+        targets = self.orbit.points
+        entries = max(self.memory_budget // np.dtype(np.float32).itemsize, 1)
+        block = max(entries // max(len(points), 1), 1)
+        best = np.full(len(points), -np.inf, dtype=np.float32)
+        nearest = np.zeros(len(points), dtype=np.int64)
+        for start in range(0, len(targets), block):
+            dots = points @ targets[start : start + block].T
+            index = np.argmax(dots, axis=1)
+            value = dots[np.arange(len(points)), index]
+            better = value > best
+            best[better] = value[better]
+            nearest[better] = index[better] + start
+        return nearest
+
+    def _classify_chunk(self, points):
+        nearest, best = self.orbit.nearest(points)
+        # |p - q| <= cell is p.q >= 1 - cell^2 / 2 for unit vectors
+        unsure = best < 1 - self.orbit.cell**2 / 2
+        if np.any(unsure):
+            nearest[unsure] = self._nearest_brute_force(points[unsure])
+        labels = self.orbit_labels[nearest]
+        if self.d is not None:
+            _, closeness = self.d.nearest(points)
+            labels[closeness >= 1 - self.d_tolerance**2 / 2] = PIECE_D
+        return labels
+
+    def classify(self, points):
+        # the piece label of every point; the points don't need to be unit
+        # vectors
+        points = _normalize(points)
+        chunk_size = self.chunk_size()
+        return np.concatenate(
+            [
+                self._classify_chunk(points[start : start + chunk_size])
+                for start in range(0, len(points), chunk_size)
+            ]
+            or [np.zeros(0, dtype=WORD_DTYPE)]
+        )
+
+    def iter_classify(self, chunks):
+        # Classifies a stream of point arrays, e.g. from sample_sphere, one at
+        # a time
+        for chunk in chunks:
+            yield self.classify(chunk)
+
+    def piece_counts(self, chunks):
+        counts = np.zeros(PIECE_D + 1, dtype=np.int64)
+        for labels in self.iter_classify(chunks):
+            counts += np.bincount(labels, minlength=PIECE_D + 1)
+        return {label: int(count) for label, count in enumerate(counts)}
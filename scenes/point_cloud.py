@@ -0,0 +1,248 @@
+# Large sets of dots as a single mobject.
+#
+# A PointCloud keeps its points in one contiguous float32 array, next to an
+# rgba and a radius per point, so moving or rotating the whole cloud is a single
+# matrix product instead of one Dot3D (a full sphere surface) per point.
+#
+# The stock cameras draw PMobjects as squares of a fixed number of pixels. The
+# cameras below draw PointClouds as discs whose size follows the radius (and
+# the perspective of the 3D camera). All discs are drawn in one go: every disc
+# is stamped out with a precomputed stencil of pixel offsets for its radius,
+# and a depth buffer keeps the nearest disc at every pixel.
+
+from manim import *
+
+DEFAULT_POINT_RADIUS = 0.04
+
+_STENCILS = {}
+
+
+def _disc_stencil(radius):
+    # (dx, dy) pixel offsets covered by a disc of `radius` pixels
+    if radius not in _STENCILS:
+        span = np.arange(-radius, radius + 1)
+        dx, dy = np.meshgrid(span, span)
+        inside = dx**2 + dy**2 <= radius**2 + radius
+        _STENCILS[radius] = np.stack([dx[inside], dy[inside]], axis=1)
+    return _STENCILS[radius]
+
+
+def draw_discs(pixel_array, centers, radii, depths, rgbas, rgb_max_val=255):
+    # Draws discs into an (h, w, 4) pixel array. `centers` and `radii` are in
+    # pixels, rgbas are in [0, 1], and where discs overlap the one with the
+    # largest depth (the one closest to the camera) wins.
+    height, width = pixel_array.shape[:2]
+    if len(centers) == 0:
+        return
+    centers = np.rint(centers).astype(np.int64)
+    radii = np.maximum(np.rint(radii), 0).astype(np.int64)
+    visible = (
+        (centers[:, 0] + radii >= 0)
+        & (centers[:, 0] - radii < width)
+        & (centers[:, 1] + radii >= 0)
+        & (centers[:, 1] - radii < height)
+        & (rgbas[:, 3] > 0)
+    )
+    # later points win ties, as when drawing them in order
+    by_rank = np.lexsort((np.arange(len(depths)), depths))
+    rank = np.empty(len(depths), dtype=np.int64)
+    rank[by_rank] = np.arange(len(depths))
+
+    pixels, ranks = [], []
+    for radius in np.unique(radii[visible]):
+        indices = np.flatnonzero(visible & (radii == radius))
+        stencil = _disc_stencil(int(radius))
+        x = centers[indices, 0][:, None] + stencil[:, 0]
+        y = centers[indices, 1][:, None] + stencil[:, 1]
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        pixels.append((y * width + x)[inside])
+        ranks.append(np.broadcast_to(rank[indices][:, None], x.shape)[inside])
+    if not pixels:
+        return
+
+    depth_buffer = np.full(height * width, -1, dtype=np.int64)
+    np.maximum.at(depth_buffer, np.concatenate(pixels), np.concatenate(ranks))
+    covered = np.flatnonzero(depth_buffer >= 0)
+    colors = rgbas[by_rank[depth_buffer[covered]]]
+
+    flat = pixel_array.reshape(-1, pixel_array.shape[2])
+    opaque = colors[:, 3] >= 1
+    flat[covered[opaque], :3] = colors[opaque, :3] * rgb_max_val
+    flat[covered[opaque], 3] = rgb_max_val
+    covered, colors = covered[~opaque], colors[~opaque]
+    alphas = colors[:, 3:]
+    background = flat[covered].astype(np.float32)
+    blended = background[:, :3] * (1 - alphas) + colors[:, :3] * alphas * rgb_max_val
+    flat[covered, :3] = blended.astype(pixel_array.dtype)
+    flat[covered, 3] = np.maximum(
+        background[:, 3], rgb_max_val * alphas[:, 0]
+    ).astype(pixel_array.dtype)
+
+
+class PointCloud(PMobject):
+    def __init__(
+        self,
+        points=None,
+        color=WHITE,
+        radius=DEFAULT_POINT_RADIUS,
+        rgbas=None,
+        radii=None,
+        **kwargs,
+    ):
+        self.default_radius = radius
+        super().__init__(color=color, **kwargs)
+        if points is not None:
+            self.add_points(points, rgbas=rgbas, color=color, radii=radii)
+
+    def reset_points(self):
+        self.points = np.zeros((0, 3), dtype=np.float32)
+        self.rgbas = np.zeros((0, 4), dtype=np.float32)
+        self.radii = np.zeros(0, dtype=np.float32)
+        return self
+
+    def get_array_attrs(self):
+        return super().get_array_attrs() + ["radii"]
+
+    def add_points(self, points, rgbas=None, color=None, alpha=1, radii=None):
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        if rgbas is None:
+            color = ManimColor(color) if color else self.color
+            rgbas = np.repeat([color_to_rgba(color, alpha)], len(points), axis=0)
+        rgbas = np.asarray(rgbas, dtype=np.float32)
+        if len(rgbas) != len(points):
+            raise ValueError("points and rgbas must have same length")
+        if radii is None:
+            radii = self.default_radius
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float32), len(points))
+        self.points = np.concatenate([self.points, points])
+        self.rgbas = np.concatenate([self.rgbas, rgbas])
+        self.radii = np.concatenate([self.radii, radii])
+        return self
+
+    def set_points(self, points):
+        # new positions for the same points, keeping their colours and radii
+        self.points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        return self
+
+    def apply_points_function_about_point(
+        self, func, about_point=None, about_edge=None
+    ):
+        super().apply_points_function_about_point(func, about_point, about_edge)
+        for mob in self.family_members_with_points():
+            mob.points = mob.points.astype(np.float32, copy=False)
+        return self
+
+    def interpolate_color(self, mobject1, mobject2, alpha):
+        super().interpolate_color(mobject1, mobject2, alpha)
+        self.radii = interpolate(mobject1.radii, mobject2.radii, alpha)
+        self.points = self.points.astype(np.float32, copy=False)
+        return self
+
+    def set_radius(self, radius):
+        self.radii[:] = radius
+        return self
+
+    def set_opacity(self, opacity, family=True):
+        for mob in self.family_members_with_points() if family else [self]:
+            mob.rgbas[:, 3] = opacity
+        return self
+
+    def fade(self, darkness=0.5, family=True):
+        for mob in self.family_members_with_points() if family else [self]:
+            mob.rgbas[:, 3] *= 1 - darkness
+        return self
+
+
+class PointCloudCameraMixin:
+    # Draws PointClouds as depth-sorted discs; other PMobjects are drawn as
+    # usual.
+
+    def display_multiple_point_cloud_mobjects(self, pmobjects, pixel_array):
+        for pmobject in pmobjects:
+            if isinstance(pmobject, PointCloud):
+                self.display_point_cloud_discs(pmobject, pixel_array)
+            else:
+                super().display_multiple_point_cloud_mobjects([pmobject], pixel_array)
+
+    def _perspective_scales(self, cloud, depths):
+        # how much the 3D camera enlarges a disc at each depth, as in
+        # ThreeDCamera.project_points
+        if not hasattr(self, "get_focal_distance"):
+            return 1.0
+        if cloud in self.fixed_in_frame_mobjects:
+            return 1.0
+        focal_distance = self.get_focal_distance()
+        behind = focal_distance - depths
+        scales = focal_distance / np.where(behind > 0, behind, np.inf)
+        return scales * self.get_zoom()
+
+    def display_point_cloud_discs(self, cloud, pixel_array):
+        if len(cloud.points) == 0:
+            return
+        # the same mapping as Camera.points_to_pixel_coords, without rounding
+        projected = self.transform_points_pre_display(cloud, cloud.points.astype(float))
+        shifted = projected - self.frame_center
+        x_scale = self.pixel_width / self.frame_width
+        y_scale = self.pixel_height / self.frame_height
+        centers = np.empty((len(shifted), 2))
+        centers[:, 0] = shifted[:, 0] * x_scale + self.pixel_width / 2
+        centers[:, 1] = -shifted[:, 1] * y_scale + self.pixel_height / 2
+        depths = projected[:, 2]
+        radii = cloud.radii * self._perspective_scales(cloud, depths) * x_scale
+        draw_discs(pixel_array, centers, radii, depths, cloud.rgbas, self.rgb_max_val)
+
+
+class PointCloudCamera(PointCloudCameraMixin, Camera):
+    pass
+
+
+class PointCloudThreeDCamera(PointCloudCameraMixin, ThreeDCamera):
+    pass
+
+
+class PointCloudScene(Scene):
+    def __init__(self, camera_class=PointCloudCamera, **kwargs):
+        super().__init__(camera_class=camera_class, **kwargs)
+
+
+class PointCloudThreeDScene(ThreeDScene):
+    def __init__(self, camera_class=PointCloudThreeDCamera, **kwargs):
+        super().__init__(camera_class=camera_class, **kwargs)
+
+
+class RotateCloud(Animation):
+    # Rotates a PointCloud (or only the points at `indices`) with one float32
+    # matrix product per frame, along arcs like Rotate.
+
+    def __init__(
+        self, cloud, angle=PI, axis=OUT, about_point=ORIGIN, indices=None, **kwargs
+    ):
+        self.angle = angle
+        self.axis = axis
+        self.about_point = np.asarray(about_point, dtype=np.float32)
+        self.indices = slice(None) if indices is None else np.asarray(indices)
+        super().__init__(cloud, **kwargs)
+
+    def begin(self):
+        self.start_points = self.mobject.points[self.indices].copy()
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        angle = self.angle * self.rate_func(alpha)
+        matrix = rotation_matrix(angle, self.axis).astype(np.float32)
+        relative = self.start_points - self.about_point
+        self.mobject.points[self.indices] = relative @ matrix.T + self.about_point
+
+
+class GrowPointCloud(Animation):
+    # Shows the points of a cloud one after another, like ShowIncreasingSubsets
+    # does for the submobjects of a group.
+
+    def __init__(self, cloud, **kwargs):
+        self.all_points = cloud.copy()
+        super().__init__(cloud, **kwargs)
+
+    def interpolate_mobject(self, alpha):
+        count = int(np.floor(self.rate_func(alpha) * len(self.all_points.points)))
+        for attr in self.mobject.get_array_attrs():
+            setattr(self.mobject, attr, getattr(self.all_points, attr)[:count])
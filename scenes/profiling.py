@@ -0,0 +1,543 @@
+# Instrumentation for finding slow or forgotten updaters.
+#
+# With PROFILE_UPDATERS set in the environment, scenes that mix in
+# UpdaterProfilerMixin run their mobject updaters through an UpdaterProfiler.
+# It times every updater call, counts the updaters that ran in every frame and
+# flags two kinds of leaks: updaters that read a mobject (through their closure
+# or default arguments) that is no longer in the scene, and updaters that
+# duplicate another one on the same mobject, as when add_updater is called in a
+# loop without clearing the previous one. A ranked summary is logged when the
+# scene finishes.
+#
+# With PROFILE_PLAYS set, scenes that mix in PlayProfilerMixin time every play
+# and wait through a PlayProfiler, split into the phases of a play: hashing it
+# for the partial movie cache, beginning the animations, interpolating them,
+# running the updaters, rasterizing the frames in the camera and writing them
+# to ffmpeg, with Tex compiled during the play apart. Every play is recorded
+# with the line of construct() it came from, its animations, frames and the
+# number of mobjects in the scene, and the time construct() spent before it,
+# Tex compiles included. The plays are written to <media dir>/profiles/ as
+# <scene>.json, and as <scene>.folded, one "frame;frame;... microseconds" line
+# per stack, which flame graph tools read (flamegraph.pl, speedscope).
+
+import inspect
+import json
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+from time import perf_counter
+
+import manim.renderer.cairo_renderer as cairo_renderer
+import manim.utils.tex_file_writing as tex_file_writing
+from manim import *
+from manim.mobject.text import tex_mobject
+
+PROFILE_UPDATERS_ENV = "PROFILE_UPDATERS"
+PROFILE_PLAYS_ENV = "PROFILE_PLAYS"
+PROFILE_DIR = "profiles"
+
+# rows in the logged summary
+SUMMARY_ROWS = 15
+
+
+def updater_profiling_enabled():
+    return os.environ.get(PROFILE_UPDATERS_ENV, "") not in ("", "0")
+
+
+def referenced_mobjects(function):
+    # the mobjects an updater reads through its closure and default arguments
+    values = list(getattr(function, "__defaults__", None) or ())
+    for cell in getattr(function, "__closure__", None) or ():
+        try:
+            values.append(cell.cell_contents)
+        except ValueError:
+            # the variable isn't bound yet
+            pass
+    return [value for value in values if isinstance(value, Mobject)]
+
+
+def updater_label(mobject, updater):
+    name = getattr(updater, "__qualname__", repr(updater))
+    code = getattr(updater, "__code__", None)
+    if code is not None:
+        location = f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}"
+        name = f"{name} ({location})"
+    return f"{type(mobject).__name__} <- {name}"
+
+
+def _updater_key(updater):
+    # updaters with the same code reading the same objects do the same thing
+    cells = []
+    for cell in getattr(updater, "__closure__", None) or ():
+        try:
+            cells.append(id(cell.cell_contents))
+        except ValueError:
+            cells.append(None)
+    return getattr(updater, "__code__", updater), tuple(cells)
+
+
+class UpdaterStats:
+    __slots__ = (
+        "label",
+        "updater",
+        "calls",
+        "total_time",
+        "worst_time",
+        "stale_frames",
+        "duplicate_frames",
+    )
+
+    def __init__(self, label, updater):
+        self.label = label
+        # keeps the updater alive, so its id isn't reused by another one
+        self.updater = updater
+        self.calls = 0
+        self.total_time = 0.0
+        self.worst_time = 0.0
+        self.stale_frames = 0
+        self.duplicate_frames = 0
+
+    def add(self, seconds):
+        self.calls += 1
+        self.total_time += seconds
+        self.worst_time = max(self.worst_time, seconds)
+
+
+class UpdaterProfiler:
+    def __init__(self):
+        self.stats = {}
+        # (number of updaters run, seconds spent in them) for every frame
+        self.frames = []
+        # the most updaters seen at once on every mobject that had any
+        self.most_updaters = {}
+
+    def update_frame(self, scene, dt):
+        # Scene.update_mobjects, with every updater timed and checked
+        in_scene = {id(mobject) for mobject in scene.get_mobject_family_members()}
+        count, seconds = 0, 0.0
+        for mobject in scene.mobjects:
+            mobject_count, mobject_seconds = self._update(mobject, dt, in_scene)
+            count += mobject_count
+            seconds += mobject_seconds
+        self.frames.append((count, seconds))
+
+    def _update(self, mobject, dt, in_scene):
+        # Mobject.update, recursively
+        if mobject.updating_suspended:
+            return 0, 0.0
+        count, seconds = len(mobject.updaters), 0.0
+        if count:
+            label = type(mobject).__name__
+            previous = self.most_updaters.get(id(mobject), (label, 0))[1]
+            self.most_updaters[id(mobject)] = (label, max(previous, count))
+        seen = set()
+        for updater in mobject.updaters:
+            stats = self.stats.get(id(updater))
+            if stats is None:
+                stats = UpdaterStats(updater_label(mobject, updater), updater)
+                self.stats[id(updater)] = stats
+            start = perf_counter()
+            if "dt" in inspect.signature(updater).parameters:
+                updater(mobject, dt)
+            else:
+                updater(mobject)
+            elapsed = perf_counter() - start
+            stats.add(elapsed)
+            seconds += elapsed
+            if any(id(m) not in in_scene for m in referenced_mobjects(updater)):
+                stats.stale_frames += 1
+            key = _updater_key(updater)
+            if key in seen:
+                stats.duplicate_frames += 1
+            seen.add(key)
+        for submobject in mobject.submobjects:
+            sub_count, sub_seconds = self._update(submobject, dt, in_scene)
+            count += sub_count
+            seconds += sub_seconds
+        return count, seconds
+
+    def ranked(self):
+        return sorted(self.stats.values(), key=lambda s: s.total_time, reverse=True)
+
+    def report(self, title):
+        total = sum(seconds for _, seconds in self.frames)
+        most = max((count for count, _ in self.frames), default=0)
+        lines = [
+            f"Updater profile for {title}: {len(self.frames)} frames, "
+            f"{total:.3f}s in updaters, at most {most} updaters in a frame",
+            f"{'total':>9} {'calls':>7} {'mean':>9} {'worst':>9}  updater",
+        ]
+        for stats in self.ranked()[:SUMMARY_ROWS]:
+            flags = ""
+            if stats.stale_frames:
+                flags += f"  [reads a removed mobject in {stats.stale_frames} frames]"
+            if stats.duplicate_frames:
+                flags += f"  [duplicate in {stats.duplicate_frames} frames]"
+            mean = stats.total_time / stats.calls
+            lines.append(
+                f"{stats.total_time:8.3f}s {stats.calls:7d} {mean * 1e3:7.3f}ms "
+                f"{stats.worst_time * 1e3:7.3f}ms  {stats.label}{flags}"
+            )
+        piled_up = [(n, label) for label, n in self.most_updaters.values() if n > 1]
+        for n, label in sorted(piled_up, reverse=True):
+            lines.append(f"{label} carried {n} updaters at once")
+        return "\n".join(lines)
+
+
+class UpdaterProfilerMixin:
+    # Put before the Scene class in the bases: class S(UpdaterProfilerMixin,
+    # VoiceoverScene). Does nothing unless PROFILE_UPDATERS is set.
+
+    def setup(self):
+        super().setup()
+        self.updater_profiler = (
+            UpdaterProfiler() if updater_profiling_enabled() else None
+        )
+
+    def update_mobjects(self, dt):
+        profiler = getattr(self, "updater_profiler", None)
+        if profiler is None:
+            return super().update_mobjects(dt)
+        profiler.update_frame(self, dt)
+
+    def tear_down(self):
+        super().tear_down()
+        profiler = getattr(self, "updater_profiler", None)
+        if profiler is not None:
+            logger.info(profiler.report(str(self)))
+
+
+def play_profiling_enabled():
+    return os.environ.get(PROFILE_PLAYS_ENV, "") not in ("", "0")
+
+
+# the phases of a play, as they are reported; time of a play in none of them
+# (compiling the animations, say) is reported as "other"
+PLAY_PHASES = (
+    "hashing",
+    "begin",
+    "interpolate",
+    "updaters",
+    "rasterize",
+    "write",
+    "tex",
+)
+
+
+def animations_label(animations):
+    names = []
+    for animation in animations:
+        name = type(animation).__name__
+        mobject = getattr(animation, "mobject", None)
+        if not isinstance(animation, Wait) and mobject is not None:
+            name = f"{name}({type(mobject).__name__})"
+        names.append(name)
+    if len(names) > 3:
+        names[3:] = [f"{len(names) - 3} more"]
+    return ", ".join(names)
+
+
+def _rounded(value):
+    return round(value, 6) if isinstance(value, float) else value
+
+
+class PlayProfiler:
+    def __init__(self):
+        self.plays = []
+        # the record of the play that is running, if any
+        self.play = None
+        # the phases that are running, innermost last
+        self.stack = []
+        self.kind = "play"
+        self.last_end = perf_counter()
+        # Tex compiled since the last play ended, and outside of any play
+        self.tex_compiles = 0
+        self.tex_seconds = 0.0
+        self.construct_tex_seconds = 0.0
+        self._patches = []
+
+    def timed(self, phase, function, frames=False):
+        # function, with its time during a play added to phase; the time of
+        # the phases it runs itself only counts for those
+        def timed_function(*args, **kwargs):
+            if self.play is None:
+                return function(*args, **kwargs)
+            if frames:
+                self.play["frames"] += 1
+            self.stack.append(phase)
+            path = tuple(self.stack)
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self.stack.pop()
+                self.play["stacks"][path] += elapsed
+                if self.stack:
+                    self.play["stacks"][tuple(self.stack)] -= elapsed
+
+        return timed_function
+
+    def _timed_tex(self, function):
+        timed_function = self.timed("tex", function)
+
+        def tex_to_svg_file(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return timed_function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self.tex_seconds += elapsed
+                if self.play is None:
+                    self.construct_tex_seconds += elapsed
+
+        return tex_to_svg_file
+
+    def _counted_compile(self, function):
+        # only called for Tex that isn't in the Tex cache yet
+        def compile_tex(*args, **kwargs):
+            self.tex_compiles += 1
+            return function(*args, **kwargs)
+
+        return compile_tex
+
+    def _patch(self, owner, name, wrap):
+        original = getattr(owner, name)
+        self._patches.append((owner, name, original))
+        setattr(owner, name, wrap(original))
+
+    def install(self, scene):
+        renderer = scene.renderer
+        self._patch(
+            cairo_renderer,
+            "get_hash_from_play_call",
+            lambda f: self.timed("hashing", f),
+        )
+        self._patch(renderer, "update_frame", lambda f: self.timed("rasterize", f))
+        file_writer = renderer.file_writer
+        self._patch(
+            file_writer, "write_frame", lambda f: self.timed("write", f, frames=True)
+        )
+        # starting ffmpeg for the partial movie, and waiting for it to finish
+        self._patch(file_writer, "begin_animation", lambda f: self.timed("write", f))
+        self._patch(file_writer, "end_animation", lambda f: self.timed("write", f))
+        self._patch(tex_mobject, "tex_to_svg_file", self._timed_tex)
+        self._patch(tex_file_writing, "compile_tex", self._counted_compile)
+
+    def uninstall(self):
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    def begin_play(self, line):
+        start = perf_counter()
+        self.play = {
+            "index": len(self.plays),
+            "kind": self.kind,
+            "line": line,
+            "construct": start - self.last_end,
+            "start": start,
+            "frames": 0,
+            "family": 0,
+            "stacks": defaultdict(float),
+        }
+
+    def abandon_play(self):
+        self.play = None
+        self.stack.clear()
+
+    def end_play(self, scene):
+        end = perf_counter()
+        play, self.play = self.play, None
+        self.last_end = end
+        renderer = scene.renderer
+        if not renderer.skip_animations:
+            status = "rendered"
+        elif renderer.animations_hashes and renderer.animations_hashes[-1]:
+            status = "cached"
+        else:
+            status = "skipped"
+        seconds = end - play.pop("start")
+        play.update(
+            animations=animations_label(scene.animations or []),
+            status=status,
+            run_time=scene.duration,
+            seconds=seconds,
+            construct_tex=self.construct_tex_seconds,
+            tex_compiles=self.tex_compiles,
+            tex_seconds=self.tex_seconds,
+        )
+        self.construct_tex_seconds = 0.0
+        self.tex_compiles = 0
+        self.tex_seconds = 0.0
+        self.plays.append(play)
+
+    def phases(self, play):
+        # seconds in every phase, by the phase each stack ends in
+        phases = dict.fromkeys(PLAY_PHASES, 0.0)
+        for path, seconds in play["stacks"].items():
+            phases[path[-1]] += seconds
+        phases["other"] = play["seconds"] - sum(play["stacks"].values())
+        return phases
+
+    def results(self, title):
+        plays, totals = [], defaultdict(float)
+        for play in self.plays:
+            phases = self.phases(play)
+            for phase, seconds in phases.items():
+                totals[phase] += seconds
+            record = {k: v for k, v in play.items() if k != "stacks"}
+            record["phases"] = phases
+            plays.append(
+                {
+                    key: (
+                        {k: _rounded(v) for k, v in value.items()}
+                        if isinstance(value, dict)
+                        else _rounded(value)
+                    )
+                    for key, value in record.items()
+                }
+            )
+        return {
+            "scene": title,
+            "plays": len(plays),
+            "frames": sum(play["frames"] for play in self.plays),
+            "seconds": _rounded(sum(play["seconds"] for play in self.plays)),
+            "construct": _rounded(sum(play["construct"] for play in self.plays)),
+            "tex_compiles": sum(play["tex_compiles"] for play in self.plays),
+            "tex_seconds": _rounded(sum(play["tex_seconds"] for play in self.plays)),
+            "phases": {phase: _rounded(seconds) for phase, seconds in totals.items()},
+            "timeline": plays,
+        }
+
+    def folded(self, title):
+        # flame graph stacks: scene;line;play;phase..., with the time of the
+        # play outside of any phase on the play itself, and the time construct()
+        # took before it on a construct frame of the same line
+        stacks = defaultdict(float)
+        for play in self.plays:
+            base = (title, play["line"])
+            name = f"{play['kind']} {play['animations']}"
+            stacks[base + ("construct",)] += play["construct"] - play["construct_tex"]
+            stacks[base + ("construct", "tex")] += play["construct_tex"]
+            stacks[base + (name,)] += self.phases(play)["other"]
+            for path, seconds in play["stacks"].items():
+                stacks[base + (name,) + path] += seconds
+        lines = []
+        for path, seconds in stacks.items():
+            microseconds = round(seconds * 1e6)
+            if microseconds > 0:
+                lines.append(f"{';'.join(path)} {microseconds}")
+        return "\n".join(lines) + "\n"
+
+    def report(self, title):
+        results = self.results(title)
+        phases = ", ".join(
+            f"{phase} {seconds:.3f}s" for phase, seconds in results["phases"].items()
+        )
+        lines = [
+            f"Play profile for {title}: {results['plays']} plays, "
+            f"{results['frames']} frames, {results['seconds']:.3f}s in plays, "
+            f"{results['construct']:.3f}s between them, "
+            f"{results['tex_compiles']} Tex compiles",
+            f"in plays: {phases}",
+            f"{'total':>9} {'plays':>5} {'frames':>6}  line  animations",
+        ]
+        by_line = defaultdict(lambda: [0.0, 0, 0])
+        for play in self.plays:
+            row = by_line[play["line"], play["kind"], play["animations"]]
+            row[0] += play["seconds"]
+            row[1] += 1
+            row[2] += play["frames"]
+        ranked = sorted(by_line.items(), key=lambda item: item[1][0], reverse=True)
+        for key, (seconds, count, frames) in ranked[:SUMMARY_ROWS]:
+            line, kind, animations = key
+            lines.append(
+                f"{seconds:8.3f}s {count:5d} {frames:6d}  {line}  {kind} {animations}"
+            )
+        return "\n".join(lines)
+
+    def write(self, directory, title):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        json_path = directory / f"{title}.json"
+        json_path.write_text(json.dumps(self.results(title), indent=1))
+        (directory / f"{title}.folded").write_text(self.folded(title))
+        return json_path
+
+
+class PlayProfilerMixin:
+    # Put before the Scene class in the bases: class S(PlayProfilerMixin,
+    # VoiceoverScene). Does nothing unless PROFILE_PLAYS is set.
+
+    # where the profiles are written, in the media directory
+    play_profile_dir = PROFILE_DIR
+
+    def setup(self):
+        super().setup()
+        self.play_profiler = PlayProfiler() if play_profiling_enabled() else None
+        if self.play_profiler is not None:
+            self.play_profiler.install(self)
+
+    def _construct_line(self):
+        # file:line of construct() (or of a function of its file) that played
+        construct_file = type(self).construct.__code__.co_filename
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename != construct_file:
+            frame = frame.f_back
+        if frame is None:
+            return "?"
+        return f"{os.path.basename(construct_file)}:{frame.f_lineno}"
+
+    def play(self, *args, **kwargs):
+        profiler = getattr(self, "play_profiler", None)
+        if profiler is None or profiler.play is not None:
+            return super().play(*args, **kwargs)
+        profiler.begin_play(self._construct_line())
+        try:
+            super().play(*args, **kwargs)
+        except BaseException:
+            profiler.abandon_play()
+            raise
+        profiler.end_play(self)
+
+    def wait(self, *args, **kwargs):
+        profiler = getattr(self, "play_profiler", None)
+        if profiler is None:
+            return super().wait(*args, **kwargs)
+        profiler.kind = "wait"
+        try:
+            super().wait(*args, **kwargs)
+        finally:
+            profiler.kind = "play"
+
+    def begin_animations(self):
+        profiler = getattr(self, "play_profiler", None)
+        if profiler is None or profiler.play is None:
+            return super().begin_animations()
+        profiler.timed("begin", super().begin_animations)()
+        profiler.play["family"] = len(self.get_mobject_family_members())
+
+    def update_to_time(self, t):
+        profiler = getattr(self, "play_profiler", None)
+        if profiler is None:
+            return super().update_to_time(t)
+        profiler.timed("interpolate", super().update_to_time)(t)
+
+    def update_mobjects(self, dt):
+        profiler = getattr(self, "play_profiler", None)
+        if profiler is None:
+            return super().update_mobjects(dt)
+        profiler.timed("updaters", super().update_mobjects)(dt)
+
+    def tear_down(self):
+        super().tear_down()
+        profiler = getattr(self, "play_profiler", None)
+        if profiler is not None:
+            profiler.uninstall()
+            title = type(self).__name__
+            directory = Path(config.media_dir) / self.play_profile_dir
+            path = profiler.write(directory, title)
+            logger.info(profiler.report(title))
+            logger.info(f"Play profile written to {path}")
@@ -0,0 +1,116 @@
+# Segments from a centre to points, e.g. from the origin to dots on the sphere.
+#
+# A Line3D is a cylinder, and moving one of its ends rebuilds the whole mesh.
+# These are stroked VMobjects instead: one straight curve of four points that
+# is written in place when an end moves. When a segment is animated together
+# with its dot (in a Group passed to Rotate or ApplyWord), it goes through the
+# same transformation as the dot, so nothing is rebuilt at all. RadialLineSet
+# holds many segments whose ends come from one (n, 3) array, such as the points
+# of a PointCloud.
+
+from manim import *
+
+# where the four points of a straight cubic curve are along it
+_THIRDS = np.array([0, 1 / 3, 2 / 3, 1])[:, None]
+
+# about the thickness of a default Line3D
+DEFAULT_SEGMENT_WIDTH = 2
+
+
+def segment_points(ends, start=ORIGIN):
+    # the curves from start to every row of ends, as an (n, 4, 3) array
+    start = np.asarray(start, dtype=float)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 1, 3)
+    return start + _THIRDS * (ends - start)
+
+
+class RadialSegment(VMobject):
+    # The segment from start to end. With shade_in_3d the 3D camera sorts it
+    # by depth like the faces of surfaces.
+
+    def __init__(
+        self,
+        end,
+        start=ORIGIN,
+        color=WHITE,
+        stroke_width=DEFAULT_SEGMENT_WIDTH,
+        shade_in_3d=True,
+        **kwargs,
+    ):
+        self.start_point = np.array(start, dtype=float)
+        self.end_point = np.array(end, dtype=float)
+        super().__init__(
+            color=color, stroke_width=stroke_width, shade_in_3d=shade_in_3d, **kwargs
+        )
+
+    def generate_points(self):
+        self.set_end(self.end_point)
+
+    def set_end(self, end):
+        self.end_point[:] = end
+        if self.points.shape != (4, 3):
+            self.points = np.empty((4, 3))
+        np.multiply(_THIRDS, self.end_point - self.start_point, out=self.points)
+        self.points += self.start_point
+        return self
+
+    def follow(self, mobject):
+        # keep the end on the centre of mobject, e.g. a dot
+        self.add_updater(lambda segment: segment.set_end(mobject.get_center()))
+        return self
+
+
+class RadialLineSet(VGroup):
+    # Segments from start to each of ends, coloured by `colors` (one colour, or
+    # one per segment). With depth_sort every segment is its own RadialSegment,
+    # so the 3D camera can sort them by depth; without, the segments of each
+    # colour are the subpaths of a single VMobject, which is much cheaper for
+    # thousands of lines.
+
+    def __init__(
+        self,
+        ends,
+        start=ORIGIN,
+        colors=WHITE,
+        stroke_width=DEFAULT_SEGMENT_WIDTH,
+        depth_sort=True,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.start_point = np.array(start, dtype=float)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 3)
+        if isinstance(colors, (list, tuple)):
+            colors = [ManimColor(color) for color in colors]
+        else:
+            colors = [ManimColor(colors)] * len(ends)
+        if len(colors) != len(ends):
+            raise ValueError("ends and colors must have the same length")
+        self.depth_sort = depth_sort
+        if depth_sort:
+            self.add(
+                *[
+                    RadialSegment(
+                        end, self.start_point, color=color, stroke_width=stroke_width
+                    )
+                    for end, color in zip(ends, colors)
+                ]
+            )
+            self._groups = [np.array([i]) for i in range(len(ends))]
+        else:
+            self._groups = []
+            hexes = np.array([color.to_hex() for color in colors])
+            for color in dict.fromkeys(hexes):
+                self._groups.append(np.flatnonzero(hexes == color))
+                self.add(VMobject(color=color, stroke_width=stroke_width))
+        self.set_ends(ends)
+
+    def set_ends(self, ends):
+        points = segment_points(ends, self.start_point)
+        for mobject, indices in zip(self.submobjects, self._groups):
+            mobject.points = points[indices].reshape(-1, 3)
+        return self
+
+    def follow(self, cloud):
+        # keep the ends on the points of a PointCloud
+        self.add_updater(lambda lines: lines.set_ends(cloud.points))
+        return self
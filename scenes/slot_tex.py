@@ -0,0 +1,191 @@
+# Numbers, and math with numbers in it, that change value without LaTeX.
+#
+# Every character a number can show is compiled once into a glyph atlas, and
+# numbers are laid out from copies of those glyphs. A GlyphNumber is laid out
+# like a DecimalNumber, but set_value only copies glyphs, and does nothing when
+# the shown string doesn't change. SlotMathTex is MathTex with numeric slots:
+# the rest of the formula is compiled once, with a 0 in every slot, and the
+# numbers are GlyphNumbers put where the 0s were. Counting to 10000 runs the same
+# LaTeX jobs as counting to 1.
+
+from manim import *
+
+from tex_cache import cached_math_tex
+
+# passed to SlotMathTex in place of a tex string to put a number there
+SLOT = "<slot>"
+
+# digit_buff_per_font_unit of DecimalNumber
+DIGIT_BUFF_PER_FONT_UNIT = 0.001
+
+_GLYPHS = {}
+
+
+def glyph(char):
+    # a copy of the glyph of char, at DEFAULT_FONT_SIZE
+    if char not in _GLYPHS:
+        _GLYPHS[char] = cached_math_tex(char)
+    return _GLYPHS[char].copy()
+
+
+def glyph_height(char):
+    if char not in _GLYPHS:
+        glyph(char)
+    return _GLYPHS[char].height
+
+
+def format_number(number, num_decimal_places=2, include_sign=False, commas=True):
+    # the string DecimalNumber shows for number
+    formatter = "{:" + ("+" if include_sign else "") + ("," if commas else "")
+    string = (formatter + f".{num_decimal_places}f}}").format(number)
+    if string.startswith("-") and np.round(number, num_decimal_places) == 0:
+        string = ("+" if include_sign else "") + string[1:]
+    return string
+
+
+class GlyphNumber(VMobject):
+    # DecimalNumber made of glyph atlas copies. set_value keeps the size, the
+    # style of every position and the point at edge_to_fix.
+
+    def __init__(
+        self,
+        number=0,
+        num_decimal_places=2,
+        include_sign=False,
+        group_with_commas=True,
+        font_size=DEFAULT_FONT_SIZE,
+        edge_to_fix=LEFT,
+        stroke_width=0,
+        fill_opacity=1.0,
+        **kwargs,
+    ):
+        super().__init__(stroke_width=stroke_width, fill_opacity=fill_opacity, **kwargs)
+        self.num_decimal_places = num_decimal_places
+        self.include_sign = include_sign
+        self.group_with_commas = group_with_commas
+        self.edge_to_fix = edge_to_fix
+        self.number = number
+        self.num_string = self._format(number)
+        self.add(*self._layout(self.num_string, font_size / DEFAULT_FONT_SIZE))
+        self.init_colors()
+
+    def _format(self, number):
+        return format_number(
+            number, self.num_decimal_places, self.include_sign, self.group_with_commas
+        )
+
+    def _layout(self, num_string, scale_factor):
+        # the glyphs of num_string as DecimalNumber arranges them, centred on
+        # the origin
+        glyphs = VGroup(*[glyph(char) for char in num_string])
+        glyphs.arrange(
+            buff=DIGIT_BUFF_PER_FONT_UNIT * DEFAULT_FONT_SIZE, aligned_edge=DOWN
+        )
+        for i, char in enumerate(num_string):
+            if char == "-" and i + 1 < len(num_string):
+                glyphs[i].align_to(glyphs[i + 1], UP)
+                glyphs[i].shift(glyphs[i + 1].height * DOWN / 2)
+            elif char == ",":
+                glyphs[i].shift(glyphs[i].height * DOWN / 2)
+        glyphs.scale(scale_factor).move_to(ORIGIN)
+        return glyphs.submobjects
+
+    def scale_factor(self):
+        # the current size relative to DEFAULT_FONT_SIZE
+        first = self.submobjects[0]
+        return first.height / glyph_height(self.num_string[0])
+
+    def set_value(self, number):
+        self.number = number
+        num_string = self._format(number)
+        if num_string == self.num_string:
+            return self
+        anchor = self.get_critical_point(self.edge_to_fix)
+        old = self.submobjects
+        glyphs = self._layout(num_string, self.scale_factor())
+        for i, new in enumerate(glyphs):
+            new.match_style(old[min(i, len(old) - 1)])
+        if config.renderer == RendererType.CAIRO:
+            # as in DecimalNumber.set_value: the scene may still hold the old
+            # glyphs among the moving mobjects of the current animation
+            for mobject in VGroup(*old).get_family():
+                mobject.points[:] = 0
+        self.num_string = num_string
+        self.submobjects = glyphs
+        self.move_to(anchor, self.edge_to_fix)
+        return self
+
+    def get_value(self):
+        return self.number
+
+    def increment_value(self, delta_t=1):
+        return self.set_value(self.get_value() + delta_t)
+
+
+class SlotMathTex(VGroup):
+    # MathTex(*tex_strings) where every string that is SLOT shows a number. The
+    # 0 compiled in its place stays as an invisible reference for the size and
+    # place of the number, so the number follows the formula when that is moved
+    # or scaled, and the parts after a slot shift along when its number gets
+    # wider or narrower. Strings can't contain {{ }} groups.
+
+    def __init__(
+        self,
+        *tex_strings,
+        values=None,
+        num_decimal_places=0,
+        font_size=DEFAULT_FONT_SIZE,
+        **kwargs,
+    ):
+        super().__init__()
+        template = cached_math_tex(
+            *["0" if tex == SLOT else tex for tex in tex_strings],
+            font_size=font_size,
+            **kwargs,
+        )
+        if len(template.submobjects) != len(tex_strings):
+            raise ValueError("SlotMathTex strings can't be split by MathTex")
+        self.parts = VGroup(*template.submobjects)
+        self.slots = [i for i, tex in enumerate(tex_strings) if tex == SLOT]
+        if values is None:
+            values = [0] * len(self.slots)
+        if len(values) != len(self.slots):
+            raise ValueError("SlotMathTex needs one value for every slot")
+        self.numbers = VGroup()
+        for i, value in zip(self.slots, values):
+            reference = self.parts[i]
+            number = GlyphNumber(
+                value,
+                num_decimal_places=num_decimal_places,
+                font_size=DEFAULT_FONT_SIZE * reference.height / glyph_height("0"),
+            ).match_style(reference)
+            reference.set_opacity(0)
+            self.numbers.add(number)
+        # how far every part has been moved right, in widths of the first slot
+        self._shifts = [0.0] * len(self.parts)
+        self.add(self.parts, self.numbers)
+        self._reflow()
+
+    def _reflow(self):
+        unit = self.parts[self.slots[0]].width if self.slots else 1.0
+        shift = 0.0
+        numbers = dict(zip(self.slots, self.numbers))
+        for i, part in enumerate(self.parts):
+            part.shift((shift - self._shifts[i] * unit) * RIGHT)
+            self._shifts[i] = shift / unit
+            if i in numbers:
+                numbers[i].align_to(part, DL)
+                shift += numbers[i].width - part.width
+        return self
+
+    def set_value(self, value, index=0):
+        self.numbers[index].set_value(value)
+        return self._reflow()
+
+    def set_values(self, *values):
+        for number, value in zip(self.numbers, values):
+            number.set_value(value)
+        return self._reflow()
+
+    def get_value(self, index=0):
+        return self.numbers[index].get_value()
@@ -0,0 +1,14 @@
+# MathTex objects that get built over and over (tree labels, counter glyphs)
+# are built once and copied afterwards. Copying skips both LaTeX and parsing
+# the SVG.
+
+from manim import MathTex
+
+_MATH_TEX_CACHE = {}
+
+
+def cached_math_tex(*tex_strings, **kwargs):
+    key = (tex_strings, tuple(sorted(kwargs.items())))
+    if key not in _MATH_TEX_CACHE:
+        _MATH_TEX_CACHE[key] = MathTex(*tex_strings, **kwargs)
+    return _MATH_TEX_CACHE[key].copy()
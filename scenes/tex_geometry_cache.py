@@ -0,0 +1,130 @@
+# Parsed Tex geometry kept on disk, next to the SVGs in the Tex directory.
+#
+# manim keeps parsed SVGs in memory, but only for the rest of the process, and
+# every render is a new process: each Tex SVG is parsed again and its paths are
+# rebuilt in Python, even when LaTeX doesn't run. After
+# enable_tex_geometry_cache(), the points and styles of the paths of a Tex SVG
+# are saved to an .npz file named after the SVG (so after the hash of its LaTeX)
+# and the SVG settings, and later renders read that file instead.
+#
+# The points are copied out of the file rather than memory-mapped: an .npz can't
+# be mapped, and mobjects move their points in place.
+
+import hashlib
+import os
+import tempfile
+import zipfile
+
+from manim import *
+from manim.mobject.svg.svg_mobject import VMobjectFromSVGPath
+
+# change when the contents of the files change
+CACHE_VERSION = 1
+
+# per-path arrays with one row per colour, and per-path numbers
+_STYLE_ARRAYS = ("fill_rgbas", "stroke_rgbas", "background_stroke_rgbas")
+_STYLE_VALUES = ("stroke_width", "background_stroke_width")
+
+_parse_svg = SVGMobject.generate_mobject
+
+
+class CachedSVGPath(VMobjectFromSVGPath):
+    # a path of an SVG read from the cache instead of parsed
+
+    def __init__(self, points, **kwargs):
+        self.cached_points = points
+        VMobject.__init__(self, **kwargs)
+
+    def generate_points(self):
+        self.points = self.cached_points
+
+    init_points = generate_points
+
+
+def geometry_cache_path(svg_mobject):
+    settings = repr(
+        (
+            CACHE_VERSION,
+            sorted(svg_mobject.svg_default.items()),
+            sorted(svg_mobject.path_string_config.items()),
+            str(config.renderer),
+        )
+    )
+    key = hashlib.sha256(settings.encode()).hexdigest()[:8]
+    svg_path = svg_mobject.get_file_path()
+    return svg_path.with_name(f"{svg_path.stem}.{key}.npz")
+
+
+def _concatenate(arrays):
+    # one array and the number of rows of each part, for np.split
+    return np.concatenate(arrays), np.array([len(array) for array in arrays])
+
+
+def _split(array, counts):
+    return np.split(array, np.cumsum(counts)[:-1])
+
+
+def save_geometry(path, mobjects):
+    arrays = {}
+    arrays["points"], arrays["point_counts"] = _concatenate(
+        [mobject.points for mobject in mobjects]
+    )
+    for name in _STYLE_ARRAYS:
+        arrays[name], arrays[name + "_counts"] = _concatenate(
+            [getattr(mobject, name) for mobject in mobjects]
+        )
+    for name in _STYLE_VALUES:
+        arrays[name] = np.array([getattr(mobject, name) for mobject in mobjects])
+    # written under another name first, so other renders never read half a file
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix=".npz")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load_geometry(path):
+    with np.load(path) as data:
+        points = _split(data["points"], data["point_counts"])
+        mobjects = [CachedSVGPath(array) for array in points]
+        for name in _STYLE_ARRAYS:
+            for mobject, array in zip(
+                mobjects, _split(data[name], data[name + "_counts"])
+            ):
+                setattr(mobject, name, array)
+        for name in _STYLE_VALUES:
+            for mobject, value in zip(mobjects, data[name]):
+                setattr(mobject, name, float(value))
+    return mobjects
+
+
+def _cacheable(mobjects):
+    # flat paths only; anything else is left to be parsed every time
+    return all(
+        isinstance(mobject, VMobject) and not mobject.submobjects
+        for mobject in mobjects
+    )
+
+
+def _generate_mobject(self):
+    # SVGMobject.generate_mobject, through the cache
+    path = geometry_cache_path(self)
+    if path.exists():
+        try:
+            self.add(*load_geometry(path))
+            return
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as error:
+            logger.warning(f"Ignoring unreadable Tex geometry {path}: {error}")
+    _parse_svg(self)
+    if self.submobjects and _cacheable(self.submobjects):
+        try:
+            save_geometry(path, self.submobjects)
+        except OSError as error:
+            logger.warning(f"Could not save Tex geometry {path}: {error}")
+
+
+def enable_tex_geometry_cache():
+    SingleStringMathTex.generate_mobject = _generate_mobject
@@ -0,0 +1,192 @@
+# A voiceover cache lookup that doesn't read the whole voiceover cache.
+#
+# manim_voiceover keeps every voiceover in media/voiceovers/cache.json, one list
+# with the text of every voiceover twice and all of its word boundaries, reads
+# and scans that list on every self.voiceover(...) and then appends the entry it
+# found to the list again. IndexedRecorderService looks voiceovers up in an
+# index instead: cache_index.json, keyed by a hash of the input data of the
+# voiceover (its text without bookmarks, the recorder settings and the service)
+# and read once per process, with the audio files and durations of every
+# voiceover. The word boundaries and transcriptions are kept in a file per
+# voiceover in cache_details/, and only read when they are needed, which is for
+# voiceovers with bookmarks. A found voiceover isn't written anywhere.
+#
+# Voiceovers that aren't in the index are recorded (or found in cache.json) by
+# RecorderService as before and then added to the index. The index is built
+# again from cache.json when that changes, as it does when a scene still uses
+# RecorderService.
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from manim import *
+from manim_voiceover.helper import remove_bookmarks
+from manim_voiceover.modify_audio import get_duration
+from manim_voiceover.services.recorder import RecorderService
+
+CACHE_FILE = "cache.json"
+INDEX_FILE = "cache_index.json"
+DETAILS_DIR = "cache_details"
+INDEX_VERSION = 1
+
+# what is moved from the cache entries to their details file
+DETAIL_KEYS = ("word_boundaries", "transcribed_text")
+
+_INDEXES = {}
+
+
+def voiceover_key(input_data):
+    data = json.dumps(input_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+def _file_state(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _write_json(path, data):
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix=".json")
+    with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+class IndexedVoiceover(dict):
+    # The cache entry of a voiceover, as RecorderService returns it. Its
+    # details are read from their file when they are asked for; `in` only
+    # reports them for text with bookmarks, as VoiceoverTracker only reads them
+    # to place bookmarks.
+
+    def __init__(self, entry, details_path):
+        super().__init__(entry)
+        self.details_path = details_path
+
+    def _load_details(self):
+        if self.details_path is not None:
+            path, self.details_path = self.details_path, None
+            with open(path, encoding="utf-8") as file:
+                self.update(json.load(file))
+
+    def __getitem__(self, key):
+        if key in DETAIL_KEYS:
+            self._load_details()
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if key in DETAIL_KEYS:
+            self._load_details()
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        if key in DETAIL_KEYS and self.details_path is not None:
+            return remove_bookmarks(self["input_text"]) != self["input_text"]
+        return super().__contains__(key)
+
+
+class VoiceoverIndex:
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.path = self.cache_dir / INDEX_FILE
+        self.details_dir = self.cache_dir / DETAILS_DIR
+        self.entries = {}
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            data = {}
+        source = _file_state(self.cache_dir / CACHE_FILE)
+        if data.get("version") == INDEX_VERSION and data.get("source") == source:
+            self.entries = data["entries"]
+        elif source is not None:
+            self.rebuild()
+
+    def rebuild(self):
+        # from cache.json, where later entries of the same voiceover win
+        logger.info(f"Indexing the voiceovers in {self.cache_dir / CACHE_FILE}")
+        with open(self.cache_dir / CACHE_FILE, encoding="utf-8") as file:
+            cache = json.load(file)
+        self.entries = {}
+        for entry in cache:
+            if "input_data" in entry:
+                self._add(voiceover_key(entry["input_data"]), entry)
+        self.save()
+
+    def save(self):
+        data = {
+            "version": INDEX_VERSION,
+            "source": _file_state(self.cache_dir / CACHE_FILE),
+            "entries": self.entries,
+        }
+        _write_json(self.path, data)
+
+    def _add(self, key, entry):
+        details = {name: entry[name] for name in DETAIL_KEYS if name in entry}
+        if details:
+            self.details_dir.mkdir(exist_ok=True)
+            _write_json(self.details_dir / f"{key}.json", details)
+        audio = self.cache_dir / entry["final_audio"]
+        self.entries[key] = {
+            "input_text": entry["input_text"],
+            "original_audio": entry["original_audio"],
+            "final_audio": entry["final_audio"],
+            "duration": get_duration(str(audio)) if audio.exists() else None,
+            "details": bool(details),
+        }
+
+    def add(self, input_data, entry):
+        self._add(voiceover_key(input_data), entry)
+        self.save()
+
+    def get(self, input_data):
+        key = voiceover_key(input_data)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        details_path = self.details_dir / f"{key}.json" if entry["details"] else None
+        data = {name: value for name, value in entry.items() if name != "details"}
+        data["input_data"] = input_data
+        return IndexedVoiceover(data, details_path)
+
+
+def voiceover_index(cache_dir):
+    # the index of cache_dir, read once per process
+    cache_dir = Path(cache_dir).resolve()
+    if cache_dir not in _INDEXES:
+        _INDEXES[cache_dir] = VoiceoverIndex(cache_dir)
+    return _INDEXES[cache_dir]
+
+
+class IndexedRecorderService(RecorderService):
+    def input_data(self, text):
+        # the input data RecorderService.generate_from_text looks voiceovers
+        # up by
+        return {
+            "input_text": remove_bookmarks(text),
+            "config": {
+                "format": self.recorder.format,
+                "channels": self.recorder.channels,
+                "rate": self.recorder.rate,
+                "chunk": self.recorder.chunk,
+            },
+            "service": "recorder",
+        }
+
+    def _wrap_generate_from_text(self, text, path=None, **kwargs):
+        if self.global_speed != 1 or path is not None:
+            # the index holds the audio as recorded, without speed changes
+            return super()._wrap_generate_from_text(text, path=path, **kwargs)
+        text = " ".join(text.split())
+        index = voiceover_index(self.cache_dir)
+        input_data = self.input_data(text)
+        data = index.get(input_data)
+        if data is None:
+            data = super()._wrap_generate_from_text(text, **kwargs)
+            index.add(input_data, data)
+        return data
@@ -0,0 +1,71 @@
+# Rotating mobjects by whole words of G(sigma, tau) in a single play.
+#
+# A word acts one component at a time, rightmost first. ApplyWord gives every
+# component an equal share of the run time and turns the mobject about that
+# component's axis during its share, on top of the matrix of the components
+# that already acted. Those matrices are suffixes of the word and come from the
+# WordMatrixTrie, so a frame costs one 3x3 rotation and one matrix product per
+# submobject.
+
+from manim import *
+
+from free_group import axis_angle_path, word_matrix
+
+# run time per component when ApplyWord isn't given one
+DEFAULT_COMPONENT_TIME = 1.0
+
+
+def word_segments(word):
+    # (axis, angle, matrix already applied) for every component, in the order
+    # they act
+    path = axis_angle_path(word)
+    return [
+        (axis, angle, word_matrix(word[len(word) - i :]))
+        for i, (axis, angle) in enumerate(path)
+    ]
+
+
+class ApplyWord(Animation):
+    # Rotates `mobject` about about_point by every component of `word` in turn.
+    # rate_func spreads the run time over the components and segment_rate_func
+    # eases each of them, so the default looks like one smooth Rotate per
+    # component.
+
+    def __init__(
+        self,
+        mobject,
+        word,
+        about_point=ORIGIN,
+        segment_rate_func=smooth,
+        rate_func=linear,
+        run_time=None,
+        **kwargs,
+    ):
+        self.word = np.array(word)
+        self.about_point = np.array(about_point, dtype=float)
+        self.segment_rate_func = segment_rate_func
+        self.segments = word_segments(self.word)
+        if run_time is None:
+            run_time = max(len(self.word), 1) * DEFAULT_COMPONENT_TIME
+        super().__init__(mobject, rate_func=rate_func, run_time=run_time, **kwargs)
+
+    def matrix_at(self, alpha):
+        # the rotation the mobject has undergone at alpha
+        if not self.segments:
+            return np.identity(3)
+        position = self.rate_func(alpha) * len(self.segments)
+        index = min(int(np.floor(position)), len(self.segments) - 1)
+        axis, angle, applied = self.segments[index]
+        turned = self.segment_rate_func(position - index) * angle
+        return rotation_matrix(turned, axis) @ applied
+
+    def interpolate_mobject(self, alpha):
+        matrix = self.matrix_at(alpha)
+        for submobject, starting in zip(
+            self.mobject.family_members_with_points(),
+            self.starting_mobject.family_members_with_points(),
+        ):
+            points = (starting.points - self.about_point) @ matrix.T
+            submobject.points = (points + self.about_point).astype(
+                starting.points.dtype, copy=False
+            )
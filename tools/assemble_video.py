@@ -0,0 +1,262 @@
+# Joins the rendered scenes into the whole video.
+#
+# The scenes are taken in chapter order: by the number in front of the file
+# name in scenes/ (0_intro, 1_measurable_scene, ..., 20_conclusion) and, within
+# a file, in the order of their classes. Every scene video is first turned into
+# a segment: its video stream is copied as it is, and its sound (the voiceovers
+# manim put in it, or silence for a scene without any) is encoded again as the
+# same AAC for every segment, padded to the length of the video. The segments
+# are then joined by ffmpeg's concat demuxer without encoding anything, with a
+# chapter for every scene.
+#
+# Segments are kept in media/assembly/<quality>/ with the size and time of the
+# scene video they came from, and only made again when that video changed; the
+# whole video is only joined again when a segment changed.
+#
+#     python tools/assemble_video.py -q h
+#     python tools/assemble_video.py -q l --skip-missing -o preview.mp4
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from render_all import QUALITIES, QUALITY_DIRS, ROOT, discover_jobs
+
+CHAPTER_SOURCES = ["scenes/[0-9]*.py"]
+
+ASSEMBLY_DIR = "assembly"
+MANIFEST_NAME = "assembly.json"
+MANIFEST_VERSION = 1
+
+# the sound of every segment, so the segments can be joined without encoding
+AUDIO_ARGS = ["-c:a", "aac", "-b:a", "320k", "-ar", "48000", "-ac", "2"]
+
+
+def chapter_number(job):
+    return int(job.path.stem.split("_", 1)[0])
+
+
+def chapter_jobs():
+    # discover_jobs keeps the classes of a file in order; sorted is stable
+    return sorted(discover_jobs(CHAPTER_SOURCES), key=chapter_number)
+
+
+def probe(path):
+    # (duration of the video stream, whether there is sound)
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_streams", "-of", "json", str(path)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    streams = json.loads(result.stdout)["streams"]
+    video = next(s for s in streams if s["codec_type"] == "video")
+    has_audio = any(s["codec_type"] == "audio" for s in streams)
+    return float(video["duration"]), has_audio
+
+
+def ffmpeg(*args):
+    subprocess.run(["ffmpeg", "-y", "-v", "error", *args], check=True)
+
+
+def make_segment(source, target, duration, has_audio):
+    if has_audio:
+        inputs = ["-i", str(source)]
+        audio = "0:a:0"
+    else:
+        inputs = [
+            "-i",
+            str(source),
+            "-f",
+            "lavfi",
+            "-i",
+            "anullsrc=r=48000:cl=stereo",
+        ]
+        audio = "1:a:0"
+    temporary = target.with_name(target.stem + ".partial" + target.suffix)
+    ffmpeg(
+        *inputs,
+        "-map",
+        "0:v:0",
+        "-map",
+        audio,
+        "-c:v",
+        "copy",
+        *AUDIO_ARGS,
+        "-af",
+        "apad",
+        "-t",
+        f"{duration:.6f}",
+        str(temporary),
+    )
+    os.replace(temporary, target)
+
+
+def chapters_metadata(chapters):
+    # ffmpeg's metadata file format, with one chapter per (title, start, end)
+    lines = [";FFMETADATA1"]
+    for title, start, end in chapters:
+        title = "".join("\\" + c if c in "=;#\\\n" else c for c in title)
+        lines += [
+            "[CHAPTER]",
+            "TIMEBASE=1/1000",
+            f"START={round(start * 1000)}",
+            f"END={round(end * 1000)}",
+            f"title={title}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+class Assembly:
+    def __init__(self, media_dir, quality):
+        self.media_dir = Path(media_dir)
+        self.quality_dir = QUALITY_DIRS[quality]
+        self.dir = self.media_dir / ASSEMBLY_DIR / self.quality_dir
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.dir / MANIFEST_NAME
+        self.manifest = {"version": MANIFEST_VERSION, "segments": {}, "output": None}
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") == MANIFEST_VERSION:
+            self.manifest = manifest
+
+    def save(self):
+        temporary = self.manifest_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.manifest, indent=1))
+        os.replace(temporary, self.manifest_path)
+
+    def scene_video(self, job):
+        return (
+            self.media_dir
+            / "videos"
+            / job.path.stem
+            / self.quality_dir
+            / f"{job.scene}.mp4"
+        )
+
+    def segment(self, job):
+        # (segment file, duration), made again if the scene video changed
+        source = self.scene_video(job)
+        stat = source.stat()
+        key = f"{job.path.stem}.{job.scene}"
+        target = self.dir / f"{key}.mp4"
+        entry = self.manifest["segments"].get(key)
+        if (
+            entry is not None
+            and entry["source"] == [stat.st_size, stat.st_mtime_ns]
+            and target.exists()
+        ):
+            return target, entry["duration"], False
+        duration, has_audio = probe(source)
+        make_segment(source, target, duration, has_audio)
+        self.manifest["segments"][key] = {
+            "source": [stat.st_size, stat.st_mtime_ns],
+            "duration": duration,
+        }
+        self.save()
+        return target, duration, True
+
+    def join(self, segments, output):
+        # segments: [(title, segment file, duration)]; False if the output was
+        # already joined from the same segments
+        hasher = hashlib.sha256(str(output).encode())
+        for title, path, duration in segments:
+            stat = path.stat()
+            key = f"{title}\0{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0"
+            hasher.update(key.encode())
+        digest = hasher.hexdigest()
+        if self.manifest["output"] == digest and output.exists():
+            return False
+        chapters, start = [], 0.0
+        for title, path, duration in segments:
+            chapters.append((title, start, start + duration))
+            start += duration
+        list_path = self.dir / "segments.txt"
+        list_path.write_text(
+            "".join(f"file '{path.resolve()}'\n" for _, path, _ in segments)
+        )
+        chapters_path = self.dir / "chapters.txt"
+        chapters_path.write_text(chapters_metadata(chapters), encoding="utf-8")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        temporary = output.with_name(output.stem + ".partial" + output.suffix)
+        ffmpeg(
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(list_path),
+            "-i",
+            str(chapters_path),
+            "-map",
+            "0",
+            "-map_metadata",
+            "1",
+            "-map_chapters",
+            "1",
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
+            str(temporary),
+        )
+        os.replace(temporary, output)
+        self.manifest["output"] = digest
+        self.save()
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Join the rendered scenes into the video, in chapter order."
+    )
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="h")
+    parser.add_argument("--media-dir", type=Path, default=ROOT / "media")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="default: media/videos/video_<quality>.mp4"
+    )
+    parser.add_argument(
+        "--skip-missing",
+        action="store_true",
+        help="leave out scenes that aren't rendered instead of stopping",
+    )
+    args = parser.parse_args(argv)
+
+    assembly = Assembly(args.media_dir, args.quality)
+    output = args.output or (
+        args.media_dir / "videos" / f"video_{assembly.quality_dir}.mp4"
+    )
+    jobs = chapter_jobs()
+    missing = [job for job in jobs if not assembly.scene_video(job).exists()]
+    for job in missing:
+        print(f"not rendered: {job.key}")
+    if missing and not args.skip_missing:
+        print("render them first, or pass --skip-missing", file=sys.stderr)
+        return 1
+    segments = []
+    for job in jobs:
+        if job in missing:
+            continue
+        path, duration, made = assembly.segment(job)
+        if made:
+            print(f"segment {duration:7.1f}s  {job.key}")
+        segments.append((job.scene, path, duration))
+    if not segments:
+        print("nothing to join", file=sys.stderr)
+        return 1
+    if assembly.join(segments, output):
+        total = sum(duration for _, _, duration in segments)
+        print(f"{output}: {len(segments)} scenes, {total / 60:.1f} minutes")
+    else:
+        print(f"{output} is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
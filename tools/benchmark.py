@@ -0,0 +1,298 @@
+# Benchmarks rendering on a fixed part of a few representative scenes.
+#
+# Every benchmark renders the first plays of one scene at 480p15: a 2D scene
+# with updaters (NonMeasurableScene), two 3D point cloud scenes (CreatingM,
+# ExpandToBallThreeD) and a scene of mostly Tex (FreeGroupConclusionScene).
+# The scenes are seeded with DeterministicSceneMixin, and their voiceovers take
+# as long as in the voiceover index (or as estimated for the ones not recorded
+# yet) without being played, as in dry_run.py, so every run renders the same
+# frames. Each benchmark runs in a process of its own, with the plays profiled
+# by PlayProfilerMixin, into a temporary directory and with an empty Tex
+# directory, so nothing is read from a cache. It measures:
+#
+# - ms_per_frame: the time of the plays over the number of frames rendered,
+# - peak_rss_mb: the most memory the process used,
+# - tex_compiles: how many Tex strings LaTeX compiled.
+#
+# The results are compared with the baseline in tools/benchmark_baseline.json,
+# which is kept in the repository and made with --save-baseline on the machine
+# the scenes are rendered on (the same CPU model and number of cores). The run
+# fails when a result is worse than the baseline by more than its tolerance,
+# and also when there is no baseline to compare a benchmark with, unless
+# --no-baseline-ok is given. The profile of every benchmark is written to
+# media/profiles/benchmark/.
+#
+#     python tools/benchmark.py                    # compare with the baseline
+#     python tools/benchmark.py --repeat 3 CreatingM
+#     python tools/benchmark.py --save-baseline    # after checking the numbers
+#     python tools/benchmark.py --no-baseline-ok   # on another machine
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import manim
+from manim import config
+
+from dry_run import TimelineMixin, load_scene_class
+from profile_scene import QUALITY_NAMES, profile_scene
+from render_all import ROOT, SCENES_DIR, discover_jobs
+
+sys.path.insert(0, str(SCENES_DIR))
+
+from deterministic import DeterministicSceneMixin
+from profiling import PROFILE_DIR, PROFILE_PLAYS_ENV
+
+BASELINE_PATH = ROOT / "tools" / "benchmark_baseline.json"
+BASELINE_VERSION = 2
+LOG_DIR = "logs/benchmark"
+
+QUALITY = "l"
+
+# the scenes, and the last play rendered of each (None for all of them)
+BENCHMARKS = {
+    "NonMeasurableScene": 24,
+    "CreatingM": 20,
+    "ExpandToBallThreeD": 14,
+    "FreeGroupConclusionScene": None,
+}
+
+# how much a result may be worse than the baseline, as a fraction of it
+TOLERANCES = {
+    "ms_per_frame": 0.10,
+    "peak_rss_mb": 0.10,
+    "tex_compiles": 0.0,
+}
+
+
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def machine():
+    # what the times of a baseline depend on; updates of the system or of
+    # Python don't change it
+    return {"cpu": cpu_model(), "cpus": os.cpu_count()}
+
+
+def environment():
+    # recorded with the baseline, but not compared
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "manim": manim.__version__,
+    }
+
+
+def run_benchmark(name, media_dir):
+    # in the process of the benchmark: render the scene and return the result
+    job = next(job for job in discover_jobs() if job.scene == name)
+    os.environ[PROFILE_PLAYS_ENV] = "1"
+    config.media_dir = str(media_dir)
+    config.quality = QUALITY_NAMES[QUALITY]
+    config.verbosity = "WARNING"
+    if BENCHMARKS[name] is not None:
+        config.upto_animation_number = BENCHMARKS[name]
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as directory:
+        config.video_dir = os.path.join(directory, "videos")
+        config.tex_dir = os.path.join(directory, "Tex")
+        mixins = [TimelineMixin]
+        # seeds the scenes that don't seed themselves
+        if not issubclass(load_scene_class(job), DeterministicSceneMixin):
+            mixins.append(DeterministicSceneMixin)
+        results, seconds = profile_scene(
+            job, mixins, play_profile_dir=f"{PROFILE_DIR}/benchmark"
+        )
+    frames = results["frames"]
+    return {
+        "plays": results["plays"],
+        "frames": frames,
+        "ms_per_frame": round(results["seconds"] / max(frames, 1) * 1e3, 3),
+        # kilobytes on Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "tex_compiles": results["tex_compiles"],
+        "seconds": round(seconds, 2),
+    }
+
+
+def spawn_benchmark(name, media_dir):
+    # the result of the benchmark, run in a process of its own, or None
+    log_dir = media_dir / LOG_DIR
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_path = log_dir / f"{name}.log"
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as directory:
+        result_path = Path(directory) / "result.json"
+        with open(log_path, "w", encoding="utf-8") as log:
+            process = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--media-dir",
+                    str(media_dir),
+                    "--run",
+                    name,
+                    "--result",
+                    str(result_path),
+                ],
+                cwd=ROOT,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        if process.returncode != 0 or not result_path.exists():
+            print(f"{name}: failed, see {log_path.relative_to(ROOT)}")
+            return None
+        return json.loads(result_path.read_text())
+
+
+def best_of(results):
+    # the fastest time and the least memory of several runs of a benchmark
+    best = dict(results[0])
+    best["ms_per_frame"] = min(result["ms_per_frame"] for result in results)
+    best["peak_rss_mb"] = min(result["peak_rss_mb"] for result in results)
+    return best
+
+
+def regressions(result, baseline):
+    # [(metric, value, baseline value)] worse than their tolerance allows
+    worse = []
+    for metric, tolerance in TOLERANCES.items():
+        if result[metric] > baseline[metric] * (1 + tolerance):
+            worse.append((metric, result[metric], baseline[metric]))
+    return worse
+
+
+def load_baseline():
+    try:
+        baseline = json.loads(BASELINE_PATH.read_text())
+    except (OSError, ValueError):
+        return None
+    if baseline.get("version") != BASELINE_VERSION:
+        return None
+    return baseline
+
+
+def save_baseline(baseline, results):
+    if baseline is None or baseline["machine"] != machine():
+        baseline = {"version": BASELINE_VERSION, "benchmarks": {}}
+    baseline["machine"] = machine()
+    baseline["environment"] = environment()
+    for name, result in results.items():
+        baseline["benchmarks"][name] = {"last_play": BENCHMARKS[name], **result}
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=1) + "\n")
+
+
+def _change(value, before):
+    if not before:
+        return f"{value - before:+g}"
+    return f"{(value - before) / before:+.0%}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark rendering a fixed part of a few scenes."
+    )
+    parser.add_argument(
+        "benchmarks", nargs="*", help=f"default: all of {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument("--media-dir", type=Path, default=ROOT / "media")
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="runs per benchmark, the best counts"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help=f"save the results as the baseline in {BASELINE_PATH.relative_to(ROOT)}",
+    )
+    parser.add_argument(
+        "--no-baseline-ok",
+        action="store_true",
+        help="don't fail for benchmarks without a baseline to compare with",
+    )
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--result", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        result = run_benchmark(args.run, args.media_dir)
+        args.result.write_text(json.dumps(result))
+        return 0
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        print(f"no benchmark {', '.join(unknown)}", file=sys.stderr)
+        return 1
+    baseline = load_baseline()
+    if baseline is None:
+        print(f"no baseline in {BASELINE_PATH.relative_to(ROOT)}")
+    elif baseline["machine"] is None:
+        print(f"the baseline in {BASELINE_PATH.relative_to(ROOT)} has no results yet")
+        baseline = None
+    elif baseline["machine"] != machine():
+        print(f"the baseline was made on {baseline['machine']}, not on {machine()}")
+        baseline = None
+    results, failed, worse, uncompared = {}, 0, 0, 0
+    for name in args.benchmarks or BENCHMARKS:
+        runs = [spawn_benchmark(name, args.media_dir) for _ in range(args.repeat)]
+        if None in runs:
+            failed += 1
+            continue
+        result = results[name] = best_of(runs)
+        before = (baseline or {}).get("benchmarks", {}).get(name)
+        line = (
+            f"{name:<26} {result['frames']:5d} frames {result['ms_per_frame']:8.1f}"
+            f" ms/frame {result['peak_rss_mb']:7.1f} MB"
+            f" {result['tex_compiles']:4d} Tex"
+        )
+        if before is None:
+            uncompared += 1
+            print(f"{line}  (no baseline)")
+            continue
+        comparable = (
+            before["last_play"] == BENCHMARKS[name]
+            and before["frames"] == result["frames"]
+        )
+        if not comparable:
+            uncompared += 1
+            print(f"{line}  (renders other frames than the baseline)")
+            continue
+        changes = ", ".join(
+            f"{metric} {_change(result[metric], before[metric])}"
+            for metric in TOLERANCES
+        )
+        print(f"{line}  ({changes})")
+        for metric, value, was in regressions(result, before):
+            worse += 1
+            print(f"  regression: {metric} {value} against {was} in the baseline")
+    if args.save_baseline:
+        if results:
+            save_baseline(load_baseline(), results)
+            print(f"baseline saved to {BASELINE_PATH.relative_to(ROOT)}")
+        return 1 if failed else 0
+    if uncompared and not args.no_baseline_ok:
+        print(
+            f"{uncompared} benchmarks weren't compared; save a baseline for this "
+            "machine with --save-baseline, or pass --no-baseline-ok"
+        )
+    if failed or worse or (uncompared and not args.no_baseline_ok):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# Times the scenes without rendering them.
+#
+# Every scene runs its construct() as a render with every play skipped: manim
+# still runs the animations to their end and advances the scene time by their
+# run time, but draws no frame and writes no file. Voiceovers aren't played or
+# recorded either; their duration is taken from the voiceover index of
+# IndexedRecorderService (from the audio file when the index has none), or
+# estimated from the number of words for a voiceover that isn't recorded yet.
+#
+# The result is a timeline of the voiceover blocks of every scene, written as
+# JSON: the text, when the block starts and ends, when the voice ends, and the
+# overrun, how much longer the animations of the block take than its voice
+# (which the voiceover then waits for in silence).
+#
+#     python tools/dry_run.py                        # every scene
+#     python tools/dry_run.py ConstructingE -o e.json
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from manim import config
+from manim_voiceover.modify_audio import get_duration
+from manim_voiceover.tracker import VoiceoverTracker
+
+from render_all import ROOT, SCENES_DIR, discover_jobs, select
+
+sys.path.insert(0, str(SCENES_DIR))
+
+from voiceover_cache import IndexedRecorderService, voiceover_index
+
+# for voiceovers that aren't recorded yet: about 150 words a minute
+WORDS_PER_SECOND = 2.5
+
+
+class TimedTracker(VoiceoverTracker):
+    # VoiceoverTracker with a known duration instead of an audio file
+
+    def __init__(self, scene, data, duration):
+        self.scene = scene
+        self.data = data
+        self.cache_dir = None
+        self.duration = duration
+        self.start_t = scene.renderer.time
+        self.end_t = self.start_t + duration
+        if "word_boundaries" in data:
+            self._process_bookmarks()
+
+
+def voiceover_duration(service, text):
+    # (voiceover data, seconds, whether the seconds are estimated)
+    text = " ".join(text.split())
+    if isinstance(service, IndexedRecorderService):
+        data = voiceover_index(service.cache_dir).get(service.input_data(text))
+        if data is not None:
+            if data["duration"] is not None:
+                return data, data["duration"], False
+            audio = Path(service.cache_dir) / data["final_audio"]
+            if audio.exists():
+                return data, get_duration(str(audio)), False
+    data = {"input_text": text}
+    return data, len(text.split()) / WORDS_PER_SECOND, True
+
+
+class TimelineMixin:
+    # records the voiceover blocks of a scene rendered with skip_animations
+
+    def setup(self):
+        super().setup()
+        self.timeline = []
+
+    def add_voiceover_text(self, text, **kwargs):
+        data, duration, estimated = voiceover_duration(self.speech_service, text)
+        tracker = TimedTracker(self, data, duration)
+        self.current_tracker = tracker
+        self.timeline.append(
+            {
+                "text": " ".join(text.split()),
+                "start": tracker.start_t,
+                "voice_end": tracker.end_t,
+                "estimated": estimated,
+            }
+        )
+        return tracker
+
+    # newer versions of manim_voiceover call this from voiceover() instead
+    _add_voiceover_text = add_voiceover_text
+
+    def wait_for_voiceover(self):
+        if self.timeline and "end" not in self.timeline[-1]:
+            block = self.timeline[-1]
+            animations_end = self.renderer.time
+            block["overrun"] = max(0.0, animations_end - block["voice_end"])
+            super().wait_for_voiceover()
+            block["end"] = self.renderer.time
+            return
+        super().wait_for_voiceover()
+
+
+def load_scene_class(job):
+    name = f"dry_run_{job.path.stem}"
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, job.path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return getattr(module, job.scene)
+
+
+def _rounded(block):
+    return {
+        key: round(value, 3) if isinstance(value, float) else value
+        for key, value in block.items()
+    }
+
+
+def time_scene(job):
+    start = time.monotonic()
+    scene_class = load_scene_class(job)
+    timed_class = type(job.scene, (TimelineMixin, scene_class), {})
+    scene = timed_class(skip_animations=True)
+    scene.render()
+    return {
+        "scene": job.key,
+        "duration": round(scene.renderer.time, 3),
+        "plays": scene.renderer.num_plays,
+        "seconds": round(time.monotonic() - start, 2),
+        "blocks": [_rounded(block) for block in getattr(scene, "timeline", [])],
+    }
+
+
+def print_timeline(result, overrun_only):
+    print(
+        f"{result['scene']}: {result['duration']:.1f}s, {result['plays']} plays "
+        f"(timed in {result['seconds']:.1f}s)"
+    )
+    for block in result["blocks"]:
+        overrun = block.get("overrun", 0.0)
+        if overrun_only and not overrun:
+            continue
+        text = block["text"]
+        text = text if len(text) <= 50 else text[:47] + "..."
+        flags = " (estimated)" if block["estimated"] else ""
+        if overrun:
+            flags += f"  overrun {overrun:.2f}s"
+        print(f"  {block['start']:7.2f} - {block.get('end', 0):7.2f}  {text}{flags}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the voiceover blocks of the scenes without rendering."
+    )
+    parser.add_argument(
+        "scenes", nargs="*", help="scene names or file stems to time (globs)"
+    )
+    parser.add_argument("--media-dir", type=Path, default=ROOT / "media")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="default: <media dir>/timeline.json"
+    )
+    parser.add_argument(
+        "--overrun-only", action="store_true", help="only print blocks that overrun"
+    )
+    args = parser.parse_args(argv)
+
+    config.media_dir = str(args.media_dir)
+    config.dry_run = True
+    config.verbosity = "WARNING"
+    results, failed = [], 0
+    for job in select(discover_jobs(), args.scenes):
+        try:
+            result = time_scene(job)
+        except Exception:
+            failed += 1
+            print(f"{job.key}: failed", file=sys.stderr)
+            traceback.print_exc()
+            continue
+        results.append(result)
+        print_timeline(result, args.overrun_only)
+    output = args.output or args.media_dir / "timeline.json"
+    output.write_text(json.dumps(results, indent=1, ensure_ascii=False))
+    total = sum(result["duration"] for result in results)
+    print(f"{len(results)} scenes, {total / 60:.1f} minutes, timeline in {output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+# Keeps manim's media directory small.
+#
+# Nothing in manim ever deletes from media/: LaTeX leaves .aux, .log and .dvi
+# files next to every SVG, partial movies of earlier renders stay behind when a
+# scene changes, and every quality writes its own copy of a scene. This script
+#
+# - removes the LaTeX leftovers of compiled Tex files,
+# - removes partial movies that no partial_movie_file_list.txt refers to,
+# - makes identical rendered videos and images (across quality folders, say),
+#   found by content hash, share their data on disk as copy-on-write clones
+#   on Linux file systems that can clone files (Btrfs, XFS, ...); elsewhere
+#   they are left as they are,
+# - and then, while the media directory is bigger than --max-size, removes the
+#   least recently used files that can be rendered again.
+#
+# Recorded voiceovers can't be rendered again and are never removed. Sizes,
+# times and hashes are kept in an index file in the media directory, so a run
+# only hashes files that are new or changed since the previous one.
+#
+#     python tools/media_gc.py --max-size 2G
+#     python tools/media_gc.py --dry-run        # only print what would go
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+INDEX_NAME = "media_index.json"
+INDEX_VERSION = 2
+
+DEFAULT_MAX_SIZE = "2G"
+
+# what LaTeX and dvisvgm leave next to an SVG that manim doesn't read again
+TEX_LEFTOVERS = {".aux", ".log", ".dvi", ".xdv", ".pdf"}
+
+# never removed: the recordings of RecorderService
+KEEP_DIRS = {"voiceovers"}
+
+# rendered output that is deduplicated
+OUTPUT_DIRS = {"videos", "images"}
+
+# ioctl that makes a file share the data of another one, from linux/fs.h
+FICLONE = getattr(fcntl, "FICLONE", 0x40049409)
+
+PARTIAL_DIR = "partial_movie_files"
+PARTIAL_LIST = "partial_movie_file_list.txt"
+
+_LIST_ENTRY = re.compile(r"^file '(?:file:)?(.*)'$")
+_SIZE = re.compile(r"^(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?$", re.IGNORECASE)
+
+
+def parse_size(text):
+    # "500M", "2G", "1.5GiB" or a number of bytes
+    match = _SIZE.match(text.strip())
+    if match is None:
+        raise argparse.ArgumentTypeError(f"not a size: {text!r}")
+    number, unit = match.groups()
+    return int(float(number) * 1024 ** " KMGT".index(unit.upper() or " "))
+
+
+def format_size(size):
+    for unit in ("B", "K", "M", "G"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}T"
+
+
+def file_hash(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class MediaFile:
+    __slots__ = (
+        "path",
+        "relative",
+        "size",
+        "mtime_ns",
+        "used_ns",
+        "inode",
+        "links",
+        "hash",
+        "cloned",
+    )
+
+    def __init__(self, path, relative, stat, known_hash=None, cloned=False):
+        self.path = path
+        self.relative = relative
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        # atime is often only updated now and then, but never goes back
+        self.used_ns = max(stat.st_atime_ns, stat.st_mtime_ns)
+        self.inode = (stat.st_dev, stat.st_ino)
+        self.links = stat.st_nlink
+        self.hash = known_hash
+        # whether the file was made a clone of its duplicates by an earlier run
+        self.cloned = cloned
+
+    @property
+    def top(self):
+        return self.relative.split("/", 1)[0]
+
+
+class MediaIndex:
+    # {relative path: [size, mtime_ns, sha256 or None, cloned]} of the last scan
+
+    def __init__(self, media_dir):
+        self.media_dir = Path(media_dir)
+        self.path = self.media_dir / INDEX_NAME
+        self.entries = {}
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.entries = data.get("files", {})
+
+    def scan(self):
+        # every file in the media directory, with hashes carried over from the
+        # index for files that haven't changed since
+        files = []
+        stack = [self.media_dir]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    path = Path(entry.path)
+                    relative = path.relative_to(self.media_dir).as_posix()
+                    if relative == INDEX_NAME:
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    known = self.entries.get(relative)
+                    same = known and known[:2] == [stat.st_size, stat.st_mtime_ns]
+                    known_hash, cloned = known[2:] if same else (None, False)
+                    files.append(MediaFile(path, relative, stat, known_hash, cloned))
+        return files
+
+    def save(self, files):
+        self.entries = {
+            f.relative: [f.size, f.mtime_ns, f.hash, f.cloned]
+            for f in files
+            if f.path.exists()
+        }
+        data = {"version": INDEX_VERSION, "files": self.entries}
+        descriptor, temporary = tempfile.mkstemp(dir=self.media_dir, suffix=".json")
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temporary, self.path)
+
+
+def tex_leftovers(files):
+    # LaTeX output in Tex/ that isn't an SVG, once its SVG exists
+    svgs = {f.relative[:-4] for f in files if f.relative.endswith(".svg")}
+    return [
+        f
+        for f in files
+        if f.top == "Tex"
+        and os.path.splitext(f.relative)[1] in TEX_LEFTOVERS
+        and os.path.splitext(f.relative)[0] in svgs
+    ]
+
+
+def referenced_partials(list_path):
+    names = set()
+    with open(list_path, encoding="utf-8") as file:
+        for line in file:
+            match = _LIST_ENTRY.match(line.strip())
+            if match:
+                # the paths are absolute, possibly from another machine
+                names.add(os.path.basename(match.group(1)))
+    return names
+
+
+def orphaned_partials(files):
+    # partial movies of scenes whose list doesn't mention them; scenes without
+    # a list (still rendering, or never finished) are left alone
+    by_scene = {}
+    for f in files:
+        parts = f.relative.split("/")
+        if len(parts) >= 3 and parts[-3] == PARTIAL_DIR:
+            by_scene.setdefault(f.path.parent, []).append(f)
+    orphans = []
+    for scene_dir, scene_files in by_scene.items():
+        list_path = scene_dir / PARTIAL_LIST
+        if not list_path.exists():
+            continue
+        keep = referenced_partials(list_path)
+        keep.add(PARTIAL_LIST)
+        orphans.extend(f for f in scene_files if f.path.name not in keep)
+    return orphans
+
+
+def is_output(f):
+    return f.top in OUTPUT_DIRS and f"/{PARTIAL_DIR}/" not in f.relative
+
+
+def clone_file(source, target):
+    # replace target by a copy-on-write clone of source, with the times target
+    # had; OSError where the file system can't clone
+    stat = target.stat()
+    temporary = target.with_name(target.name + ".clone")
+    try:
+        with open(source, "rb") as src, open(temporary, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        os.utime(temporary, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    except OSError:
+        temporary.unlink(missing_ok=True)
+        raise
+    os.replace(temporary, target)
+
+
+def copy_file(target):
+    # replace target by a copy of itself, which no other path shares
+    stat = target.stat()
+    temporary = target.with_name(target.name + ".copy")
+    shutil.copyfile(target, temporary)
+    os.utime(temporary, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(temporary, target)
+
+
+def hard_linked_outputs(files):
+    # rendered outputs that share their inode with another path: manim and
+    # ffmpeg write over an existing output in place, which would change every
+    # path of the inode
+    seen = set()
+    linked = []
+    for f in files:
+        if is_output(f) and f.links > 1:
+            if f.inode in seen:
+                linked.append(f)
+            seen.add(f.inode)
+    return linked
+
+
+def duplicate_outputs(files):
+    # [(kept file, [its duplicates])] among the rendered outputs; only files of
+    # a size that occurs more than once are hashed
+    by_size = {}
+    for f in files:
+        if is_output(f) and f.size:
+            by_size.setdefault(f.size, []).append(f)
+    groups = []
+    for same_size in by_size.values():
+        if len({f.inode for f in same_size}) < 2:
+            continue
+        by_hash = {}
+        for f in same_size:
+            if f.hash is None:
+                f.hash = file_hash(f.path)
+            by_hash.setdefault(f.hash, []).append(f)
+        for same in by_hash.values():
+            same.sort(key=lambda f: f.used_ns, reverse=True)
+            copies = [f for f in same[1:] if not f.cloned]
+            if copies:
+                groups.append((same[0], copies))
+    return groups
+
+
+def disk_usage(files):
+    # hard links count once; clones count as often as they are there, as
+    # what they share can't be told from their stat
+    return sum({f.inode: f.size for f in files}.values())
+
+
+def evictable(f):
+    # files at the top (indexes, journals) are kept too
+    return (
+        "/" in f.relative and f.top not in KEEP_DIRS and f.path.name != PARTIAL_LIST
+    )
+
+
+class Collector:
+    def __init__(self, media_dir, dry_run=False):
+        self.media_dir = Path(media_dir)
+        self.dry_run = dry_run
+        self.freed = 0
+        self.removed = 0
+
+    def remove(self, f, reason):
+        action = "would remove" if self.dry_run else "removing"
+        print(f"{action} {f.relative} ({reason})")
+        if not self.dry_run:
+            try:
+                f.path.unlink()
+            except FileNotFoundError:
+                return
+        self.removed += 1
+        self.freed += f.size
+
+    def clone(self, kept, copy):
+        # a clone has an inode of its own, so writing to one of them later
+        # leaves the other as it was
+        action = "would clone" if self.dry_run else "cloning"
+        print(f"{action} {kept.relative} to {copy.relative}")
+        if self.dry_run:
+            return True
+        try:
+            clone_file(kept.path, copy.path)
+        except OSError as error:
+            print(f"  can't clone ({error.strerror}), duplicates are kept as they are")
+            return False
+        kept.cloned = copy.cloned = True
+        return True
+
+    def separate(self, f):
+        # give an output that is hard linked to another one a copy of its own
+        action = "would copy" if self.dry_run else "copying"
+        print(f"{action} {f.relative} (hard linked to another output)")
+        if not self.dry_run:
+            copy_file(f.path)
+            stat = f.path.stat()
+            f.inode, f.links = (stat.st_dev, stat.st_ino), stat.st_nlink
+
+    def run(self, max_size):
+        index = MediaIndex(self.media_dir)
+        files = index.scan()
+        before = disk_usage(files)
+        gone = set()
+        for f in tex_leftovers(files):
+            self.remove(f, "LaTeX leftover")
+            gone.add(f.relative)
+        for f in orphaned_partials(files):
+            self.remove(f, "orphaned partial movie")
+            gone.add(f.relative)
+        files = [f for f in files if f.relative not in gone]
+        for f in hard_linked_outputs(files):
+            self.separate(f)
+        for kept, copies in duplicate_outputs(files):
+            if not all(self.clone(kept, copy) for copy in copies):
+                # the file system can't clone, so the rest can't either
+                break
+        usage = disk_usage(files)
+        if usage > max_size:
+            # an inode is freed when its last link goes, so links go together
+            links = {}
+            for f in files:
+                if evictable(f):
+                    links.setdefault(f.inode, []).append(f)
+            order = sorted(
+                links.values(), key=lambda same: max(f.used_ns for f in same)
+            )
+            for same in order:
+                if usage <= max_size:
+                    break
+                for f in same:
+                    self.remove(f, "least recently used")
+                    gone.add(f.relative)
+                usage -= same[0].size
+        files = [f for f in files if f.relative not in gone]
+        if not self.dry_run:
+            index.save(files)
+        print(
+            f"{self.media_dir}: {format_size(before)} -> {format_size(usage)}, "
+            f"{self.removed} files removed"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prune manim's media directory under a size cap."
+    )
+    parser.add_argument("media_dirs", nargs="*", default=["media"])
+    parser.add_argument(
+        "--max-size",
+        type=parse_size,
+        default=os.environ.get("MEDIA_MAX_SIZE", DEFAULT_MAX_SIZE),
+        help="e.g. 500M or 2G (default: $MEDIA_MAX_SIZE or %(default)s)",
+    )
+    parser.add_argument("-n", "--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+    for media_dir in args.media_dirs:
+        if not Path(media_dir).is_dir():
+            print(f"{media_dir}: not a directory", file=sys.stderr)
+            return 1
+        Collector(media_dir, args.dry_run).run(args.max_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
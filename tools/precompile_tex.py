@@ -0,0 +1,497 @@
+# Compiles every Tex source the scenes use into manim's Tex cache up front.
+#
+# A cold render blocks on LaTeX (and dvisvgm) the first time each Tex or MathTex
+# string is built, one job at a time and in the middle of a scene. This script
+# reads scenes/*.py and images.py with the ast module, collects the arguments of
+# every Tex, MathTex, Title and cached_math_tex call that can be worked out
+# without running the scene, and compiles the missing ones with a process pool.
+#
+# Arguments are worked out by a small interpreter over the syntax tree: string
+# literals, f-strings, concatenation, names bound to those (also by for loops
+# over literal lists, which keeps tuples like (num, denom) together) and the
+# parameters of local functions called with such values. Anything else, such
+# as strings built from random rotations, is reported as unresolved and left
+# to the render.
+#
+#     python tools/precompile_tex.py            # compile into ./media/Tex
+#     python tools/precompile_tex.py --list     # only show what was found
+
+import argparse
+import ast
+import itertools as it
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from manim import MathTex, SingleStringMathTex, TexTemplateLibrary, config
+from manim.utils.tex_file_writing import generate_tex_file, tex_to_svg_file
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SOURCES = ["scenes/*.py", "images.py"]
+
+# the defaults of the classes that compile LaTeX: (arg_separator, environment)
+TEX_CALLS = {
+    "Tex": ("", "center"),
+    "Title": ("", "center"),
+    "MathTex": (" ", "align*"),
+    "cached_math_tex": (" ", "align*"),
+}
+
+# the most bindings followed through loops before giving up on a name
+MAX_ENVIRONMENTS = 512
+MAX_CALL_DEPTH = 4
+
+
+class _Unknown:
+    def __repr__(self):
+        return "UNKNOWN"
+
+
+UNKNOWN = _Unknown()
+
+
+class TexCall:
+    # the arguments of one Tex-like call that could be resolved
+    __slots__ = (
+        "kind",
+        "strings",
+        "arg_separator",
+        "environment",
+        "isolate",
+        "template",
+    )
+
+    def __init__(self, kind, strings, arg_separator, environment, isolate, template):
+        self.kind = kind
+        self.strings = strings
+        self.arg_separator = arg_separator
+        self.environment = environment
+        self.isolate = isolate
+        # the name of a TexTemplateLibrary template, None for the default
+        self.template = template
+
+    def key(self):
+        return (
+            self.kind,
+            self.strings,
+            self.arg_separator,
+            self.environment,
+            self.isolate,
+            self.template,
+        )
+
+
+class TexCollector:
+    # Runs the statements of a module over a list of environments (dicts from
+    # names to values), one for every combination of loop items seen so far.
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = {}
+        self.resolved_lines = set()
+        self.unresolved_lines = set()
+        self._active = []
+
+    def collect(self, tree):
+        self._block(tree.body, [{}], {})
+        return list(self.calls.values())
+
+    def unresolved(self):
+        return sorted(self.unresolved_lines - self.resolved_lines)
+
+    # statements
+
+    def _block(self, statements, envs, functions):
+        for statement in statements:
+            envs = self._statement(statement, envs, functions)
+        return envs
+
+    def _statement(self, node, envs, functions):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions[node.name] = node
+            # once with unknown arguments, so calls made with them are seen too
+            self._call_function(node, [], {}, envs, functions)
+            return envs
+        if isinstance(node, ast.ClassDef):
+            self._block(node.body, [dict(env) for env in envs], dict(functions))
+            return envs
+        if isinstance(node, ast.Assign):
+            values = [self._value(node.value, env, functions) for env in envs]
+            return [
+                self._bind_all(node.targets, value, env)
+                for env, value in zip(envs, values)
+            ]
+        if isinstance(node, ast.AnnAssign) and node.value is not None:
+            values = [self._value(node.value, env, functions) for env in envs]
+            return [
+                self._bind(node.target, value, dict(env))
+                for env, value in zip(envs, values)
+            ]
+        if isinstance(node, ast.AugAssign):
+            binop = ast.BinOp(left=_load(node.target), op=node.op, right=node.value)
+            return [
+                self._bind(node.target, self._value(binop, env, functions), dict(env))
+                for env in envs
+            ]
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            envs = self._loop(node.target, node.iter, envs, functions)
+            envs = self._block(node.body, envs, functions)
+            return self._block(node.orelse, envs, functions)
+        if isinstance(node, (ast.If, ast.While)):
+            for env in envs:
+                self._value(node.test, env, functions)
+            envs = self._block(node.body, envs, functions)
+            return self._block(node.orelse, envs, functions)
+        if isinstance(node, (ast.With, ast.AsyncWith)):
+            for env in envs:
+                for item in node.items:
+                    value = self._value(item.context_expr, env, functions)
+                    if item.optional_vars is not None:
+                        self._bind(item.optional_vars, value, env)
+            return self._block(node.body, envs, functions)
+        if isinstance(node, ast.Try):
+            envs = self._block(node.body, envs, functions)
+            for handler in node.handlers:
+                envs = self._block(handler.body, envs, functions)
+            envs = self._block(node.orelse, envs, functions)
+            return self._block(node.finalbody, envs, functions)
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.expr):
+                for env in envs:
+                    self._value(child, env, functions)
+        return envs
+
+    def _loop(self, target, iterable, envs, functions):
+        looped = []
+        for env in envs:
+            items = self._value(iterable, env, functions)
+            if not isinstance(items, (list, tuple, str)):
+                looped.append(self._bind(target, UNKNOWN, dict(env)))
+                continue
+            for item in items:
+                looped.append(self._bind(target, item, dict(env)))
+        if len(looped) > MAX_ENVIRONMENTS:
+            return [self._bind(target, UNKNOWN, dict(env)) for env in envs]
+        return looped or [self._bind(target, UNKNOWN, dict(env)) for env in envs]
+
+    def _bind_all(self, targets, value, env):
+        env = dict(env)
+        for target in targets:
+            env = self._bind(target, value, env)
+        return env
+
+    def _bind(self, target, value, env):
+        if isinstance(target, ast.Name):
+            env[target.id] = value
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            unpack = isinstance(value, (list, tuple)) and len(value) == len(target.elts)
+            for i, element in enumerate(target.elts):
+                env = self._bind(element, value[i] if unpack else UNKNOWN, env)
+        elif isinstance(target, ast.Starred):
+            env = self._bind(target.value, UNKNOWN, env)
+        return env
+
+    def _call_function(self, node, args, kwargs, envs, functions):
+        if node in self._active or len(self._active) >= MAX_CALL_DEPTH:
+            return
+        parameters = node.args.posonlyargs + node.args.args
+        self._active.append(node)
+        inner = []
+        for env in envs:
+            env = dict(env)
+            for i, parameter in enumerate(parameters):
+                value = args[i] if i < len(args) else UNKNOWN
+                env[parameter.arg] = kwargs.get(parameter.arg, value)
+            for parameter in node.args.kwonlyargs:
+                env[parameter.arg] = kwargs.get(parameter.arg, UNKNOWN)
+            for parameter in (node.args.vararg, node.args.kwarg):
+                if parameter is not None:
+                    env[parameter.arg] = UNKNOWN
+            inner.append(env)
+        self._block(node.body, inner, dict(functions))
+        self._active.pop()
+
+    # expressions
+
+    def _value(self, node, env, functions):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            return env.get(node.id, UNKNOWN)
+        if isinstance(node, ast.JoinedStr):
+            parts = [self._value(value, env, functions) for value in node.values]
+            if any(part is UNKNOWN for part in parts):
+                return UNKNOWN
+            return "".join(parts)
+        if isinstance(node, ast.FormattedValue):
+            return self._formatted(node, env, functions)
+        if isinstance(node, (ast.List, ast.Tuple)):
+            values = [self._value(element, env, functions) for element in node.elts]
+            if any(isinstance(e, ast.Starred) for e in node.elts):
+                return UNKNOWN
+            return values if isinstance(node, ast.List) else tuple(values)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mult)):
+            left = self._value(node.left, env, functions)
+            right = self._value(node.right, env, functions)
+            if left is UNKNOWN or right is UNKNOWN:
+                return UNKNOWN
+            try:
+                if isinstance(node.op, ast.Add):
+                    return left + right
+                return left * right
+            except TypeError:
+                return UNKNOWN
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            value = self._value(node.operand, env, functions)
+            return -value if isinstance(value, (int, float)) else UNKNOWN
+        if isinstance(node, ast.Subscript):
+            value = self._value(node.value, env, functions)
+            index = self._value(node.slice, env, functions)
+            if isinstance(value, (list, tuple, str)) and isinstance(index, int):
+                try:
+                    return value[index]
+                except IndexError:
+                    return UNKNOWN
+            return UNKNOWN
+        if isinstance(node, ast.Call):
+            return self._call(node, env, functions)
+        if isinstance(node, ast.Lambda):
+            inner = dict(env)
+            for parameter in ast.walk(node.args):
+                if isinstance(parameter, ast.arg):
+                    inner[parameter.arg] = UNKNOWN
+            self._value(node.body, inner, functions)
+            return UNKNOWN
+        if isinstance(node, (ast.ListComp, ast.GeneratorExp, ast.SetComp)):
+            return self._comprehension(node, env, functions)
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.expr):
+                self._value(child, env, functions)
+        return UNKNOWN
+
+    def _formatted(self, node, env, functions):
+        value = self._value(node.value, env, functions)
+        if value is UNKNOWN:
+            return UNKNOWN
+        if node.conversion != -1:
+            value = {"s": str, "r": repr, "a": ascii}[chr(node.conversion)](value)
+        spec = ""
+        if node.format_spec is not None:
+            spec = self._value(node.format_spec, env, functions)
+            if spec is UNKNOWN:
+                return UNKNOWN
+        return format(value, spec)
+
+    def _comprehension(self, node, env, functions):
+        # a list when every generator runs over a known list without conditions
+        envs, known = [dict(env)], True
+        for generator in node.generators:
+            for inner in envs:
+                items = self._value(generator.iter, inner, functions)
+                known = known and isinstance(items, (list, tuple, str))
+            envs = self._loop(generator.target, generator.iter, envs, functions)
+            for condition in generator.ifs:
+                known = False
+                for inner in envs:
+                    self._value(condition, inner, functions)
+        values = [self._value(node.elt, inner, functions) for inner in envs]
+        return values if known else UNKNOWN
+
+    def _call(self, node, env, functions):
+        args = [self._value(arg, env, functions) for arg in node.args]
+        kwargs = {}
+        for keyword in node.keywords:
+            value = self._value(keyword.value, env, functions)
+            if keyword.arg is not None:
+                kwargs[keyword.arg] = (keyword.value, value)
+        self._value(node.func, env, functions)
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name in TEX_CALLS:
+            self._record(name, node, args, kwargs)
+        elif name in functions:
+            values = {key: value for key, (_, value) in kwargs.items()}
+            self._call_function(functions[name], args, values, [env], functions)
+        return UNKNOWN
+
+    def _record(self, kind, node, args, kwargs):
+        default_separator, default_environment = TEX_CALLS[kind]
+        separator = kwargs.get("arg_separator", (None, default_separator))[1]
+        environment = kwargs.get("tex_environment", (None, default_environment))[1]
+        isolate = kwargs.get("substrings_to_isolate", (None, []))[1]
+        color_map = kwargs.get("tex_to_color_map", (None, {}))[0]
+        if isinstance(color_map, ast.Dict):
+            keys = [
+                key.value if isinstance(key, ast.Constant) else UNKNOWN
+                for key in color_map.keys
+            ]
+            isolate = isolate + keys if isinstance(isolate, list) else UNKNOWN
+        elif color_map:
+            isolate = UNKNOWN
+        template = None
+        if "tex_template" in kwargs:
+            template = _template_name(kwargs["tex_template"][0])
+        resolved = (
+            all(isinstance(arg, str) for arg in args)
+            and isinstance(separator, str)
+            and (environment is None or isinstance(environment, str))
+            and isinstance(isolate, (list, tuple))
+            and all(isinstance(s, str) for s in isolate)
+            and template is not UNKNOWN
+        )
+        if not resolved:
+            self.unresolved_lines.add(node.lineno)
+            return
+        self.resolved_lines.add(node.lineno)
+        call = TexCall(
+            kind, tuple(args), separator, environment, tuple(isolate), template
+        )
+        self.calls.setdefault(call.key(), call)
+
+
+def _load(target):
+    # the value of an assignment target, for augmented assignments
+    if isinstance(target, ast.Name):
+        return ast.Name(id=target.id, ctx=ast.Load())
+    return ast.Constant(value=None)
+
+
+def _template_name(node):
+    # tex_template=TexTemplateLibrary.<name>
+    if (
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "TexTemplateLibrary"
+    ):
+        return node.attr
+    return UNKNOWN
+
+
+def collect_tex_calls(paths):
+    # ({path: [TexCall]}, {path: [unresolved line numbers]})
+    calls, unresolved = {}, {}
+    for path in paths:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        collector = TexCollector(path)
+        calls[path] = collector.collect(tree)
+        unresolved[path] = collector.unresolved()
+    return calls, unresolved
+
+
+class _TexSource:
+    # The string handling of MathTex and SingleStringMathTex, without building
+    # the mobject, so the expressions match what manim compiles exactly.
+    _break_up_tex_strings = MathTex._break_up_tex_strings
+    _get_modified_expression = SingleStringMathTex._get_modified_expression
+    _modify_special_strings = SingleStringMathTex._modify_special_strings
+    _remove_stray_braces = SingleStringMathTex._remove_stray_braces
+
+    def __init__(self, call):
+        self.substrings_to_isolate = list(call.isolate)
+        self.tex_to_color_map = {}
+        self.brace_notation_split_occurred = False
+        self.tex_strings = self._break_up_tex_strings(call.strings)
+        self.arg_separator = call.arg_separator
+
+    def expressions(self):
+        # the whole string, then every part again (MathTex._break_up_by_substrings)
+        whole = self.arg_separator.join(self.tex_strings)
+        return [
+            self._get_modified_expression(tex)
+            for tex in dict.fromkeys([whole, *self.tex_strings])
+        ]
+
+
+def tex_jobs(calls):
+    # the distinct (expression, environment, template name) to compile
+    jobs = {}
+    for call in calls:
+        for expression in _TexSource(call).expressions():
+            jobs[(expression, call.environment, call.template)] = call
+    return list(jobs)
+
+
+def _template(name):
+    return None if name is None else getattr(TexTemplateLibrary, name)
+
+
+def is_cached(job):
+    expression, environment, template = job
+    tex_file = generate_tex_file(expression, environment, _template(template))
+    return tex_file.with_suffix(".svg").exists()
+
+
+def _init_worker(media_dir, tex_dir):
+    config.media_dir = media_dir
+    config.tex_dir = tex_dir
+
+
+def compile_job(job):
+    expression, environment, template = job
+    try:
+        tex_to_svg_file(expression, environment, _template(template))
+    except Exception as error:
+        return job, f"{type(error).__name__}: {error}"
+    return job, None
+
+
+def source_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(ROOT.glob(pattern)))
+    return [path for path in dict.fromkeys(paths) if path.is_file()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compile the Tex sources of the scenes into the Tex cache."
+    )
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        default=DEFAULT_SOURCES,
+        help="files to read, as globs relative to the repository root",
+    )
+    parser.add_argument("--media-dir", default=config.media_dir)
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count(), help="LaTeX processes"
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="print the sources, compile nothing"
+    )
+    args = parser.parse_args(argv)
+    config.media_dir = args.media_dir
+
+    calls, unresolved = collect_tex_calls(source_paths(args.sources))
+    for path, lines in unresolved.items():
+        if lines:
+            where = ", ".join(map(str, lines))
+            print(f"{path.relative_to(ROOT)}: unresolved at lines {where}")
+    jobs = tex_jobs(it.chain.from_iterable(calls.values()))
+    if args.list:
+        for expression, environment, template in jobs:
+            print(f"{environment or '-'}\t{template or '-'}\t{expression}")
+        return 0
+
+    missing = [job for job in jobs if not is_cached(job)]
+    print(f"{len(jobs)} Tex sources, {len(jobs) - len(missing)} already compiled")
+    failed = 0
+    with ProcessPoolExecutor(
+        max_workers=args.jobs,
+        initializer=_init_worker,
+        initargs=(config.media_dir, config.tex_dir),
+    ) as pool:
+        futures = [pool.submit(compile_job, job) for job in missing]
+        for done, future in enumerate(as_completed(futures), 1):
+            job, error = future.result()
+            if error is not None:
+                failed += 1
+                print(f"failed: {job[0]!r}\n  {error}")
+            print(f"\r{done}/{len(missing)} compiled", end="", file=sys.stderr)
+    if missing:
+        print(file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
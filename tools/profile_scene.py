@@ -0,0 +1,112 @@
+# Profiles where the render time of scenes goes, play by play.
+#
+# Every scene is rendered in this process with PlayProfilerMixin of
+# scenes/profiling.py mixed in and PROFILE_PLAYS set, so the time of every play
+# and wait is split into hashing, beginning the animations, interpolating them,
+# updaters, rasterizing and writing the frames, and Tex compiles. The results
+# are written to <media dir>/profiles/<scene>.json, with <scene>.folded next to
+# it for flame graph tools, and the plays that took longest are printed.
+#
+# The videos are rendered into a temporary directory, so that every play is
+# rendered again instead of read from the partial movie cache, and the videos
+# rendered before are left as they are. The Tex cache and the voiceovers are the
+# ones in the media directory.
+#
+#     python tools/profile_scene.py ConstructingE
+#     python tools/profile_scene.py -q m CreatingM ExpandToBallThreeD
+#     flamegraph.pl media/profiles/ConstructingE.folded > ConstructingE.svg
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+from manim import config, constants
+
+from dry_run import load_scene_class
+from render_all import QUALITIES, ROOT, SCENES_DIR, discover_jobs, select
+
+sys.path.insert(0, str(SCENES_DIR))
+
+from profiling import PROFILE_DIR, PROFILE_PLAYS_ENV, PlayProfilerMixin
+
+# manim's quality names by the flag of manim render -q
+QUALITY_NAMES = {
+    quality["flag"]: name
+    for name, quality in constants.QUALITIES.items()
+    if quality["flag"]
+}
+
+
+def profile_scene(job, mixins=(), **attributes):
+    # (profile results, seconds); mixins go between the profiler and the scene
+    scene_class = load_scene_class(job)
+    bases = (PlayProfilerMixin, *mixins, scene_class)
+    profiled_class = type(job.scene, bases, attributes)
+    scene = profiled_class()
+    start = time.monotonic()
+    try:
+        scene.render()
+    finally:
+        # the profiler is only removed by a scene that finished
+        if getattr(scene, "play_profiler", None) is not None:
+            scene.play_profiler.uninstall()
+    return scene.play_profiler.results(job.scene), time.monotonic() - start
+
+
+def print_profile(results, seconds, rows):
+    print(
+        f"{results['scene']}: {seconds:.1f}s, {results['plays']} plays, "
+        f"{results['frames']} frames, {results['tex_compiles']} Tex compiles"
+    )
+    phases = results["phases"]
+    print("  " + ", ".join(f"{phase} {phases[phase]:.2f}s" for phase in phases))
+    slowest = sorted(results["timeline"], key=lambda play: -play["seconds"])
+    for play in slowest[:rows]:
+        print(
+            f"  {play['seconds']:7.3f}s {play['frames']:5d} frames  "
+            f"{play['line']:<24} {play['kind']} {play['animations']}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render scenes with every play timed, phase by phase."
+    )
+    parser.add_argument("scenes", nargs="+", help="scene names or file stems (globs)")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    parser.add_argument("--media-dir", type=Path, default=ROOT / "media")
+    parser.add_argument(
+        "--rows", type=int, default=10, help="slowest plays to print per scene"
+    )
+    args = parser.parse_args(argv)
+
+    jobs = select(discover_jobs(), args.scenes)
+    if not jobs:
+        print("no scene matches", file=sys.stderr)
+        return 1
+    os.environ[PROFILE_PLAYS_ENV] = "1"
+    config.media_dir = str(args.media_dir)
+    config.quality = QUALITY_NAMES[args.quality]
+    config.verbosity = "WARNING"
+    failed = 0
+    with tempfile.TemporaryDirectory(prefix="profile_scene_") as video_dir:
+        config.video_dir = video_dir
+        for job in jobs:
+            try:
+                results, seconds = profile_scene(job)
+            except Exception:
+                failed += 1
+                print(f"{job.key}: failed", file=sys.stderr)
+                traceback.print_exc()
+                continue
+            print_profile(results, seconds, args.rows)
+    print(f"profiles in {args.media_dir / PROFILE_DIR}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+# Renders every scene of the video, several at a time.
+#
+# The scene classes are found by reading scenes/[0-9]*.py and
+# scenes/first_decomp.py with the ast module (without importing manim), and
+# every scene is rendered by its own `manim render` process, at most --jobs at
+# once. Jobs are started longest first, using the times of earlier runs, so the
+# run takes about as long as its longest scene; scenes that never ran before
+# start first, as they may well be the longest.
+#
+# Every finished job is appended to a journal in the media directory, together
+# with a hash of the scene file and the helper modules it imports. A run that
+# is interrupted picks up where it stopped: jobs that are in the journal as done
+# at the same quality and with the same sources are skipped.
+#
+#     python tools/render_all.py -q h               # everything at 1080p60
+#     python tools/render_all.py -q l ConstructingE  # only matching scenes
+#     python tools/render_all.py --list
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fnmatch import fnmatch
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENES_DIR = ROOT / "scenes"
+DEFAULT_SOURCES = ["scenes/[0-9]*.py", "scenes/first_decomp.py"]
+
+JOURNAL_NAME = "render_journal.jsonl"
+LOG_DIR = "logs/render_all"
+
+QUALITIES = "lmhpk"
+
+# the folder of every quality in media/videos/<module>/, as in
+# manim.constants.QUALITIES
+QUALITY_DIRS = {
+    "l": "480p15",
+    "m": "720p30",
+    "h": "1080p60",
+    "p": "1440p60",
+    "k": "2160p60",
+}
+
+# the calls that make up most of the time of a scene, for scenes without an
+# earlier run to go by
+_TIMED_CALLS = {"play", "wait", "voiceover", "move_camera"}
+
+
+class RenderJob:
+    __slots__ = ("path", "scene", "weight", "source_hash")
+
+    def __init__(self, path, scene, weight, source_hash):
+        self.path = path
+        self.scene = scene
+        self.weight = weight
+        self.source_hash = source_hash
+
+    @property
+    def key(self):
+        return f"{self.path.relative_to(ROOT).as_posix()}:{self.scene}"
+
+    def command(self, quality, extra_args=()):
+        return [
+            sys.executable,
+            "-m",
+            "manim",
+            "render",
+            f"-q{quality}",
+            *extra_args,
+            str(self.path.relative_to(ROOT)),
+            self.scene,
+        ]
+
+
+def _base_names(node):
+    for base in node.bases:
+        if isinstance(base, ast.Name):
+            yield base.id
+        elif isinstance(base, ast.Attribute):
+            yield base.attr
+
+
+def scene_classes(tree):
+    # {class name: class node} for the classes that derive from a Scene
+    scenes = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = list(_base_names(node))
+        if any(name.endswith("Scene") or name in scenes for name in bases):
+            scenes[node.name] = node
+    return scenes
+
+
+def scene_weight(node):
+    # the number of plays, waits and voiceovers, as a stand-in for run time
+    return sum(
+        isinstance(call, ast.Call)
+        and isinstance(call.func, ast.Attribute)
+        and call.func.attr in _TIMED_CALLS
+        for call in ast.walk(node)
+    )
+
+
+def local_imports(tree):
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.add(node.module.split(".")[0])
+        elif isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+    return {module for module in modules if (SCENES_DIR / f"{module}.py").exists()}
+
+
+_SOURCES = {}
+
+
+def source_hash(path):
+    # a hash of the file and every helper module it imports, directly or not
+    hasher = hashlib.sha256()
+    seen, stack = set(), [path]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        if current not in _SOURCES:
+            source = current.read_bytes()
+            _SOURCES[current] = (source, ast.parse(source, filename=str(current)))
+        source, tree = _SOURCES[current]
+        hasher.update(current.name.encode() + b"\0" + source)
+        stack.extend(SCENES_DIR / f"{module}.py" for module in local_imports(tree))
+    return hasher.hexdigest()[:16]
+
+
+def discover_jobs(patterns=DEFAULT_SOURCES):
+    jobs = []
+    paths = sorted({path for pattern in patterns for path in ROOT.glob(pattern)})
+    for path in paths:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+        scenes = scene_classes(tree)
+        if not scenes:
+            continue
+        digest = source_hash(path)
+        for name, node in scenes.items():
+            jobs.append(RenderJob(path, name, scene_weight(node), digest))
+    return jobs
+
+
+class Journal:
+    # one JSON line per finished job; later lines win
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # the last line of a run that was killed while writing
+                        continue
+                    self.entries[(entry["job"], entry["quality"])] = entry
+
+    def is_done(self, job, quality):
+        entry = self.entries.get((job.key, quality))
+        return (
+            entry is not None
+            and entry["status"] == "done"
+            and entry["source_hash"] == job.source_hash
+        )
+
+    def last_seconds(self, job, quality):
+        # how long the job took at this quality, or else the longest it took at
+        # any other; None if it never finished
+        times = {
+            entry["quality"]: entry["seconds"]
+            for (key, _), entry in self.entries.items()
+            if key == job.key and entry["status"] == "done"
+        }
+        if quality in times:
+            return times[quality]
+        return max(times.values()) if times else None
+
+    def record(self, job, quality, status, seconds):
+        entry = {
+            "job": job.key,
+            "quality": quality,
+            "status": status,
+            "seconds": round(seconds, 2),
+            "source_hash": job.source_hash,
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with self._lock:
+            self.entries[(job.key, quality)] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+
+
+def schedule(jobs, journal, quality):
+    # longest first: jobs without a recorded time, by weight, then the others
+    # by their last time
+    def key(job):
+        seconds = journal.last_seconds(job, quality)
+        if seconds is None:
+            return (0, -job.weight)
+        return (1, -seconds)
+
+    return sorted(jobs, key=key)
+
+
+def run_job(job, quality, log_dir, extra_args=()):
+    log_path = log_dir / f"{job.path.stem}.{job.scene}.log"
+    start = time.monotonic()
+    with open(log_path, "w", encoding="utf-8") as log:
+        # no stdin: a scene that needs a new voiceover recording fails instead
+        # of waiting for a microphone
+        result = subprocess.run(
+            job.command(quality, extra_args),
+            cwd=ROOT,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    return result.returncode, time.monotonic() - start, log_path
+
+
+def select(jobs, patterns):
+    if not patterns:
+        return jobs
+    return [
+        job
+        for job in jobs
+        if any(fnmatch(job.scene, p) or fnmatch(job.path.stem, p) for p in patterns)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render every scene in parallel, resuming interrupted runs."
+    )
+    parser.add_argument(
+        "scenes", nargs="*", help="scene names or file stems to render (globs)"
+    )
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="h")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--media-dir", type=Path, default=ROOT / "media")
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore the journal, render all"
+    )
+    parser.add_argument("--list", action="store_true", help="show the schedule")
+    args = parser.parse_args(argv)
+
+    journal = Journal(args.media_dir / JOURNAL_NAME)
+    jobs = schedule(select(discover_jobs(), args.scenes), journal, args.quality)
+    if not args.restart:
+        done = [job for job in jobs if journal.is_done(job, args.quality)]
+        jobs = [job for job in jobs if job not in done]
+        if done:
+            print(f"{len(done)} scenes already rendered, see {journal.path}")
+    if args.list:
+        for job in jobs:
+            seconds = journal.last_seconds(job, args.quality)
+            estimate = "new" if seconds is None else f"{seconds:.0f}s"
+            print(f"{estimate:>8}  {job.key}")
+        return 0
+
+    manim_args = ["--media_dir", str(args.media_dir)]
+    log_dir = args.media_dir / LOG_DIR
+    log_dir.mkdir(parents=True, exist_ok=True)
+    failed = []
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {
+            pool.submit(run_job, job, args.quality, log_dir, manim_args): job
+            for job in jobs
+        }
+        try:
+            for future in as_completed(futures):
+                job = futures[future]
+                returncode, seconds, log_path = future.result()
+                status = "done" if returncode == 0 else "failed"
+                journal.record(job, args.quality, status, seconds)
+                print(f"{status:>6} {seconds:7.1f}s  {job.key}")
+                if returncode != 0:
+                    failed.append(job)
+                    print(f"        see {log_path.relative_to(ROOT)}")
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            print("interrupted; run again to continue where this stopped")
+            return 130
+    elapsed = time.monotonic() - start
+    print(f"{len(jobs) - len(failed)}/{len(jobs)} scenes rendered in {elapsed:.0f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# Renders a long scene on several cores.
+#
+# Every play of a scene is rendered to a partial movie file of its own, named
+# after a hash of the play, and a render skips the plays whose file is already
+# there. This script counts the plays of a scene with a render that only saves
+# the last frame (which runs construct() without drawing the frames in
+# between), and then renders --segments ranges of plays at once, each in its own
+# `manim render -n first,last` process. A segment runs the plays before its
+# range without drawing them, which takes a small part of the time of rendering
+# them. Every segment writes its partial movies to a directory of its own,
+# they are moved to the partial movie directory of the scene afterwards, and a
+# last render of the whole scene then finds every play there: it only joins the
+# partial movies and adds the sound, at the right times.
+#
+# A play that doesn't hash the same in every process (one that uses unseeded
+# random numbers, say) is rendered again by that last render, so the video is
+# right either way, only slower. The scene is recorded as done in the journal of
+# render_all.py.
+#
+#     python tools/render_segments.py -q h ConstructingE
+#     python tools/render_segments.py -q l -j 8 --segments 16 CreatingM
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from render_all import (
+    JOURNAL_NAME,
+    QUALITIES,
+    QUALITY_DIRS,
+    ROOT,
+    Journal,
+    discover_jobs,
+    select,
+)
+
+LOG_DIR = "logs/render_segments"
+
+PARTIAL_LIST = "partial_movie_file_list.txt"
+
+_PLAYED = re.compile(r"Played (\d+) animations")
+
+
+def segment_ranges(plays, segments):
+    # [(first, last)] plays of every segment, last included. A segment of one
+    # play at the start would be -n 0,0, which manim reads as "no last play",
+    # so every segment gets two plays at least.
+    segments = max(1, min(segments, plays // 2))
+    bounds = [round(i * plays / segments) for i in range(segments + 1)]
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(segments)]
+
+
+class SegmentedRender:
+    def __init__(self, job, quality, media_dir):
+        self.job = job
+        self.quality = quality
+        self.media_dir = Path(media_dir)
+        self.video_dir = (
+            self.media_dir / "videos" / job.path.stem / QUALITY_DIRS[quality]
+        )
+        self.partial_dir = self.video_dir / "partial_movie_files" / job.scene
+        self.log_dir = self.media_dir / LOG_DIR
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+
+    def _name(self, suffix):
+        return f"{self.job.path.stem}.{self.job.scene}.{suffix}"
+
+    def _config_file(self, suffix, **options):
+        # manim has no flags for these; a config file given with --config_file
+        # is read on top of the others
+        path = self.log_dir / self._name(f"{suffix}.cfg")
+        lines = ["[CLI]"] + [f"{key} = {value}" for key, value in options.items()]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    def _run(self, suffix, *args, config=None):
+        # (return code, output) of a manim render of the scene
+        config = config or {}
+        # a scene with more plays than max_files_cached would remove the
+        # oldest partial movies of the other segments
+        config.setdefault("max_files_cached", -1)
+        extra_args = [
+            "--media_dir",
+            str(self.media_dir),
+            "--config_file",
+            str(self._config_file(suffix, **config)),
+            *args,
+        ]
+        log_path = self.log_dir / self._name(f"{suffix}.log")
+        with open(log_path, "w", encoding="utf-8") as log:
+            result = subprocess.run(
+                self.job.command(self.quality, extra_args),
+                cwd=ROOT,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        return result.returncode, log_path
+
+    def count_plays(self):
+        # -s skips every play, and the log ends with the number of plays
+        returncode, log_path = self._run("plays", "-s", "-o", f"{self.job.scene}_plays")
+        matches = _PLAYED.findall(log_path.read_text(encoding="utf-8"))
+        if returncode != 0 or not matches:
+            raise RuntimeError(f"could not count the plays, see {log_path}")
+        for image in (self.media_dir / "images" / self.job.path.stem).glob(
+            f"{self.job.scene}_plays.*"
+        ):
+            image.unlink()
+        return int(matches[-1])
+
+    def _segment_dir(self, index):
+        return self.partial_dir.with_name(f"{self.job.scene}_segment{index}")
+
+    def render_segment(self, index, first, last, is_last):
+        plays = f"{first}" if is_last else f"{first},{last}"
+        start = time.monotonic()
+        returncode, log_path = self._run(
+            f"segment{index}",
+            "-n",
+            plays,
+            "-o",
+            f"{self.job.scene}_segment{index}",
+            config={
+                "partial_movie_dir": "{video_dir}/partial_movie_files/"
+                f"{self.job.scene}_segment{index}"
+            },
+        )
+        return returncode, time.monotonic() - start, log_path
+
+    def collect_segments(self, count):
+        # move the partial movies of the segments to where a render of the
+        # whole scene looks for them, and remove what else the segments wrote
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        moved = 0
+        for index in range(count):
+            segment_dir = self._segment_dir(index)
+            if segment_dir.is_dir():
+                for path in segment_dir.iterdir():
+                    if path.name != PARTIAL_LIST:
+                        os.replace(path, self.partial_dir / path.name)
+                        moved += 1
+                shutil.rmtree(segment_dir)
+            for output in self.video_dir.glob(f"{self.job.scene}_segment{index}.*"):
+                output.unlink()
+        return moved
+
+    def stitch(self):
+        start = time.monotonic()
+        returncode, log_path = self._run("stitch")
+        return returncode, time.monotonic() - start, log_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render long scenes split into segments, in parallel."
+    )
+    parser.add_argument("scenes", nargs="+", help="scene names or file stems (globs)")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="h")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--segments", type=int, help="segments per scene (default: --jobs)"
+    )
+    parser.add_argument("--media-dir", type=Path, default=ROOT / "media")
+    args = parser.parse_args(argv)
+
+    jobs = select(discover_jobs(), args.scenes)
+    if not jobs:
+        print("no scene matches", file=sys.stderr)
+        return 1
+    journal = Journal(args.media_dir / JOURNAL_NAME)
+    failed = []
+    for job in jobs:
+        start = time.monotonic()
+        render = SegmentedRender(job, args.quality, args.media_dir)
+        try:
+            plays = render.count_plays()
+        except RuntimeError as error:
+            print(f"failed  {job.key}: {error}")
+            failed.append(job)
+            continue
+        ranges = segment_ranges(plays, args.segments or args.jobs)
+        print(f"{job.key}: {plays} plays in {len(ranges)} segments")
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            futures = [
+                pool.submit(
+                    render.render_segment, index, first, last, index == len(ranges) - 1
+                )
+                for index, (first, last) in enumerate(ranges)
+            ]
+            results = [future.result() for future in futures]
+        for index, ((first, last), (returncode, seconds, log_path)) in enumerate(
+            zip(ranges, results)
+        ):
+            status = "done" if returncode == 0 else "failed"
+            print(f"  {status:>6} {seconds:7.1f}s  plays {first}-{last}")
+            if returncode != 0:
+                print(f"         see {log_path.relative_to(ROOT)}")
+        render.collect_segments(len(ranges))
+        # the segments that failed are rendered by the last render instead
+        returncode, seconds, log_path = render.stitch()
+        status = "done" if returncode == 0 else "failed"
+        elapsed = time.monotonic() - start
+        journal.record(job, args.quality, status, elapsed)
+        print(f"{status:>6} {elapsed:7.1f}s  {job.key} (joined in {seconds:.1f}s)")
+        if returncode != 0:
+            failed.append(job)
+            print(f"        see {log_path.relative_to(ROOT)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())